@@ -38,7 +38,45 @@ class Config:
     NODE_REPO_URL = "https://nodejs.org/dist/"
 
     TARGET_REPO_HOME_PATH = "/home/scable/target-repo"
-    SBOM_MAIN_SHELL_SCRIPT_PATH = "script/shell-script/main.sh"
+    SCRIPT_HOME_PATH = "/home/scable/script"
+    RESULT_PUBLIC_HOME_PATH = "/home/scable/result-html/public"
+    CODEQL_QUERY_HOME_PATH = "/home/scable/codeql-repo"
+    REPORTING_BASE_URL = "http://localhost:5173"
+    RESULT_CACHE_HOME_PATH = "/home/scable/result-cache"
+    CLONE_CACHE_HOME_PATH = "/home/scable/clone-cache"
+    CLONE_CACHE_SIZE_BUDGET_MB = 20480
+    CLONE_CACHE_FILTER = None  # e.g. "blob:none" for blobless mirrors
+    CLONE_CACHE_DEPTH = None  # e.g. 1 for shallow mirrors
+    CODEQL_DB_CACHE_HOME_PATH = "/home/scable/codeql-db-cache"
+    CODEQL_DB_CACHE_SIZE_BUDGET_MB = 51200
+    CODEQL_COMPILATION_CACHE_PATH = "/home/scable/codeql-compilation-cache"
+    EXTRACTION_SCOPE_EXCLUDE = ["venv", ".venv", ".tox", "node_modules", "site-packages", "tests"]
+    EXTRACTION_SCOPE_RULES = {}  # e.g. {"repo-name": {"include": ["src"], "exclude": ["migrations"], "default_exclude": True}}
+    REACHABLE_DEBUG_OUTPUT = False  # True to keep the intermediate reachable files under reachable-debug/ in the workspace
+    # auto (reflink, else a git checkout of a clean repository, else copy), reflink, git, hardlink (shares files
+    # with the source tree) or copy
+    LOCAL_SNAPSHOT_MODE = "auto"
+    # Names excluded at any depth; a leading "/" only excludes the entry at the project root.
+    LOCAL_SNAPSHOT_IGNORE_PATTERNS = [
+        ".git", "node_modules", ".venv", "venv", "__pycache__", ".tox", ".mypy_cache", ".pytest_cache",
+        ".gradle", ".idea", "/dist", "/build", "/target",
+    ]
+    NVD_CVSS_CSV_PATH = "/home/scable/nvd_database/cve_cvss3_data.csv"
+    NVD_FEED_DIRECTORY = "/home/scable/nvd_database/feeds"
+    OSV_API_BASE_URL = "https://api.osv.dev"
+    ADVISORY_SNAPSHOT_HOURS = 24
+    OSV_CACHE_PATH = "/home/scable/osv-cache/advisories.sqlite"
+    OSV_CACHE_TTL_HOURS = 24
+    OSV_NEGATIVE_CACHE_TTL_HOURS = 6
+    SBOM_EAGER_FORMATS = []  # "spdx" and/or "swid" to generate them during every scan; otherwise they are rendered on first download
+    SBOM_STREAMING_THRESHOLD_MB = 256  # SBOMs above this size are streamed component by component; None disables
+    OSV_OFFLINE_DB_PATH = None  # e.g. "/home/scable/osv-offline/advisories.sqlite" to match against imported OSV dumps
+    TOP_LEVEL_INDEX_PATH = "/home/scable/top-level-index/top_level.sqlite"
+    TOP_LEVEL_INDEX_NEGATIVE_TTL_HOURS = 168
+
+    JOB_DATABASE_PATH = "scable-job.db"
+    SBOM_WORKER_COUNT = 2
+    PIPELINE_STAGE_CONCURRENCY = 4
     PYPI_FAMOUS_PACKAGE_EXCEL_PATH = "script/package-check/top_8000_pypi_packages.xlsx"
     NPM_FAMOUS_PACKAGE_EXCEL_PATH = "script/package-check/top_10000_npm_packages.xlsx"
     MAVEN_FAMOUS_PACKAGE_EXCEL_PATH = "script/package-check/top_200_maven_packages.xlsx"
@@ -94,10 +132,21 @@ class Database:
     DATABASE_PATH = "scable-log.db"
     LOG_TABLE_NAME = "log"
 
+    CREATE_LOG_TABLE_SQL = (
+        f'CREATE TABLE IF NOT EXISTS "{LOG_TABLE_NAME}" ('
+        f"date TEXT, start_time TEXT, end_time TEXT, repo_name TEXT, language TEXT, result_path TEXT, "
+        f"result_url TEXT, status TEXT, repo_url TEXT);"
+    )
+
+    # Logs written before runs recorded the repository URL they scanned.
+    ADD_LOG_REPO_URL_COLUMN_SQL = (
+        f'ALTER TABLE "{LOG_TABLE_NAME}" ADD COLUMN repo_url TEXT;'
+    )
+
     INSERT_SBOM_RESULT_SQL = (
         f'INSERT INTO "{LOG_TABLE_NAME}" '
-        f"(date, start_time, end_time, repo_name, language, result_path, result_url, status) "
-        f"VALUES (?, ?, ?, ?, ?, ?, ?, ?);"
+        f"(date, start_time, end_time, repo_name, language, result_path, result_url, status, repo_url) "
+        f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);"
     )
 
     UPDATE_SBOM_RESULT_SQL = (
@@ -106,6 +155,51 @@ class Database:
         f'WHERE date = ? AND start_time = ? AND repo_name = ?;'
     )
 
+    UPDATE_SBOM_END_TIME_SQL = (
+        f'UPDATE "{LOG_TABLE_NAME}" '
+        f'SET end_time = ? '
+        f'WHERE date = ? AND start_time = ? AND repo_name = ?;'
+    )
+
+    SELECT_SBOM_RUN_SQL = (
+        f'SELECT rowid AS run_id, * FROM "{LOG_TABLE_NAME}" WHERE rowid = ?;'
+    )
+
+    SELECT_PREVIOUS_SBOM_RUN_SQL = (
+        f'SELECT rowid AS run_id, * FROM "{LOG_TABLE_NAME}" '
+        f'WHERE repo_url = (SELECT repo_url FROM "{LOG_TABLE_NAME}" WHERE rowid = ?) '
+        f"AND status = 'completed' AND rowid < ? ORDER BY rowid DESC LIMIT 1;"
+    )
+
+    STAGE_METRICS_TABLE_NAME = "stage_metrics"
+
+    CREATE_STAGE_METRICS_TABLE_SQL = (
+        f'CREATE TABLE IF NOT EXISTS "{STAGE_METRICS_TABLE_NAME}" ('
+        f"run_id INTEGER, run_name TEXT, stage TEXT, status TEXT, started_at TEXT, "
+        f"wall_seconds REAL, cpu_seconds REAL, child_cpu_seconds REAL, peak_rss_kb INTEGER, "
+        f"child_peak_rss_kb INTEGER, component_count INTEGER, network_requests INTEGER, cache_hits INTEGER, "
+        f"errors INTEGER);"
+    )
+
+    # Tables created before the errors counter was recorded.
+    ADD_STAGE_METRICS_ERRORS_COLUMN_SQL = (
+        f'ALTER TABLE "{STAGE_METRICS_TABLE_NAME}" ADD COLUMN errors INTEGER;'
+    )
+
+    INSERT_STAGE_METRICS_SQL = (
+        f'INSERT INTO "{STAGE_METRICS_TABLE_NAME}" '
+        f"(run_id, run_name, stage, status, started_at, wall_seconds, cpu_seconds, child_cpu_seconds, "
+        f"peak_rss_kb, child_peak_rss_kb, component_count, network_requests, cache_hits, errors) "
+        f"VALUES (:run_id, :run_name, :stage, :status, :started_at, :wall_seconds, :cpu_seconds, :child_cpu_seconds, "
+        f":peak_rss_kb, :child_peak_rss_kb, :component_count, :network_requests, :cache_hits, :errors);"
+    )
+
+    SELECT_RECENT_STAGE_METRICS_SQL = (
+        f'SELECT * FROM "{STAGE_METRICS_TABLE_NAME}" '
+        f"WHERE status = 'completed' AND run_id IN ("
+        f'SELECT DISTINCT run_id FROM "{STAGE_METRICS_TABLE_NAME}" ORDER BY run_id DESC LIMIT ?);'
+    )
+
     @staticmethod
     def get_database_connect():
         try:
@@ -117,16 +211,20 @@ class Database:
             raise
 
     @staticmethod
-    def insert_sbom_result(current_date, start_time, end_time, repo_name, language, result_path, result_url, status="in_progress"):
+    def insert_sbom_result(current_date, start_time, end_time, repo_name, language, result_path, result_url, status="in_progress",
+                           repo_url=None):
+        """`repo_url` is the scanned URL or path without credentials; previous runs are matched on it."""
         try:
             conn = Database.get_database_connect()
             cur = conn.cursor()
+            Database.create_log_table(cur)
             cur.execute(
                 Database.INSERT_SBOM_RESULT_SQL,
-                (current_date, start_time, end_time, repo_name, language, result_path, result_url, status),
+                (current_date, start_time, end_time, repo_name, language, result_path, result_url, status, repo_url),
             )
             conn.commit()
             print(f"Inserted SBOM result for repository '{repo_name}' on {current_date} at {start_time}.")
+            return cur.lastrowid
         except sqlite3.Error as e:
             print(f"Error inserting SBOM result: {e}")
             raise
@@ -154,6 +252,117 @@ class Database:
                 conn.close()
                 print("Database connection closed.")
 
+    @staticmethod
+    def update_sbom_end_time(current_date, start_time, repo_name, end_time):
+        conn = None
+        try:
+            conn = Database.get_database_connect()
+            cur = conn.cursor()
+            cur.execute(
+                Database.UPDATE_SBOM_END_TIME_SQL,
+                (end_time, current_date, start_time, repo_name),
+            )
+            conn.commit()
+            print(f"Updated end time for repository '{repo_name}' on {current_date} at {start_time} to {end_time}.")
+        except sqlite3.Error as e:
+            print(f"Error updating SBOM end time: {e}")
+            raise
+        finally:
+            if conn:
+                conn.close()
+                print("Database connection closed.")
+
+    @staticmethod
+    def get_sbom_run(run_id):
+        conn = None
+        try:
+            conn = Database.get_database_connect()
+            conn.row_factory = sqlite3.Row
+            cur = conn.cursor()
+            cur.execute(Database.SELECT_SBOM_RUN_SQL, (run_id,))
+            row = cur.fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"Error reading SBOM run {run_id}: {e}")
+            raise
+        finally:
+            if conn:
+                conn.close()
+                print("Database connection closed.")
+
+    @staticmethod
+    def get_previous_sbom_run(run_id):
+        """Latest completed run of the same repository URL that started before `run_id`."""
+        conn = None
+        try:
+            conn = Database.get_database_connect()
+            conn.row_factory = sqlite3.Row
+            cur = conn.cursor()
+            Database.create_log_table(cur)
+            cur.execute(Database.SELECT_PREVIOUS_SBOM_RUN_SQL, (run_id, run_id))
+            row = cur.fetchone()
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"Error reading the run before {run_id}: {e}")
+            raise
+        finally:
+            if conn:
+                conn.close()
+                print("Database connection closed.")
+
+    @staticmethod
+    def create_log_table(cur):
+        cur.execute(Database.CREATE_LOG_TABLE_SQL)
+        columns = {row[1] for row in cur.execute(f'PRAGMA table_info("{Database.LOG_TABLE_NAME}");')}
+        if "repo_url" not in columns:
+            cur.execute(Database.ADD_LOG_REPO_URL_COLUMN_SQL)
+
+    @staticmethod
+    def create_stage_metrics_table(cur):
+        cur.execute(Database.CREATE_STAGE_METRICS_TABLE_SQL)
+        columns = {row[1] for row in cur.execute(f'PRAGMA table_info("{Database.STAGE_METRICS_TABLE_NAME}");')}
+        if "errors" not in columns:
+            cur.execute(Database.ADD_STAGE_METRICS_ERRORS_COLUMN_SQL)
+
+    @staticmethod
+    def insert_stage_metrics(run_id, run_name, records):
+        conn = None
+        try:
+            conn = Database.get_database_connect()
+            cur = conn.cursor()
+            Database.create_stage_metrics_table(cur)
+            cur.executemany(
+                Database.INSERT_STAGE_METRICS_SQL,
+                [{"run_id": run_id, "run_name": run_name, **record} for record in records],
+            )
+            conn.commit()
+            print(f"Inserted {len(records)} stage metrics for run '{run_name}'.")
+        except sqlite3.Error as e:
+            print(f"Error inserting stage metrics: {e}")
+            raise
+        finally:
+            if conn:
+                conn.close()
+                print("Database connection closed.")
+
+    @staticmethod
+    def get_recent_stage_metrics(run_limit):
+        conn = None
+        try:
+            conn = Database.get_database_connect()
+            conn.row_factory = sqlite3.Row
+            cur = conn.cursor()
+            Database.create_stage_metrics_table(cur)
+            cur.execute(Database.SELECT_RECENT_STAGE_METRICS_SQL, (run_limit,))
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error reading stage metrics: {e}")
+            raise
+        finally:
+            if conn:
+                conn.close()
+                print("Database connection closed.")
+
 def teardown_session(exception=None):
     if hasattr(thread_local, "session"):
         thread_local.session.close()
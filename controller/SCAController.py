@@ -1,15 +1,23 @@
 from config import Config, Database
-from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask import Blueprint, request, jsonify, Response, stream_with_context, send_file
 from datetime import datetime
 from engine.typosquattingCheck import TypoSquattingChecker
 from engine.reputationCheck import ReputationChecker
+from engine.pipelineRunner import (
+    PipelineContext, PipelineRunner, open_advisory_cache, get_published_sbom, PUBLISHED_SBOM_FILES
+)
+from engine.jobQueue import JobQueue
+from engine.checkpoint import CheckpointStore
+from engine.cloneCache import strip_credentials
+from engine.sbomDiff import diff_result_paths, run_result_path
 import os
+import re
 import threading
 import json
-import subprocess
 import urllib.parse
 
 SCAController = Blueprint("SCAController", __name__)
+ANSI_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
 
 def normalizeLanguage(lan):
     lan = lan.lower()
@@ -37,75 +45,76 @@ def is_url(path):
     except ValueError:
         return False
 
-def generate_sbom_output(source_path, repo_name, lan, target_repo_path, start_time, current_date):
+def execute_sbom_run(context):
     try:
-        script_path = "/home/scable/script/shell-script/main.sh"
-        command = [
-            "stdbuf", "-oL",
-            "/bin/bash",
-            script_path,
-            source_path,
-            repo_name,
-            lan,
-            target_repo_path,
-            start_time,
-            current_date
-        ]
-
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
+        yield from PipelineRunner(context).run()
+    except Exception as e:
+        print(f"SBOM pipeline failed for {context.repo_name}: {e}")
+        Database.update_sbom_result(context.current_date, context.start_time, context.repo_name, "failed", None)
+        raise
 
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                yield line
-            else:
-                break
-        process.stdout.close()
-        process.wait()
-
-        if process.returncode == 0:
-            reporting_url = f"http://localhost:5173/{current_date}_{start_time}_{repo_name}"
-            Database.update_sbom_result(current_date, start_time, repo_name, "completed", reporting_url)
-        else:
-            Database.update_sbom_result(current_date, start_time, repo_name, "failed", None)
+    reporting_url = f"{Config.REPORTING_BASE_URL}/{context.run_name}"
+    Database.update_sbom_result(context.current_date, context.start_time, context.repo_name, "completed", reporting_url)
+
+def get_sbom_response(context):
+    conn = Database.get_database_connect()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT status, result_url FROM log
+        WHERE date = ? AND start_time = ? AND repo_name = ?
+    """, (context.current_date, context.start_time, context.repo_name))
+    result = cursor.fetchone()
+    conn.close()
+
+    if result:
+        status, result_url = result
+        if status == "completed":
+            return {
+                "date": context.current_date,
+                "start_time": context.start_time,
+                "repository": context.repo_name,
+                "language": context.lan,
+                "reporting_url": result_url
+            }
+        return {"error": "SBOM generation failed"}
+    return {"error": "SBOM result not found"}
+
+def generate_sbom_output(context):
+    try:
+        try:
+            yield from execute_sbom_run(context)
+        except Exception:
             yield json.dumps({"error": "SBOM generation failed"}, ensure_ascii=False, indent=2) + '\n'
             return
 
-        conn = Database.get_database_connect()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT status, result_url FROM log
-            WHERE date = ? AND start_time = ? AND repo_name = ?
-        """, (current_date, start_time, repo_name))
-        result = cursor.fetchone()
-        conn.close()
-
-        if result:
-            status, result_url = result
-            if status == "completed":
-                response_data = {
-                    "date": current_date,
-                    "start_time": start_time,
-                    "repository": repo_name,
-                    "language": lan,
-                    "reporting_url": result_url
-                }
-                yield json.dumps(response_data, ensure_ascii=False, indent=2) + '\n\n'
-            else:
-                yield json.dumps({"error": "SBOM generation failed"}, ensure_ascii=False, indent=2) + '\n\n'
-        else:
-            yield json.dumps({"error": "SBOM result not found"}, ensure_ascii=False, indent=2) + '\n\n'
+        yield json.dumps(get_sbom_response(context), ensure_ascii=False, indent=2) + '\n\n'
 
     except Exception as e:
         print(f"Error in generate_sbom_output: {e}")
         yield json.dumps({"error": "Internal server error", "details": str(e)}, ensure_ascii=False, indent=2) + '\n\n'
         yield '\n\n'
 
+def process_sbom_job(job_id, payload):
+    context = PipelineContext(**payload)
+    Database.update_sbom_result(context.current_date, context.start_time, context.repo_name, "in_progress", None)
+    for line in execute_sbom_run(context):
+        progress = ANSI_ESCAPE_PATTERN.sub("", line).strip()
+        if progress:
+            sbom_job_queue.update_progress(job_id, progress)
+
+    response = get_sbom_response(context)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
+
+sbom_job_queue = JobQueue("sbom", process_sbom_job)
+
+def is_streaming_requested():
+    return request.args.get("stream", "false").lower() in ["1", "true", "yes"]
+
+def is_cache_requested():
+    return request.args.get("cache", "true").lower() not in ["0", "false", "no"]
+
 @SCAController.route("/sbom")
 def sbom():
     source_path = request.args.get('repo_url')
@@ -126,7 +135,8 @@ def sbom():
         if lan is None:
             return jsonify({"error": "Unsupported language parameter"}), 400
 
-        Database.insert_sbom_result(
+        stream = is_streaming_requested()
+        run_id = Database.insert_sbom_result(
             current_date=current_date,
             start_time=start_time,
             end_time=None,
@@ -134,22 +144,171 @@ def sbom():
             language=lan,
             result_path=target_repo_path,
             result_url=None,
-            status="in_progress"
+            status="in_progress" if stream else "queued",
+            repo_url=strip_credentials(source_path.rstrip('/'))
         )
 
-        def generate():
-            yield from generate_sbom_output(source_path, repo_name, lan, target_repo_path, start_time, current_date)
+        payload = {
+            "repo_url": source_path,
+            "repo_name": repo_name,
+            "lan": lan,
+            "target_repo_path": target_repo_path,
+            "start_time": start_time,
+            "current_date": current_date,
+            "run_id": run_id,
+            "use_cache": is_cache_requested()
+        }
 
-        return Response(
-            stream_with_context(generate()),
-            mimetype='text/plain',
-            headers={'Content-Type': 'text/plain; charset=utf-8'}
-        )
+        if stream:
+            return Response(
+                stream_with_context(generate_sbom_output(PipelineContext(**payload))),
+                mimetype='text/plain',
+                headers={'Content-Type': 'text/plain; charset=utf-8'}
+            )
+
+        job_id = sbom_job_queue.submit(payload)
+        return jsonify({
+            "job_id": job_id,
+            "run_id": run_id,
+            "status": "queued",
+            "status_url": f"/sbom/jobs/{job_id}",
+            "result_url": f"/sbom/jobs/{job_id}/result"
+        }), 202
 
     except Exception as e:
         print(f"Unexpected error in /sbom route: {e}")
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
+@SCAController.route("/sbom/runs/<int:run_id>/resume", methods=["POST"])
+def resume_sbom_run(run_id):
+    try:
+        run = Database.get_sbom_run(run_id)
+        if run is None:
+            return jsonify({"error": f"Run not found: {run_id}"}), 404
+        if run["status"] != "failed":
+            return jsonify({"error": f"Only failed runs can be resumed (status: {run['status']})"}), 409
+
+        checkpoints = CheckpointStore(run["result_path"])
+        payload = checkpoints.load_context()
+        if payload is None:
+            return jsonify({"error": f"Run {run_id} has no checkpoints to resume from"}), 409
+        payload["run_id"] = run_id
+        context = PipelineContext(**payload)
+
+        if is_streaming_requested():
+            Database.update_sbom_result(context.current_date, context.start_time, context.repo_name, "in_progress", None)
+            return Response(
+                stream_with_context(generate_sbom_output(context)),
+                mimetype='text/plain',
+                headers={'Content-Type': 'text/plain; charset=utf-8'}
+            )
+
+        Database.update_sbom_result(context.current_date, context.start_time, context.repo_name, "queued", None)
+        job_id = sbom_job_queue.submit(payload)
+        return jsonify({
+            "job_id": job_id,
+            "run_id": run_id,
+            "status": "queued",
+            "completed_stages": checkpoints.completed_stages(),
+            "status_url": f"/sbom/jobs/{job_id}",
+            "result_url": f"/sbom/jobs/{job_id}/result"
+        }), 202
+
+    except Exception as e:
+        print(f"Unexpected error in /sbom/runs/{run_id}/resume route: {e}")
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+@SCAController.route("/sbom/runs/<int:run_id>/diff", methods=["GET"])
+def diff_sbom_runs(run_id):
+    base_run_id = request.args.get("base", type=int)
+    try:
+        run = Database.get_sbom_run(run_id)
+        if run is None:
+            return jsonify({"error": f"Run not found: {run_id}"}), 404
+        base_run = Database.get_sbom_run(base_run_id) if base_run_id is not None else Database.get_previous_sbom_run(run_id)
+        if base_run is None:
+            return jsonify({"error": f"No run to compare run {run_id} with"}), 404
+
+        diff = diff_result_paths(run_result_path(base_run), run_result_path(run))
+        if diff is None:
+            return jsonify({"error": "SBOM results of one of the runs are not available"}), 409
+        return jsonify({"run_id": run_id, "base_run_id": base_run["run_id"], **diff}), 200
+    except Exception as e:
+        print(f"Unexpected error in /sbom/runs/{run_id}/diff route: {e}")
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+@SCAController.route("/sbom/jobs/<job_id>", methods=["GET"])
+def sbom_job_status(job_id):
+    job = sbom_job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job not found: {job_id}"}), 404
+
+    response_data = {
+        "job_id": job_id,
+        "run_id": job["payload"].get("run_id"),
+        "status": job["status"],
+        "progress": job["progress"],
+        "repository": job["payload"]["repo_name"],
+        "date": job["payload"]["current_date"],
+        "start_time": job["payload"]["start_time"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
+    if "queue_position" in job:
+        response_data["queue_position"] = job["queue_position"]
+    if job["error"]:
+        response_data["error"] = job["error"]
+    return jsonify(response_data), 200
+
+@SCAController.route("/sbom/jobs/<job_id>/result", methods=["GET"])
+def sbom_job_result(job_id):
+    job = sbom_job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job not found: {job_id}"}), 404
+
+    if job["status"] == "completed":
+        return jsonify(job["result"]), 200
+    if job["status"] == "failed":
+        return jsonify({"error": "SBOM generation failed", "details": job["error"]}), 500
+    return jsonify({"job_id": job_id, "status": job["status"], "progress": job["progress"]}), 202
+
+@SCAController.route("/sbom/results/<run_name>/<file_name>", methods=["GET"])
+def download_sbom(run_name, file_name):
+    if file_name not in PUBLISHED_SBOM_FILES:
+        return jsonify({"error": f"Unsupported SBOM file, expected one of: {', '.join(PUBLISHED_SBOM_FILES)}"}), 400
+    if run_name.startswith("."):
+        return jsonify({"error": f"Run not found: {run_name}"}), 404
+
+    try:
+        file_path = get_published_sbom(run_name, file_name)
+        if file_path is None:
+            return jsonify({"error": f"Run not found: {run_name}"}), 404
+        return send_file(file_path, as_attachment=True, download_name=file_name)
+    except Exception as e:
+        print(f"Unexpected error in /sbom/results/{run_name}/{file_name} route: {e}")
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+@SCAController.route("/osv-cache/invalidate", methods=["POST"])
+def invalidate_osv_cache():
+    ecosystem = request.args.get("ecosystem")
+    name = request.args.get("name")
+    version = request.args.get("version")
+    if version is not None and name is None:
+        return jsonify({"error": "'version' requires 'name'"}), 400
+
+    try:
+        invalidated = open_advisory_cache().invalidate(ecosystem=ecosystem, name=name, version=version)
+        return jsonify({
+            "ecosystem": ecosystem,
+            "name": name,
+            "version": version,
+            "invalidated": invalidated
+        }), 200
+    except Exception as e:
+        print(f"Unexpected error in /osv-cache/invalidate route: {e}")
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
 @SCAController.route('/package-check', methods=['GET'])
 def check_reputation():
     package_name = request.args.get("package_name")
@@ -0,0 +1,24 @@
+from config import Database
+from flask import Blueprint, request, jsonify
+from engine.stageMetrics import summarize_stage_metrics
+
+metricsController = Blueprint("metricsController", __name__)
+
+@metricsController.route("/metrics/stages", methods=["GET"])
+def stage_metrics():
+    try:
+        runs = int(request.args.get("runs", 20))
+    except ValueError:
+        return jsonify({"error": "runs must be an integer"}), 400
+    if runs < 1:
+        return jsonify({"error": "runs must be at least 1"}), 400
+
+    try:
+        rows = Database.get_recent_stage_metrics(runs)
+    except Exception as e:
+        return jsonify({"error": "Could not read stage metrics", "details": str(e)}), 500
+
+    return jsonify({
+        "runs": len({row["run_id"] for row in rows}),
+        "stages": summarize_stage_metrics(rows)
+    }), 200
@@ -0,0 +1,66 @@
+from config import Config
+from datetime import datetime
+import hashlib
+import json
+import os
+import uuid
+
+CHECKPOINT_DIRECTORY_NAME = ".checkpoints"
+CONTEXT_FILE_NAME = "context.json"
+
+def input_fingerprint(stage_name, parameters, upstream_tokens):
+    """Hash of what a stage consumes: the run parameters and the completion tokens of the stages it depends on."""
+    payload = json.dumps([stage_name, parameters, sorted(upstream_tokens)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class CheckpointStore:
+    """Stage completion records kept in the run workspace, one JSON file per stage."""
+    def __init__(self, workspace_path):
+        self.directory = os.path.join(workspace_path, CHECKPOINT_DIRECTORY_NAME)
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def read(self, name):
+        try:
+            with open(self.path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        staging_path = f"{self.path(name)}.{uuid.uuid4().hex}.tmp"
+        with open(staging_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(staging_path, self.path(name))
+
+    def load(self, stage_name, inputs):
+        """Return the checkpoint of `stage_name` if it was completed with the same inputs, otherwise None."""
+        checkpoint = self.read(f"stage-{stage_name}")
+        if checkpoint is None or checkpoint.get("inputs") != inputs:
+            return None
+        return checkpoint
+
+    def save(self, stage_name, inputs, artifacts):
+        token = uuid.uuid4().hex
+        self.write(f"stage-{stage_name}", {
+            "stage": stage_name,
+            "inputs": inputs,
+            "token": token,
+            "completed_at": datetime.now(Config.SEOUL_TIME_ZONE).isoformat(timespec="seconds"),
+            "artifacts": artifacts,
+        })
+        return token
+
+    def save_context(self, payload):
+        self.write(os.path.splitext(CONTEXT_FILE_NAME)[0], payload)
+
+    def load_context(self):
+        return self.read(os.path.splitext(CONTEXT_FILE_NAME)[0])
+
+    def completed_stages(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[len("stage-"):-len(".json")] for name in os.listdir(self.directory)
+                      if name.startswith("stage-") and name.endswith(".json"))
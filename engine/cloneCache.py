@@ -0,0 +1,144 @@
+from config import Config
+from filelock import FileLock, Timeout
+import base64
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+import urllib.parse
+
+def strip_credentials(repo_url):
+    parsed = urllib.parse.urlsplit(repo_url)
+    if parsed.username is None and parsed.password is None:
+        return repo_url
+    netloc = parsed.hostname or ""
+    if parsed.port:
+        netloc = f"{netloc}:{parsed.port}"
+    return urllib.parse.urlunsplit((parsed.scheme, netloc, parsed.path, parsed.query, parsed.fragment))
+
+def credential_options(repo_url):
+    """git options sending the credentials of `repo_url` as an Authorization header for its host only.
+
+    They are passed per command so that the credentials never end up in the config of a shared mirror.
+    """
+    parsed = urllib.parse.urlsplit(repo_url)
+    if parsed.username is None and parsed.password is None:
+        return []
+    user = urllib.parse.unquote(parsed.username or "")
+    password = urllib.parse.unquote(parsed.password or "")
+    token = base64.b64encode(f"{user}:{password}".encode("utf-8")).decode("ascii")
+    base_url = urllib.parse.urlunsplit((parsed.scheme, urllib.parse.urlsplit(strip_credentials(repo_url)).netloc, "/", "", ""))
+    return ["-c", f"http.{base_url}.extraHeader=Authorization: Basic {token}"]
+
+def directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+def has_live_worktrees(mirror_path):
+    worktrees_path = os.path.join(mirror_path, "worktrees")
+    if not os.path.isdir(worktrees_path):
+        return False
+    for name in os.listdir(worktrees_path):
+        try:
+            with open(os.path.join(worktrees_path, name, "gitdir"), "r") as f:
+                if os.path.exists(f.read().strip()):
+                    return True
+        except OSError:
+            continue
+    return False
+
+def run_git(command, cwd=None):
+    subprocess.run(command, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+class MirrorCache:
+    """One bare mirror per repository URL, fetched incrementally and checked out through worktrees."""
+    def __init__(self, root=None, filter_spec=None, depth=None, size_budget_mb=None):
+        self.root = root or Config.CLONE_CACHE_HOME_PATH
+        self.filter_spec = filter_spec if filter_spec is not None else Config.CLONE_CACHE_FILTER
+        self.depth = depth if depth is not None else Config.CLONE_CACHE_DEPTH
+        self.size_budget = (size_budget_mb or Config.CLONE_CACHE_SIZE_BUDGET_MB) * 1024 * 1024
+
+    def mirror_path(self, repo_url):
+        # Credentials are left out of the key so that token rotation keeps hitting the same mirror.
+        key = hashlib.sha256(strip_credentials(repo_url).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.root, "mirrors", f"{key}.git")
+
+    def lock(self, mirror_path, timeout=-1):
+        return FileLock(f"{mirror_path}.lock", timeout=timeout)
+
+    def fetch_options(self):
+        options = []
+        if self.filter_spec:
+            options.append(f"--filter={self.filter_spec}")
+        if self.depth:
+            options.append(f"--depth={self.depth}")
+        return options
+
+    def update_mirror(self, repo_url, mirror_path, run):
+        # The mirror outlives the run, so origin is stored without credentials; resetting it on every update
+        # also removes credentials that older mirrors kept in their config.
+        origin_url = strip_credentials(repo_url)
+        credentials = credential_options(repo_url)
+        if os.path.isdir(mirror_path):
+            print(f"[*] Updating mirror {mirror_path}")
+            run(["git", "-C", mirror_path, "remote", "set-url", "origin", origin_url])
+            run(["git", *credentials, "-C", mirror_path, "fetch", "--prune", *self.fetch_options(), "origin"])
+            run(["git", "-C", mirror_path, "worktree", "prune"])
+        else:
+            print(f"[*] Creating mirror {mirror_path}")
+            os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+            staging_path = f"{mirror_path}.tmp"
+            shutil.rmtree(staging_path, ignore_errors=True)
+            run(["git", *credentials, "clone", "--mirror", *self.fetch_options(), origin_url, staging_path])
+            os.rename(staging_path, mirror_path)
+        os.utime(mirror_path)
+
+    def checkout(self, repo_url, worktree_path, run=run_git, revision="HEAD"):
+        """Bring the mirror of `repo_url` up to date and check `revision` out as a detached worktree."""
+        mirror_path = self.mirror_path(repo_url)
+        os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+        with self.lock(mirror_path):
+            self.update_mirror(repo_url, mirror_path, run)
+            if os.path.exists(worktree_path):
+                print(f"Directory {worktree_path} already exists. Replacing the worktree.")
+                shutil.rmtree(worktree_path)
+                run(["git", "-C", mirror_path, "worktree", "prune"])
+            run(["git", "-C", mirror_path, "worktree", "add", "--detach", worktree_path, revision])
+        self.collect_garbage(keep=mirror_path)
+        return worktree_path
+
+    def collect_garbage(self, keep=None):
+        """Delete least recently used mirrors until the cache fits the size budget, skipping mirrors in use."""
+        mirrors_path = os.path.join(self.root, "mirrors")
+        if not os.path.isdir(mirrors_path):
+            return []
+
+        mirrors = []
+        for name in os.listdir(mirrors_path):
+            path = os.path.join(mirrors_path, name)
+            if name.endswith(".git") and os.path.isdir(path):
+                mirrors.append((os.path.getmtime(path), path, directory_size(path)))
+        total = sum(size for _, _, size in mirrors)
+
+        removed = []
+        for last_used, path, size in sorted(mirrors):
+            if total <= self.size_budget:
+                break
+            if path == keep or has_live_worktrees(path):
+                continue
+            try:
+                with self.lock(path, timeout=0):
+                    shutil.rmtree(path, ignore_errors=True)
+            except Timeout:
+                continue
+            total -= size
+            removed.append(path)
+            print(f"[*] Removed mirror {path} ({size // (1024 * 1024)} MB, last used {time.ctime(last_used)})")
+        return removed
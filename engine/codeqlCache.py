@@ -0,0 +1,180 @@
+from config import Config
+from engine.cloneCache import strip_credentials, directory_size
+from engine.resultCache import cache_key, query_fingerprint
+from filelock import FileLock, Timeout
+import contextlib
+import fcntl
+import functools
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+QUERY_LANGUAGES = ("python", "java", "javascript")
+
+def query_pack_path(language):
+    return os.path.join(Config.CODEQL_QUERY_HOME_PATH, language, "ql/src/Security/scable")
+
+@functools.lru_cache(maxsize=1)
+def codeql_version():
+    """Version of the CodeQL CLI, which also versions the extractors it bundles, or None when it is not installed."""
+    try:
+        result = subprocess.run(["codeql", "version", "--format=terse"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+class CodeqlDatabaseCache:
+    """Finished CodeQL databases keyed by (repository, commit, language, extractor version, extraction scope), evicted least recently used first."""
+    def __init__(self, root=None, size_budget_mb=None):
+        self.root = root or Config.CODEQL_DB_CACHE_HOME_PATH
+        self.size_budget = (size_budget_mb or Config.CODEQL_DB_CACHE_SIZE_BUDGET_MB) * 1024 * 1024
+
+    def database_key(self, repo_url, commit, language, extractor_version, scope_fingerprint=None):
+        # Credentials are left out of the key so that token rotation keeps hitting the same database.
+        return cache_key(strip_credentials(repo_url), commit, language, extractor_version, scope_fingerprint)[:32]
+
+    def database_path(self, key):
+        return os.path.join(self.root, "databases", key)
+
+    def lock(self, database_path, timeout=-1):
+        return FileLock(f"{database_path}.lock", timeout=timeout)
+
+    @contextlib.contextmanager
+    def shared_lock(self, database_path):
+        """Shared flock on the file `lock` locks exclusively: any number of scans can hold it at once, while a
+        rebuild or eviction of the database waits until all of them are done."""
+        fd = os.open(f"{database_path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def in_use(self, database_path):
+        """Keep a cached database from being evicted for the duration of a with block; other databases are not locked.
+
+        Concurrent scans of the same commit analyze the database side by side.
+        """
+        if os.path.dirname(os.path.abspath(database_path)) != os.path.abspath(os.path.join(self.root, "databases")):
+            return contextlib.nullcontext()
+        return self.shared_lock(database_path)
+
+    def is_finished(self, database_path):
+        return os.path.isfile(os.path.join(database_path, "codeql-database.yml"))
+
+    def checkout(self, key, create):
+        """Return the cached database for `key`, building it with `create(path)` on a miss.
+
+        `create` returns whether the database was built; failed builds are not cached and None is returned.
+        """
+        database_path = self.database_path(key)
+        os.makedirs(os.path.dirname(database_path), exist_ok=True)
+        with self.lock(database_path):
+            if self.is_finished(database_path):
+                print(f"[*] Reusing CodeQL database {database_path}")
+                os.utime(database_path)
+            else:
+                print(f"[*] Creating CodeQL database {database_path}")
+                staging_path = f"{database_path}.tmp"
+                shutil.rmtree(staging_path, ignore_errors=True)
+                if not create(staging_path) or not self.is_finished(staging_path):
+                    shutil.rmtree(staging_path, ignore_errors=True)
+                    return None
+                shutil.rmtree(database_path, ignore_errors=True)
+                os.rename(staging_path, database_path)
+        self.collect_garbage(keep=database_path)
+        return database_path
+
+    def collect_garbage(self, keep=None):
+        """Delete least recently used databases until the cache fits the size budget, skipping databases in use."""
+        databases_path = os.path.join(self.root, "databases")
+        if not os.path.isdir(databases_path):
+            return []
+
+        databases = []
+        for name in os.listdir(databases_path):
+            path = os.path.join(databases_path, name)
+            if os.path.isdir(path) and not name.endswith(".tmp"):
+                databases.append((os.path.getmtime(path), path, directory_size(path)))
+        total = sum(size for _, _, size in databases)
+
+        removed = []
+        for last_used, path, size in sorted(databases):
+            if total <= self.size_budget:
+                break
+            if path == keep:
+                continue
+            try:
+                with self.lock(path, timeout=0):
+                    shutil.rmtree(path, ignore_errors=True)
+            except Timeout:
+                continue
+            total -= size
+            removed.append(path)
+            print(f"[*] Removed CodeQL database {path} ({size // (1024 * 1024)} MB, last used {time.ctime(last_used)})")
+        return removed
+
+class QueryCompilationCache:
+    """Compiled CodeQL queries shared by every scan through `--compilation-cache`.
+
+    A stamp per query directory records the query fingerprint and CLI version it was compiled for,
+    so the queries are only recompiled after they or the CLI change.
+    """
+    def __init__(self, root=None):
+        self.root = root or Config.CODEQL_COMPILATION_CACHE_PATH
+
+    def stamp_path(self, query_path):
+        return os.path.join(self.root, "compiled", f"{cache_key(os.path.abspath(query_path))[:32]}.json")
+
+    def read_stamp(self, stamp_path):
+        try:
+            with open(stamp_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def ensure_compiled(self, query_path, fingerprint=None):
+        """Compile the queries under `query_path` into the cache unless they already are; returns whether they are."""
+        fingerprint = fingerprint or query_fingerprint(query_path)
+        version = codeql_version()
+        if fingerprint is None or version is None:
+            return False
+        stamp = {"query_path": os.path.abspath(query_path), "fingerprint": fingerprint, "codeql_version": version}
+        stamp_path = self.stamp_path(query_path)
+        os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+        with FileLock(f"{stamp_path}.lock"):
+            if self.read_stamp(stamp_path) == stamp:
+                return True
+            print(f"[*] Compiling CodeQL queries {query_path}")
+            started = time.monotonic()
+            result = subprocess.run(
+                ["codeql", "query", "compile", f"--compilation-cache={self.root}", "--threads=0", query_path],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )
+            if result.returncode != 0:
+                print(f"[ERROR] Compiling CodeQL queries {query_path} failed:\n{result.stdout[-2000:]}")
+                return False
+            with open(f"{stamp_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(stamp, f)
+            os.replace(f"{stamp_path}.tmp", stamp_path)
+            print(f"[*] Compiled CodeQL queries {query_path} in {time.monotonic() - started:.1f}s")
+            return True
+
+    def analyze_options(self):
+        return [f"--compilation-cache={self.root}"]
+
+def precompile_query_packs():
+    cache = QueryCompilationCache()
+    for language in QUERY_LANGUAGES:
+        if os.path.isdir(query_pack_path(language)):
+            cache.ensure_compiled(query_pack_path(language))
+
+def start_query_precompilation():
+    """Compile the query packs in the background so that the first scans do not wait for the server to start."""
+    thread = threading.Thread(target=precompile_query_packs, name="codeql-precompile", daemon=True)
+    thread.start()
+    return thread
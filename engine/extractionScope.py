@@ -0,0 +1,92 @@
+from config import Config
+from engine.resultCache import cache_key
+import fnmatch
+import json
+import os
+
+REPORT_FILE_NAME = "extraction-scope.json"
+NOT_INCLUDED = "(not included)"
+
+class ExtractionScope:
+    """Include/exclude path rules applied to the clone before CodeQL extraction and import parsing.
+
+    A rule without '/' matches a file or directory of that name at any depth ("tests", "*.min.js");
+    a rule with '/' is a glob matched against the path relative to the source root ("src/legacy/*").
+    When include rules are given, only files under one of them are kept.
+    """
+    def __init__(self, include=(), exclude=()):
+        self.include = list(include)
+        self.exclude = list(exclude)
+
+    @classmethod
+    def for_repository(cls, repo_name):
+        """Scope of a repository: the default exclusions plus its entry in Config.EXTRACTION_SCOPE_RULES."""
+        rules = Config.EXTRACTION_SCOPE_RULES.get(repo_name, {})
+        exclude = list(Config.EXTRACTION_SCOPE_EXCLUDE) if rules.get("default_exclude", True) else []
+        exclude += [rule for rule in rules.get("exclude", []) if rule not in exclude]
+        return cls(rules.get("include", []), exclude)
+
+    def fingerprint(self):
+        return cache_key(self.include, self.exclude)
+
+    @staticmethod
+    def rule_matches(rule, relative_path):
+        rule = rule.strip("/")
+        parts = relative_path.split("/")
+        if "/" not in rule:
+            return any(fnmatch.fnmatchcase(part, rule) for part in parts)
+        # A directory rule also covers everything below the directory.
+        return any(fnmatch.fnmatchcase("/".join(parts[:depth]), rule) for depth in range(1, len(parts) + 1))
+
+    def excluding_rule(self, relative_path, is_dir=False):
+        """The rule excluding a path relative to the source root, or None when the path is in scope."""
+        relative_path = relative_path.replace(os.sep, "/")
+        for rule in self.exclude:
+            if self.rule_matches(rule, relative_path):
+                return rule
+        # Directories are only pruned by exclusions: an include rule may match a file further down.
+        if self.include and not is_dir and not any(self.rule_matches(rule, relative_path) for rule in self.include):
+            return NOT_INCLUDED
+        return None
+
+    def walk(self, source_root, report=None):
+        """Yield the paths of the files in scope under `source_root`, counting excluded files per rule in `report`."""
+        for dirpath, dirnames, filenames in os.walk(source_root):
+            relative_dir = os.path.relpath(dirpath, source_root)
+            relative_dir = "" if relative_dir == "." else relative_dir + "/"
+            for dirname in list(dirnames):
+                rule = self.excluding_rule(relative_dir + dirname, is_dir=True)
+                if rule is not None:
+                    dirnames.remove(dirname)
+                    if report is not None:
+                        report[rule] = report.get(rule, 0) + count_files(os.path.join(dirpath, dirname))
+            for filename in filenames:
+                rule = self.excluding_rule(relative_dir + filename)
+                if rule is None:
+                    yield os.path.join(dirpath, filename)
+                elif report is not None:
+                    report[rule] = report.get(rule, 0) + 1
+
+    def exclusion_report(self, source_root):
+        report = dict.fromkeys(self.exclude + ([NOT_INCLUDED] if self.include else []), 0)
+        included = sum(1 for _ in self.walk(source_root, report))
+        return {"include": self.include, "exclude": self.exclude, "included_files": included, "excluded_files": report}
+
+    def codeql_config(self):
+        """The scope as a CodeQL code scanning configuration (`paths` and `paths-ignore`)."""
+        def to_codeql(rule):
+            rule = rule.strip("/")
+            return rule if "/" in rule else f"**/{rule}"
+        config = {"paths-ignore": [to_codeql(rule) for rule in self.exclude]}
+        if self.include:
+            config["paths"] = [to_codeql(rule) for rule in self.include]
+        return config
+
+    def write_codeql_config(self, config_path):
+        # JSON is valid YAML, which is what --codescanning-config reads.
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump(self.codeql_config(), f, indent=4)
+        return config_path
+
+def count_files(path):
+    return sum(len(filenames) for _, _, filenames in os.walk(path))
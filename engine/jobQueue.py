@@ -0,0 +1,136 @@
+from config import Config
+from datetime import datetime
+import json
+import sqlite3
+import threading
+import traceback
+import uuid
+
+class JobQueue:
+    """Persistent SQLite-backed queue drained by a fixed pool of worker threads."""
+    TABLE_NAME = "job"
+
+    CREATE_TABLE_SQL = (
+        f'CREATE TABLE IF NOT EXISTS "{TABLE_NAME}" ('
+        f"job_id TEXT PRIMARY KEY, kind TEXT, payload TEXT, status TEXT, progress TEXT, "
+        f"result TEXT, error TEXT, created_at TEXT, started_at TEXT, finished_at TEXT);"
+    )
+
+    INSERT_JOB_SQL = (
+        f'INSERT INTO "{TABLE_NAME}" (job_id, kind, payload, status, created_at) '
+        f"VALUES (?, ?, ?, 'queued', ?);"
+    )
+
+    CLAIM_JOB_SQL = (
+        f'UPDATE "{TABLE_NAME}" SET status = \'running\', started_at = ? '
+        f"WHERE job_id = (SELECT job_id FROM \"{TABLE_NAME}\" WHERE status = 'queued' AND kind = ? "
+        f"ORDER BY created_at, rowid LIMIT 1) RETURNING job_id, payload;"
+    )
+
+    REQUEUE_INTERRUPTED_SQL = (
+        f'UPDATE "{TABLE_NAME}" SET status = \'queued\', started_at = NULL '
+        f"WHERE status = 'running' AND kind = ?;"
+    )
+
+    def __init__(self, kind, handler, worker_count=None, database_path=None):
+        self.kind = kind
+        self.handler = handler
+        self.worker_count = worker_count or Config.SBOM_WORKER_COUNT
+        self.database_path = database_path or Config.JOB_DATABASE_PATH
+        self.condition = threading.Condition()
+        self.workers = []
+        self.execute(JobQueue.CREATE_TABLE_SQL)
+
+    def connect(self):
+        return sqlite3.connect(self.database_path, timeout=30, isolation_level=None)
+
+    def execute(self, sql, params=(), fetch=False):
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(sql, params)
+            return cursor.fetchall() if fetch else None
+        finally:
+            conn.close()
+
+    def now(self):
+        return datetime.now(Config.SEOUL_TIME_ZONE).isoformat(timespec="seconds")
+
+    def start(self):
+        if self.workers:
+            return
+        self.execute(JobQueue.REQUEUE_INTERRUPTED_SQL, (self.kind,))
+        for index in range(self.worker_count):
+            worker = threading.Thread(target=self.work, name=f"{self.kind}-worker-{index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        print(f"[DEBUG] Started {self.worker_count} '{self.kind}' workers.")
+
+    def submit(self, payload):
+        job_id = uuid.uuid4().hex
+        self.execute(JobQueue.INSERT_JOB_SQL, (job_id, self.kind, json.dumps(payload), self.now()))
+        with self.condition:
+            self.condition.notify()
+        return job_id
+
+    def claim(self):
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(JobQueue.CLAIM_JOB_SQL, (self.now(), self.kind)).fetchone()
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to claim '{self.kind}' job: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return None
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def work(self):
+        while True:
+            job = self.claim()
+            if job is None:
+                with self.condition:
+                    self.condition.wait(timeout=5)
+                continue
+
+            job_id, payload = job
+            try:
+                result = self.handler(job_id, payload)
+                self.finish(job_id, "completed", result=result)
+            except Exception as e:
+                print(f"[ERROR] Job {job_id} failed: {e}\n{traceback.format_exc()}")
+                self.finish(job_id, "failed", error=str(e))
+
+    def update_progress(self, job_id, progress):
+        self.execute(f'UPDATE "{JobQueue.TABLE_NAME}" SET progress = ? WHERE job_id = ?;', (progress, job_id))
+
+    def finish(self, job_id, status, result=None, error=None):
+        self.execute(
+            f'UPDATE "{JobQueue.TABLE_NAME}" SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?;',
+            (status, json.dumps(result) if result is not None else None, error, self.now(), job_id),
+        )
+
+    def get(self, job_id):
+        rows = self.execute(
+            f'SELECT * FROM "{JobQueue.TABLE_NAME}" WHERE job_id = ? AND kind = ?;', (job_id, self.kind), fetch=True
+        )
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        if job["status"] == "queued":
+            job["queue_position"] = self.queue_position(job["created_at"])
+        return job
+
+    def queue_position(self, created_at):
+        rows = self.execute(
+            f"SELECT COUNT(*) FROM \"{JobQueue.TABLE_NAME}\" WHERE status = 'queued' AND kind = ? AND created_at <= ?;",
+            (self.kind, created_at), fetch=True
+        )
+        return rows[0][0]
@@ -0,0 +1,57 @@
+import re
+
+LIBRARY_NAME_SEPARATORS = re.compile(r"[(){},\-]")
+
+class ModuleTrie:
+    """Dotted module paths ("a.b.c") with a value each, answering longest-prefix lookups in O(path depth)."""
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, module, value):
+        node = self.root
+        for part in module.split("."):
+            node = node.setdefault(part, {})
+        node[None] = value
+
+    def longest_prefix(self, module):
+        """Value of `module` itself or of its longest dotted prefix ("a.b" for "a.b.c"), or None."""
+        node, value = self.root, None
+        for part in module.split("."):
+            node = node.get(part)
+            if node is None:
+                break
+            value = node.get(None, value)
+        return value
+
+class ModuleResolver:
+    """Resolves CodeQL findings to the imports of a project and imports to the vulnerable packages providing them.
+
+    Built once per run: a hash index from every imported module, alias and name to its first import,
+    and a trie from the top-level modules of the vulnerable packages to the package.
+    """
+    def __init__(self, imports=(), library_mapping=None, requirements_packages=()):
+        self.tokens = {}
+        for item in imports:
+            self.add_import(item["module"], (item["alias"], item["function"]))
+        self.packages = ModuleTrie()
+        for module, package in (library_mapping or {}).items():
+            self.packages.insert(module, package)
+        self.requirements_packages = set(requirements_packages)
+
+    def add_import(self, module, names):
+        for token in (module,) + tuple(names):
+            if token != "None" and token not in self.tokens:
+                self.tokens[token] = (len(self.tokens), module)
+
+    def imported_module(self, library_name):
+        """Module of the earliest import whose module, alias or name is a token of `library_name`."""
+        matches = [self.tokens[token] for token in LIBRARY_NAME_SEPARATORS.sub(" ", library_name).split()
+                   if token in self.tokens]
+        return min(matches)[1] if matches else None
+
+    def package_of(self, module):
+        """Vulnerable package providing `module` or its closest enclosing module, falling back to a package of that name."""
+        package = self.packages.longest_prefix(module)
+        if package is not None:
+            return package
+        return module if module in self.requirements_packages else None
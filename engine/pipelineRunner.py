@@ -0,0 +1,834 @@
+from config import Config, Database
+from datetime import datetime
+from engine.stageScheduler import Stage, StageScheduler
+from engine.stageMetrics import StageMetrics, current_metrics, current_counters
+from engine.checkpoint import CheckpointStore, input_fingerprint
+from engine.cloneCache import MirrorCache, strip_credentials
+from engine.extractionScope import ExtractionScope, REPORT_FILE_NAME as EXTRACTION_SCOPE_FILE_NAME
+from engine.codeqlCache import CodeqlDatabaseCache, QueryCompilationCache, codeql_version, query_pack_path
+from engine.sbomIndex import SbomIndex
+from engine.reachability import read_findings, reachable_entries
+from engine.topLevelIndex import TopLevelIndex
+from engine.sbomStream import JsonObjectReader, JsonDocumentStream, is_large_document
+from engine.sbomDiff import DIFF_FILE_NAME, RunIndex, diff_runs, load_run_index, run_result_path
+from engine.resultCache import (
+    ResultCache, cache_key, resolve_commit, working_tree_commit, source_fingerprint, manifest_fingerprint,
+    query_fingerprint, advisory_snapshot_version
+)
+from filelock import FileLock
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import traceback
+import zipfile
+
+_script_modules = {}
+_script_lock = threading.Lock()
+_log_binding = threading.local()
+
+def load_script(relative_path):
+    """Import a script under Config.SCRIPT_HOME_PATH once per process and return the module."""
+    with _script_lock:
+        module = _script_modules.get(relative_path)
+        if module is None:
+            script_path = os.path.join(Config.SCRIPT_HOME_PATH, relative_path)
+            script_dir = os.path.dirname(script_path)
+            if script_dir not in sys.path:
+                sys.path.append(script_dir)
+            module_name = "scable_" + os.path.splitext(relative_path)[0].replace("/", "_").replace("-", "_")
+            spec = importlib.util.spec_from_file_location(module_name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _script_modules[relative_path] = module
+        return module
+
+class ThreadLogRouter:
+    """Sends writes of threads bound to a run log into that log, everything else to the original stream."""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def target(self):
+        return getattr(_log_binding, "log_file", None) or self.stream
+
+    def write(self, data):
+        return self.target().write(data)
+
+    def flush(self):
+        self.target().flush()
+
+    def fileno(self):
+        return self.target().fileno()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def install_log_router():
+    if not isinstance(sys.stdout, ThreadLogRouter):
+        sys.stdout = ThreadLogRouter(sys.stdout)
+    if not isinstance(sys.stderr, ThreadLogRouter):
+        sys.stderr = ThreadLogRouter(sys.stderr)
+
+class bind_log:
+    def __init__(self, log_file):
+        self.log_file = log_file
+
+    def __enter__(self):
+        self.previous = getattr(_log_binding, "log_file", None)
+        _log_binding.log_file = self.log_file
+        return self.log_file
+
+    def __exit__(self, exc_type, exc, tb):
+        self.log_file.flush()
+        _log_binding.log_file = self.previous
+        return False
+
+def loggable_argument(argument):
+    """`argument` with credentials removed: URL user info and Authorization headers passed through `git -c`."""
+    if "Authorization:" in argument:
+        return argument.split("Authorization:", 1)[0] + "Authorization: ***"
+    return strip_credentials(argument) if "://" in argument else argument
+
+def run_command(command, cwd=None, check=False):
+    """Run `command` with output routed to the run log, charging its CPU time and RSS to the current stage."""
+    loggable_command = [loggable_argument(argument) for argument in command]
+    print(f"[DEBUG] Running command: {' '.join(loggable_command)}")
+    sys.stdout.flush()
+    process = subprocess.Popen(command, cwd=cwd, stdout=sys.stdout, stderr=sys.stderr)
+    _, wait_status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(wait_status)
+
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.record_child(rusage)
+
+    if process.returncode != 0:
+        print(f"[ERROR] Command '{command[0]}' returned non-zero exit status {process.returncode}.")
+        if check:
+            raise subprocess.CalledProcessError(process.returncode, loggable_command)
+    return process.returncode
+
+def run_checked(command, cwd=None):
+    return run_command(command, cwd=cwd, check=True)
+
+def write_json(data, file_path, indent=4, ensure_ascii=False):
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
+
+def remove_path(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+class PipelineContext:
+    def __init__(self, repo_url, repo_name, lan, target_repo_path, start_time, current_date, run_id=None, use_cache=True):
+        self.run_id = run_id
+        self.repo_url = repo_url
+        self.repo_name = repo_name
+        self.lan = lan
+        self.target_repo_path = target_repo_path
+        self.start_time = start_time
+        self.current_date = current_date
+        self.use_cache = use_cache
+        self.artifacts = {}
+        self.sbom_index_lock = threading.Lock()
+        self.cached_sbom_index = None
+
+    def as_payload(self):
+        return {
+            "repo_url": self.repo_url,
+            "repo_name": self.repo_name,
+            "lan": self.lan,
+            "target_repo_path": self.target_repo_path,
+            "start_time": self.start_time,
+            "current_date": self.current_date,
+            "run_id": self.run_id,
+            "use_cache": self.use_cache,
+        }
+
+    def sbom_index(self):
+        """SbomIndex of the final CycloneDX document, built once and shared by the stages after add-cve."""
+        with self.sbom_index_lock:
+            cyclonedx = self.artifacts["cyclonedx"]
+            if self.cached_sbom_index is None or self.cached_sbom_index.sbom is not cyclonedx:
+                components = self.iter_components() if self.streaming else None
+                self.cached_sbom_index = SbomIndex(cyclonedx, components)
+            return self.cached_sbom_index
+
+    @property
+    def streaming(self):
+        return bool(self.artifacts.get("cyclonedx_components_path"))
+
+    def load_cyclonedx(self, file_path):
+        """Load a CycloneDX document, keeping only its header in memory when it is over the streaming threshold."""
+        if is_large_document(file_path, Config.SBOM_STREAMING_THRESHOLD_MB):
+            print(f"[*] {file_path} is larger than {Config.SBOM_STREAMING_THRESHOLD_MB} MB, streaming its components")
+            self.artifacts["cyclonedx"] = JsonObjectReader(file_path, "components").read_header()
+            self.artifacts["cyclonedx_components_path"] = file_path
+        else:
+            self.artifacts["cyclonedx"] = load_json(file_path)
+            self.artifacts["cyclonedx_components_path"] = None
+        self.artifacts["cyclonedx_path"] = file_path
+
+    def restore_artifacts(self, artifacts):
+        """Apply the artifacts of a stage checkpoint.
+
+        The CycloneDX document is checkpointed as the file holding it and reloaded from there, and add-cve only
+        records the vulnerabilities it attached. A file a later stage already replaced is skipped, since the
+        checkpoint of that stage points at the replacement.
+        """
+        self.artifacts.update(artifacts)
+        cyclonedx_path = artifacts.get("cyclonedx_path")
+        if cyclonedx_path and os.path.exists(cyclonedx_path):
+            self.load_cyclonedx(cyclonedx_path)
+        if "vulnerabilities" in artifacts and "cyclonedx" in self.artifacts:
+            self.artifacts["cyclonedx"]["vulnerabilities"] = artifacts["vulnerabilities"]
+
+    def iter_components(self):
+        """Components of the CycloneDX document, read incrementally from disk in streaming mode."""
+        if self.streaming:
+            return JsonObjectReader(self.artifacts["cyclonedx_components_path"], "components").iter_items()
+        return iter(self.artifacts["cyclonedx"].get("components", []))
+
+    @property
+    def cache_keys(self):
+        return self.artifacts.get("cache_keys", {})
+
+    @property
+    def cached_partitions(self):
+        return self.artifacts.setdefault("cached_partitions", [])
+
+    @property
+    def run_name(self):
+        return f"{self.current_date}_{self.start_time}_{self.repo_name}"
+
+    @property
+    def result_public_path(self):
+        return os.path.join(Config.RESULT_PUBLIC_HOME_PATH, self.run_name)
+
+    @property
+    def repo_clone_path(self):
+        return os.path.join(self.target_repo_path, f"{self.repo_name}-repo")
+
+    @property
+    def log_path(self):
+        return os.path.join(self.target_repo_path, "log.txt")
+
+    def path(self, file_name):
+        return os.path.join(self.target_repo_path, file_name)
+
+    def output_path(self, suffix):
+        return self.path(f"{self.current_date}-{self.start_time}-{self.repo_name}-scable-{suffix}")
+
+    @property
+    def extraction_scope(self):
+        return ExtractionScope.for_repository(self.repo_name)
+
+    @property
+    def query_path(self):
+        return query_pack_path(self.lan)
+
+CACHE_PARTITIONS = ("sbom", "codeql", "reachable")
+CODEQL_RESULT_FORMAT = "sarif-latest"
+# The reachable analysis matches vulnerable PyPI packages against Python imports, and only the Python query pack
+# ships scable.ql, so scans of other languages build no CodeQL database at all.
+REACHABILITY_LANGUAGES = ("python",)
+
+def cache_files(context, partition):
+    """Workspace files making up a cache partition, as {cached name: workspace path}."""
+    if partition == "sbom":
+        return {
+            "sbom-cyclonedx.json": context.output_path("CycloneDX.json"),
+            "sbom-spdx.json": context.output_path("SPDX.json"),
+            "sbom-swid.xml": context.output_path("swid.xml"),
+            "sbom-detail.json": context.path("sbom-detail.json"),
+            "sbom-summary.json": context.path("sbom-summary.json"),
+            "packagecheck-summary.json": context.path("packagecheck-summary.json"),
+        }
+    if partition == "codeql":
+        return {"codeql-results.sarif": context.path(f"{context.repo_name}.sarif")}
+    return {"reachable.json": context.path("reachable.json")}
+
+def get_cache_keys(context, commit, manifests):
+    # The repository is part of the key: the SBOM documents carry its name and bom-ref in metadata.component,
+    # so repositories with identical manifests must not share an entry.
+    sbom_key = cache_key("sbom", strip_credentials(context.repo_url), context.repo_name, context.lan, manifests,
+                         context.artifacts["advisory_snapshot"], context.artifacts["package_check_enabled"])
+    # The sinks of the query are the modules of the vulnerable packages, which the SBOM inputs determine.
+    codeql_key = cache_key("codeql", sbom_key, context.lan, commit, context.artifacts["query_fingerprint"],
+                           codeql_version(), context.extraction_scope.fingerprint(), CODEQL_RESULT_FORMAT)
+    return {"sbom": sbom_key, "codeql": codeql_key, "reachable": cache_key("reachable", sbom_key, codeql_key)}
+
+def load_json(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def restore_partitions(context, partitions):
+    cache = ResultCache()
+    for partition in partitions:
+        cache.restore(context.cache_keys[partition], cache_files(context, partition))
+        if partition == "sbom":
+            context.load_cyclonedx(context.output_path("CycloneDX.json"))
+            if os.path.exists(context.path("sbom-detail.json")):
+                context.artifacts["sbom_detail"] = load_json(context.path("sbom-detail.json"))
+        elif partition == "reachable":
+            context.artifacts["reachable"] = load_json(context.path("reachable.json"))
+            # The CodeQL results are only read by the reachable analysis, so they are not needed either.
+            if "codeql" not in context.cached_partitions:
+                context.cached_partitions.append("codeql")
+        if partition not in context.cached_partitions:
+            context.cached_partitions.append(partition)
+        print(f"[*] Restored '{partition}' results from cache {context.cache_keys[partition][:12]}")
+
+def prepare_result(context):
+    os.makedirs(context.result_public_path, exist_ok=True)
+    load_script("etc/analyze-repo-update.py").update_analyze_repo(
+        context.current_date, context.start_time, context.repo_name
+    )
+
+def resolve_cache(context):
+    """Fingerprint everything except the source tree and, if the commit was scanned before, restore a full hit."""
+    if not context.use_cache:
+        print("[*] Result cache disabled for this run.")
+        return
+    context.artifacts["query_fingerprint"] = query_fingerprint(context.query_path)
+    context.artifacts["advisory_snapshot"] = advisory_snapshot_version()
+    context.artifacts["package_check_enabled"] = bool(Config.get_setting("GITHUB_API_TOKEN", ""))
+
+    commit = resolve_commit(context.repo_url)
+    known_commit = ResultCache().get_commit(commit) if commit else None
+    if known_commit is None:
+        return
+    context.artifacts["cache_keys"] = get_cache_keys(context, commit, known_commit["manifests"])
+    cache = ResultCache()
+    if all(cache.has(context.cache_keys[partition]) for partition in ("sbom", "reachable")):
+        restore_partitions(context, ["sbom", "reachable"])
+        context.cached_partitions.append("source")
+        print(f"[*] Commit {commit} was scanned before. Skipping checkout.")
+
+def restore_cache(context):
+    """Fingerprint the checked out source and restore every partition whose inputs are unchanged."""
+    if not context.use_cache:
+        return
+    # Local snapshots leave out .git, so the commit of a local repository is read from the original path.
+    local_commit = working_tree_commit(context.repo_url) if "://" not in context.repo_url else None
+    commit = local_commit or source_fingerprint(context.repo_clone_path)
+    manifests = manifest_fingerprint(context.repo_clone_path)
+    cache = ResultCache()
+    if not commit.startswith("tree-"):
+        cache.put_commit(commit, {"manifests": manifests})
+    context.artifacts["source_commit"] = commit
+    context.artifacts["cache_keys"] = get_cache_keys(context, commit, manifests)
+    restore_partitions(context, [partition for partition in CACHE_PARTITIONS if cache.has(context.cache_keys[partition])])
+
+def store_cache(context, partition):
+    if not context.cache_keys or partition in context.cached_partitions:
+        return
+    # A skipped CodeQL analysis leaves no results, which must not be cached as "no findings" for the commit.
+    if not any(os.path.exists(path) for path in cache_files(context, partition).values()):
+        print(f"[*] No '{partition}' results to store in cache")
+        return
+    try:
+        ResultCache().store(context.cache_keys[partition], cache_files(context, partition),
+                            meta={"partition": partition, "run_name": context.run_name})
+        print(f"[*] Stored '{partition}' results in cache {context.cache_keys[partition][:12]}")
+    except OSError as e:
+        print(f"[ERROR] Failed to store '{partition}' results in cache: {e}")
+
+def checkout_source(context):
+    if "://" in context.repo_url:
+        os.makedirs(context.target_repo_path, exist_ok=True)
+        MirrorCache().checkout(context.repo_url, context.repo_clone_path, run=run_checked)
+        return
+    load_script("create-sbom/cdxgen.py").prepare_source(
+        context.repo_url, context.repo_name, context.target_repo_path, run=run_checked,
+        snapshot_mode=Config.LOCAL_SNAPSHOT_MODE, ignore_patterns=Config.LOCAL_SNAPSHOT_IGNORE_PATTERNS
+    )
+
+def generate_cyclonedx(context):
+    cdxgen = load_script("create-sbom/cdxgen.py")
+    sbom_path = cdxgen.run_cdxgen(context.repo_clone_path, context.repo_name, context.target_repo_path, run=run_checked)
+    # Kept until emit-sbom writes CycloneDX.json: streamed components are read from it and a resumed run reloads it.
+    # The dot keeps it out of the archive.
+    raw_path = context.path(".cyclonedx-raw.json")
+    shutil.move(sbom_path, raw_path)
+    context.load_cyclonedx(raw_path)
+
+def open_advisory_cache():
+    return load_script("create-sbom/add_cve.py").AdvisoryCache(
+        Config.OSV_CACHE_PATH, Config.OSV_CACHE_TTL_HOURS, Config.OSV_NEGATIVE_CACHE_TTL_HOURS
+    )
+
+def add_cve(context):
+    add_cve_script = load_script("create-sbom/add_cve.py")
+    offline_store = add_cve_script.OfflineAdvisoryStore(Config.OSV_OFFLINE_DB_PATH) if Config.OSV_OFFLINE_DB_PATH else None
+    add_cve_script.add_vulnerabilities(
+        context.artifacts["cyclonedx"], Config.NVD_CVSS_CSV_PATH, Config.NVD_FEED_DIRECTORY,
+        stats=current_counters(), osv_base_url=Config.OSV_API_BASE_URL,
+        advisory_cache=None if offline_store else open_advisory_cache(), offline_store=offline_store,
+        components=context.iter_components()
+    )
+    context.artifacts["vulnerabilities"] = context.artifacts["cyclonedx"]["vulnerabilities"]
+
+class SpdxOutput:
+    """SPDX document written package by package while the CycloneDX components are traversed."""
+    def __init__(self, cyclonedx, output_path, vulnerabilities_by_ref):
+        self.spdx = load_script("create-sbom/spdx.py")
+        self.document = self.spdx.create_spdx_document(cyclonedx)
+        self.seen_packages, self.package_refs = set(), {}
+        self.vulnerabilities_by_ref = vulnerabilities_by_ref
+        self.output = JsonDocumentStream(output_path, self.document, "packages", indent=2)
+
+    def add(self, component):
+        self.spdx.add_component_package(self.document, component, self.seen_packages, self.package_refs,
+                                        self.vulnerabilities_by_ref)
+        for package in self.document["packages"]:
+            self.output.write_item(package)
+        self.document["packages"].clear()
+
+    def finish(self, cyclonedx):
+        self.spdx.add_dependency_relationships(cyclonedx, self.document, self.package_refs)
+        self.output.finish()
+
+class SwidOutput:
+    def __init__(self, cyclonedx, output_path, vulnerabilities_by_ref=None):
+        self.converter = load_script("create-sbom/swid.py").CycloneDXToSWIDConverter(sbom_data=cyclonedx)
+        self.writer = self.converter.open_writer(output_path)
+
+    def add(self, component):
+        self.converter.add_component(self.writer, component)
+
+    def finish(self, cyclonedx):
+        self.writer.close()
+
+# Derived SBOM formats as {format: (output class, workspace suffix, published file name)}.
+SBOM_FORMATS = {
+    "spdx": (SpdxOutput, "SPDX.json", "sbom-spdx.json"),
+    "swid": (SwidOutput, "swid.xml", "sbom-swid.xml"),
+}
+PUBLISHED_SBOM_FILES = {"sbom-cyclonedx.json": None, **{published: name for name, (_, _, published) in SBOM_FORMATS.items()}}
+
+def render_sbom_format(cyclonedx_path, sbom_format, output_path):
+    """Generate an SPDX or SWID document from a stored CycloneDX document in one pass over its components."""
+    if is_large_document(cyclonedx_path, Config.SBOM_STREAMING_THRESHOLD_MB):
+        reader = JsonObjectReader(cyclonedx_path, "components")
+        cyclonedx, components = reader.read_header(), reader.iter_items()
+    else:
+        cyclonedx = load_json(cyclonedx_path)
+        components = cyclonedx.get("components", [])
+    output_class = SBOM_FORMATS[sbom_format][0]
+    vulnerabilities_by_ref = load_script("create-sbom/spdx.py").group_vulnerabilities_by_ref(cyclonedx)
+    output = output_class(cyclonedx, f"{output_path}.tmp", vulnerabilities_by_ref)
+    for component in components:
+        output.add(component)
+    output.finish(cyclonedx)
+    os.replace(f"{output_path}.tmp", output_path)
+
+def get_published_sbom(run_name, file_name):
+    """Path of a published SBOM document of a run; SPDX and SWID are rendered from its CycloneDX document on
+    first request and kept next to it. Returns None when the run or its CycloneDX document does not exist."""
+    result_path = os.path.join(Config.RESULT_PUBLIC_HOME_PATH, run_name)
+    cyclonedx_path = os.path.join(result_path, "sbom-cyclonedx.json")
+    if not os.path.isfile(cyclonedx_path):
+        return None
+    if file_name == "sbom-cyclonedx.json":
+        return cyclonedx_path
+    output_path = os.path.join(result_path, file_name)
+    with FileLock(os.path.join(result_path, f".{file_name}.lock")):
+        if not os.path.exists(output_path):
+            print(f"[*] Rendering {file_name} for {run_name}")
+            render_sbom_format(cyclonedx_path, PUBLISHED_SBOM_FILES[file_name], output_path)
+    return output_path
+
+def emit_sbom(context):
+    """Build the detail and summary documents, and the SPDX/SWID documents listed in Config.SBOM_EAGER_FORMATS,
+    in one traversal of the enriched SBOM and write them together with the CycloneDX document.
+
+    Formats that are not eager are rendered on first download (see get_published_sbom)."""
+    detail = load_script("package-check/detail.py")
+    sbom_summary = load_script("package-check/sum.py")
+    cyclonedx = context.artifacts["cyclonedx"]
+    index = context.sbom_index()
+
+    outputs = [SBOM_FORMATS[sbom_format][0](cyclonedx, context.output_path(SBOM_FORMATS[sbom_format][1]),
+                                            index.vulnerabilities_by_ref)
+               for sbom_format in Config.SBOM_EAGER_FORMATS]
+    detail_rows, detail_seen_components = [], set()
+    summary = sbom_summary.create_summary(cyclonedx)
+
+    # Documents are written while the components are traversed, so a streamed SBOM is never held whole.
+    components_path = context.artifacts.get("cyclonedx_components_path")
+    raw_path = context.artifacts.get("cyclonedx_path")
+    cyclonedx_path = context.output_path("CycloneDX.json")
+    # Written aside first because a restored streaming run reads its components from CycloneDX.json itself.
+    cyclonedx_output = JsonDocumentStream(f"{cyclonedx_path}.tmp", cyclonedx, "components", indent=2)
+    component_count = 0
+    for component in context.iter_components():
+        component_count += 1
+        cyclonedx_output.write_item(component)
+        for output in outputs:
+            output.add(component)
+        detail.add_component_detail(detail_rows, detail_seen_components, component,
+                                    index.vulnerabilities_by_ref, index.dependencies_by_ref)
+        sbom_summary.add_component_summary(summary, component)
+    if not component_count:
+        # The summary falls back to the components nested under metadata.component.
+        for component in sbom_summary.summary_components(cyclonedx):
+            sbom_summary.add_component_summary(summary, component)
+    sbom_summary.finish_summary(summary, cyclonedx)
+    context.artifacts["sbom_detail"] = {"components": detail_rows}
+    context.artifacts["component_count"] = component_count
+
+    cyclonedx_output.finish()
+    os.replace(f"{cyclonedx_path}.tmp", cyclonedx_path)
+    for output in outputs:
+        output.finish(cyclonedx)
+    context.artifacts["cyclonedx_path"] = cyclonedx_path
+    if components_path:
+        context.artifacts["cyclonedx_components_path"] = cyclonedx_path
+    if raw_path and raw_path != cyclonedx_path:
+        remove_path(raw_path)
+    write_json(context.artifacts["sbom_detail"], context.path("sbom-detail.json"))
+    write_json(summary, context.path("sbom-summary.json"))
+
+def build_codeql_database(context, database_path):
+    config_path = context.extraction_scope.write_codeql_config(context.path("codeql-config.yml"))
+    return run_command([
+        "codeql", "database", "create", database_path,
+        f"--language={context.lan}", f"--source-root={context.repo_clone_path}", "--overwrite",
+        f"--codescanning-config={config_path}"
+    ]) == 0
+
+def report_extraction_scope(context):
+    report = context.extraction_scope.exclusion_report(context.repo_clone_path)
+    print(f"[*] Extraction scope: {report['included_files']} files included")
+    for rule, count in report["excluded_files"].items():
+        print(f"[*] Extraction scope: {count} files excluded by '{rule}'")
+    write_json(report, context.path(EXTRACTION_SCOPE_FILE_NAME))
+
+def reachability_supported(context):
+    return context.lan in REACHABILITY_LANGUAGES
+
+def create_codeql_database(context):
+    """Reuse the database of the scanned commit from the CodeQL database cache, or build it in the workspace without one."""
+    if not reachability_supported(context):
+        print(f"[*] No reachable analysis for {context.lan}, skipping the CodeQL database")
+        return
+    report_extraction_scope(context)
+    commit = context.artifacts.get("source_commit")
+    extractor_version = codeql_version()
+    database_path = None
+    if commit and extractor_version:
+        cache = CodeqlDatabaseCache()
+        key = cache.database_key(context.repo_url, commit, context.lan, extractor_version,
+                                 context.extraction_scope.fingerprint())
+        database_path = cache.checkout(key, lambda path: build_codeql_database(context, path))
+    if database_path is None:
+        database_path = context.path("repo-db")
+        build_codeql_database(context, database_path)
+    context.artifacts["codeql_database"] = database_path
+
+def vulnerable_packages(context):
+    return list(load_script("reachable/sbom-cve.py").find_vulnerable_packages(context.artifacts["cyclonedx"]))
+
+VULNERABLE_MODULES_PACK = "scable/vulnerable-modules"
+VULNERABLE_MODULES_PACK_DIRECTORY = ".vulnerable-modules"
+
+def write_vulnerable_modules_pack(context, import_form):
+    """Write the model pack filling the scableVulnerableModule predicate of scable.ql and return its directory.
+
+    Packages whose wheel lists no top-level modules are given under their own name.
+    """
+    modules = sorted({module for package, top_level in import_form
+                      for module in top_level or [package.lower().replace("-", "_")]})
+    pack_path = context.path(VULNERABLE_MODULES_PACK_DIRECTORY)
+    os.makedirs(pack_path, exist_ok=True)
+    # JSON is valid YAML, and quotes the module names safely.
+    with open(os.path.join(pack_path, "qlpack.yml"), "w", encoding="utf-8") as f:
+        json.dump({"name": VULNERABLE_MODULES_PACK, "version": "0.0.0", "library": True,
+                   "extensionTargets": {"codeql/python-queries": "*"},
+                   "dataExtensions": ["vulnerable-modules.model.yml"]}, f, indent=2)
+    with open(os.path.join(pack_path, "vulnerable-modules.model.yml"), "w", encoding="utf-8") as f:
+        json.dump({"extensions": [{
+            "addsTo": {"pack": "codeql/python-queries", "extensible": "scableVulnerableModule"},
+            "data": [[module] for module in modules],
+        }]}, f, indent=2)
+    return pack_path
+
+def analyze_codeql_database(context):
+    if not reachability_supported(context):
+        return
+    packages = vulnerable_packages(context)
+    if not packages:
+        print("[*] No vulnerable packages in the SBOM, skipping the CodeQL analysis")
+        return
+    context.artifacts["import_form"] = resolve_top_level_modules(context, packages)
+    pack_path = write_vulnerable_modules_pack(context, context.artifacts["import_form"])
+    database_path = context.artifacts.get("codeql_database", context.path("repo-db"))
+    # Normally compiled at startup already; this only compiles when the queries changed since.
+    compilation_cache = QueryCompilationCache()
+    compiled = compilation_cache.ensure_compiled(context.query_path, context.artifacts.get("query_fingerprint"))
+    with CodeqlDatabaseCache().in_use(database_path):
+        run_command([
+            "codeql", "database", "analyze", database_path, context.query_path,
+            "--ram", "4096", "--threads=0", f"--format={CODEQL_RESULT_FORMAT}",
+            f"--output={context.path(f'{context.repo_name}.sarif')}",
+            f"--additional-packs={pack_path}", f"--model-packs={VULNERABLE_MODULES_PACK}"
+        ] + (compilation_cache.analyze_options() if compiled else []))
+
+def resolve_top_level_modules(context, packages):
+    """Top-level modules of each vulnerable package, read from the wheels of its affected versions."""
+    package_versions = load_script("reachable/sbom-cve.py").find_vulnerable_package_versions(context.artifacts["cyclonedx"])
+    top_level = TopLevelIndex().lookup(sorted(package_versions), stats=current_counters())
+    modules = {package: [] for package in packages}
+    for (package, _), names in sorted(top_level.items()):
+        known = modules.setdefault(package, [])
+        known += [name for name in names if name not in known]
+    return [(package, modules[package]) for package in packages]
+
+def collect_reachable(context):
+    packages = vulnerable_packages(context) if reachability_supported(context) else []
+    if not packages:
+        return []
+    findings = read_findings(context.path(f"{context.repo_name}.sarif"))
+    imports = load_script("reachable/import-parsing.py").find_imports_in_project(
+        context.repo_clone_path, context.extraction_scope
+    )
+    # Already resolved for the sinks of the query unless the CodeQL results came from the cache.
+    import_form = context.artifacts.get("import_form") or resolve_top_level_modules(context, packages)
+    debug_path = context.path("reachable-debug") if Config.REACHABLE_DEBUG_OUTPUT else None
+    return reachable_entries(findings, imports, import_form, packages, debug_path)
+
+def analyze_reachable(context):
+    context.artifacts["reachable"] = collect_reachable(context)
+    # Kept when the analysis fails so that a resumed run can reuse the clone and repo-db.
+    for name in ("repo-db", f"{context.repo_name}-repo", f"{context.repo_name}.sarif", "codeql-config.yml",
+                 VULNERABLE_MODULES_PACK_DIRECTORY):
+        remove_path(context.path(name))
+    write_json(context.artifacts["reachable"], context.path("reachable.json"))
+
+def check_malicious_packages(context):
+    api_token = Config.get_setting("GITHUB_API_TOKEN", "")
+    if not api_token:
+        print("[ERROR] GitHub API Token is missing in settings.json.")
+        return
+
+    checker = load_script("package-check/malicious-package-check.py")
+    famous_libraries, typo_checker = checker.get_typo_resources()
+    sbom_detail = checker.prepare_components(context.artifacts["sbom_detail"])
+    summary = checker.analyze_components(
+        sbom_detail, famous_libraries, typo_checker, api_token, stats=current_counters()
+    )
+    write_json(sbom_detail, context.path("sbom-detail.json"), ensure_ascii=True)
+    write_json(summary, context.path("packagecheck-summary.json"), ensure_ascii=True)
+
+def record_end_time(context):
+    context.artifacts["end_time"] = datetime.now(Config.SEOUL_TIME_ZONE).strftime("%H-%M-%S")
+    Database.update_sbom_end_time(context.current_date, context.start_time, context.repo_name, context.artifacts["end_time"])
+
+def merge_dependencies(context):
+    dependency_graph = load_script("etc/merge.py").build_dependency_graph(
+        context.artifacts.get("sbom_detail") or {"components": []},
+        context.artifacts["cyclonedx"],
+        context.artifacts.get("reachable") or [],
+        context.sbom_index()
+    )
+    write_json(dependency_graph, context.path("dependency.json"))
+    print("[+] merge ok")
+
+def diff_previous_run(context):
+    """Write diff.json with the changes since the previous completed run of the same repository."""
+    if context.run_id is None:
+        return
+    try:
+        previous_run = Database.get_previous_sbom_run(context.run_id)
+        if previous_run is None:
+            print(f"[*] No previous run of {context.repo_name} to compare with.")
+            return
+        previous = load_run_index(run_result_path(previous_run))
+        if previous is None:
+            print(f"[*] Results of the previous run {previous_run['run_id']} are no longer available, skipping the diff.")
+            return
+        current = RunIndex(context.artifacts.get("sbom_detail"), context.artifacts.get("reachable"))
+        diff = {"previous_run_id": previous_run["run_id"], **diff_runs(previous, current)}
+        write_json(diff, context.path(DIFF_FILE_NAME))
+        print(f"[*] Changes since run {previous_run['run_id']}: {diff['summary']}")
+    except Exception as e:
+        print(f"[ERROR] Failed to compare with the previous run: {e}")
+
+def publish_result(context):
+    for file_name in ("reachable.json", "packagecheck-summary.json", "sbom-detail.json", "sbom-summary.json", "dependency.json",
+                      DIFF_FILE_NAME, EXTRACTION_SCOPE_FILE_NAME):
+        if os.path.exists(context.path(file_name)):
+            shutil.move(context.path(file_name), os.path.join(context.result_public_path, file_name))
+    for suffix, file_name in (("CycloneDX.json", "sbom-cyclonedx.json"), ("SPDX.json", "sbom-spdx.json"), ("swid.xml", "sbom-swid.xml")):
+        if os.path.exists(context.output_path(suffix)):
+            shutil.copy(context.output_path(suffix), os.path.join(context.result_public_path, file_name))
+
+def archive_result(context):
+    zip_path = context.path(f"{context.repo_name}-scable.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for entry in sorted(os.listdir(context.target_repo_path)):
+            entry_path = context.path(entry)
+            if entry.startswith(".") or entry_path == zip_path:
+                continue
+            if os.path.isdir(entry_path):
+                for dirpath, _, filenames in os.walk(entry_path):
+                    for filename in filenames:
+                        file_path = os.path.join(dirpath, filename)
+                        archive.write(file_path, os.path.relpath(file_path, context.target_repo_path))
+            else:
+                archive.write(entry_path, entry)
+
+def notify_slack(context):
+    settings = Config.load_settings()
+    required_keys = ["SLACK_WEBHOOK_URL", "SLACK_TOKEN", "USER_TAG", "SLACK_CHANNEL_ID"]
+    if any(not settings.get(key) for key in required_keys):
+        print("[!] Required SLACK configuration values are missing. Skipping Slack notification.")
+        return
+    try:
+        load_script("etc/slack-webhook.py").notify_scan_result(
+            context.repo_name, context.target_repo_path, context.start_time,
+            context.artifacts.get("end_time"), context.current_date
+        )
+    except Exception as e:
+        print(f"[ERROR] Slack notification failed: {e}")
+
+class PipelineRunner:
+    GROUP_BANNERS = {
+        "create-sbom": "[+] CREATE SBOM COMPLETE",
+        "reachable": "[+] REACHABLE ANALYZE COMPLETE",
+        "package-check": "[+] PACKAGE ANALYZE COMPLETE",
+        "finishing-work": "[+] FINISHING WORK COMPLETE",
+    }
+
+    # The CycloneDX document is checkpointed as "cyclonedx_path", the file it is reloaded from (see restore_artifacts).
+    CACHE_ARTIFACTS = ["cache_keys", "cached_partitions", "cyclonedx_path", "sbom_detail", "reachable"]
+
+    STAGES = [
+        Stage("prepare-result", prepare_result, provides=["result-dir"], group="create-sbom"),
+        Stage("resolve-cache", resolve_cache, provides=["cache-plan"], group="create-sbom",
+              checkpoint=["query_fingerprint", "advisory_snapshot", "package_check_enabled"] + CACHE_ARTIFACTS),
+        Stage("checkout", checkout_source, requires=["cache-plan"], provides=["source"], group="create-sbom",
+              cache_partition="source"),
+        Stage("restore-cache", restore_cache, requires=["source"], provides=["fingerprint"], group="create-sbom",
+              cache_partition="source", checkpoint=CACHE_ARTIFACTS + ["source_commit"]),
+        Stage("cdxgen", generate_cyclonedx, requires=["fingerprint"], provides=["cyclonedx-raw"], group="create-sbom",
+              cache_partition="sbom", checkpoint=["cyclonedx_path"]),
+        Stage("add-cve", add_cve, requires=["cyclonedx-raw"], provides=["cyclonedx"], group="create-sbom",
+              cache_partition="sbom", checkpoint=["vulnerabilities"]),
+        Stage("emit-sbom", emit_sbom, requires=["cyclonedx"], provides=["sbom-documents", "sbom-detail", "sbom-summary"],
+              group="create-sbom", cache_partition="sbom",
+              checkpoint=["sbom_detail", "cyclonedx_path", "component_count"]),
+        Stage("codeql-database", create_codeql_database, requires=["fingerprint"], provides=["codeql-database"],
+              group="reachable", cache_partition="codeql", checkpoint=["codeql_database"]),
+        Stage("codeql-analyze", analyze_codeql_database, requires=["codeql-database", "cyclonedx"],
+              provides=["codeql-results"], group="reachable", cache_partition="codeql"),
+        Stage("reachable", analyze_reachable, requires=["codeql-results", "cyclonedx", "cyclonedx-raw"],
+              provides=["reachable"], group="reachable", cache_partition="reachable", checkpoint=["reachable"]),
+        Stage("package-check", check_malicious_packages, requires=["sbom-detail"], provides=["package-check"],
+              group="package-check", cache_partition="sbom", checkpoint=["sbom_detail"]),
+        Stage("end-time", record_end_time, requires=["sbom-documents", "reachable", "sbom-summary", "package-check"],
+              provides=["end-time"], group="finishing-work", checkpoint=["end_time"]),
+        Stage("merge", merge_dependencies, requires=["package-check", "reachable"], provides=["dependency"], group="finishing-work"),
+        Stage("diff", diff_previous_run, requires=["package-check", "reachable"], provides=["diff"], group="finishing-work"),
+        Stage("publish", publish_result, requires=["result-dir", "end-time", "dependency", "diff"], provides=["published"],
+              group="finishing-work"),
+        Stage("archive", archive_result, requires=["published"], provides=["archive"], group="finishing-work"),
+        Stage("notify", notify_slack, requires=["archive"], group="finishing-work"),
+    ]
+
+    def __init__(self, context, max_workers=None):
+        self.context = context
+        self.scheduler = StageScheduler(self.STAGES, max_workers or Config.PIPELINE_STAGE_CONCURRENCY)
+        self.stage_metrics = []
+        self.checkpoints = CheckpointStore(context.target_repo_path)
+        self.completion_tokens = {}
+        self.executed_partitions = set()
+        self.providers = {artifact: stage.name for stage in self.STAGES for artifact in stage.provides}
+        install_log_router()
+
+    def stage_inputs(self, stage):
+        parameters = {"repo_url": self.context.repo_url, "lan": self.context.lan, "use_cache": self.context.use_cache}
+        upstream_tokens = {self.completion_tokens[self.providers[artifact]] for artifact in stage.requires}
+        return input_fingerprint(stage.name, parameters, upstream_tokens)
+
+    def run_stage(self, stage, metrics):
+        inputs = self.stage_inputs(stage)
+        checkpoint = self.checkpoints.load(stage.name, inputs)
+        if checkpoint is not None:
+            self.context.restore_artifacts(checkpoint["artifacts"])
+            self.completion_tokens[stage.name] = checkpoint["token"]
+            metrics.status = "reused"
+            print(f"[*] Stage '{stage.name}' already completed at {checkpoint['completed_at']}, reusing its checkpoint")
+            return
+
+        if stage.cache_partition in self.context.cached_partitions:
+            metrics.status = "cached"
+            metrics.count("cache_hits")
+            print(f"[*] Stage '{stage.name}' skipped, its results were restored from cache")
+        else:
+            stage.run(self.context)
+            self.executed_partitions.add(stage.cache_partition)
+
+        artifacts = {name: self.context.artifacts[name] for name in stage.checkpoint if name in self.context.artifacts}
+        self.completion_tokens[stage.name] = self.checkpoints.save(stage.name, inputs, artifacts)
+
+    def execute(self, stage, log_file):
+        metrics = StageMetrics(stage.name)
+        self.stage_metrics.append(metrics)
+        with bind_log(log_file):
+            print(f"[*] Stage '{stage.name}' started")
+            try:
+                with metrics:
+                    self.run_stage(stage, metrics)
+            except BaseException:
+                print(f"[ERROR] Stage '{stage.name}' failed:\n{traceback.format_exc()}")
+                raise
+            finally:
+                cyclonedx = self.context.artifacts.get("cyclonedx")
+                if self.context.streaming:
+                    metrics.component_count = self.context.artifacts.get("component_count")
+                elif cyclonedx is not None:
+                    metrics.component_count = len(cyclonedx.get("components", []))
+            print(f"[*] Stage '{stage.name}' completed in {metrics.wall_seconds:.1f}s")
+
+    def save_stage_metrics(self):
+        try:
+            Database.insert_stage_metrics(
+                self.context.run_id, self.context.run_name, [metrics.as_record() for metrics in self.stage_metrics]
+            )
+        except Exception as e:
+            print(f"[ERROR] Failed to save stage metrics for {self.context.run_name}: {e}")
+
+    def run(self):
+        """Run the stage graph in-process, yielding the progress lines shown to the client."""
+        yield "\n"
+        yield "\033[32m[*] SCABLE ANALYZE START\033[0m\n"
+        os.makedirs(self.context.target_repo_path, exist_ok=True)
+        self.checkpoints.save_context(self.context.as_payload())
+
+        remaining = {}
+        uncached = {}
+        for stage in self.STAGES:
+            remaining[stage.group] = remaining.get(stage.group, 0) + 1
+            uncached[stage.cache_partition] = uncached.get(stage.cache_partition, 0) + 1
+
+        with open(self.context.log_path, "a", encoding="utf-8") as log_file:
+            try:
+                for stage in self.scheduler.run(lambda stage: self.execute(stage, log_file)):
+                    remaining[stage.group] -= 1
+                    uncached[stage.cache_partition] -= 1
+                    if uncached[stage.cache_partition] == 0 and stage.cache_partition in self.executed_partitions & set(CACHE_PARTITIONS):
+                        # Stored before the scheduler resumes, so no later stage has moved the files yet.
+                        with bind_log(log_file):
+                            store_cache(self.context, stage.cache_partition)
+                    if remaining[stage.group] == 0 and stage.group in self.GROUP_BANNERS:
+                        yield f"\033[32m{self.GROUP_BANNERS[stage.group]}\033[0m\n"
+            finally:
+                self.save_stage_metrics()
+        yield "\n"
@@ -0,0 +1,131 @@
+from engine.moduleResolver import ModuleResolver
+from urllib.parse import unquote
+import csv
+import json
+import os
+
+class Finding:
+    """One line of a CodeQL result message with the location of its sink."""
+    __slots__ = ("text", "path", "line")
+
+    def __init__(self, text, path, line):
+        self.text = text
+        self.path = path
+        self.line = line
+
+def message_findings(message, path, line):
+    for text in message.replace('"', "").splitlines():
+        text = text.strip()
+        if text:
+            yield Finding(text, path, line)
+
+def read_sarif(file_path):
+    """Yield the findings of a SARIF file written by `codeql database analyze --format=sarif-latest`."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        sarif = json.load(f)
+    for run in sarif.get("runs", []):
+        for result in run.get("results", []):
+            locations = result.get("locations") or [{}]
+            physical_location = locations[0].get("physicalLocation", {})
+            # The CSV output, which the reachable results were built from before, has root-relative paths with a leading '/'.
+            path = "/" + unquote(physical_location.get("artifactLocation", {}).get("uri", ""))
+            line = str(physical_location.get("region", {}).get("startLine", ""))
+            yield from message_findings(result.get("message", {}).get("text", ""), path, line)
+
+def read_csv(file_path):
+    """Yield the findings of a CSV file written by `codeql database analyze --format=csv`."""
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) > 5:
+                yield from message_findings(row[3], row[4], row[5])
+
+def read_findings(file_path):
+    if not os.path.exists(file_path):
+        print(f"Warning: CodeQL result '{file_path}' not found.")
+        return iter(())
+    return read_sarif(file_path) if file_path.endswith(".sarif") else read_csv(file_path)
+
+def line_range(lines):
+    numbers = sorted({int(line) for line in lines})
+    return str(numbers[0]) if len(numbers) == 1 else f"{numbers[0]}~{numbers[-1]}"
+
+class SinkGroup:
+    """Distinct findings sharing a sink function, the first word of their message."""
+    __slots__ = ("findings", "lines")
+
+    def __init__(self):
+        self.findings = []
+        self.lines = []
+
+def group_findings(findings):
+    groups = {}
+    seen_texts = set()
+    for finding in findings:
+        sink_function = finding.text.split(None, 1)[0]
+        group = groups.setdefault(sink_function, SinkGroup())
+        group.lines.append(finding.line)
+        if finding.text not in seen_texts:
+            seen_texts.add(finding.text)
+            group.findings.append(finding)
+    return groups
+
+def build_library_mapping(import_form):
+    """Map each top-level module of the vulnerable packages to the package.
+
+    Packages without top_level.txt are only matched by name, through the requirements fallback of ModuleResolver.
+    """
+    library_mapping = {}
+    for package, top_level in import_form:
+        for module in top_level:
+            library_mapping[module.lower()] = package.lower()
+    return library_mapping
+
+def candidate(finding, range_text, resolver):
+    """The reachable entry of a finding, laid out by position like the space separated records it replaces."""
+    parts = finding.text.split() + finding.path.split() + [range_text]
+    if len(parts) < 7:
+        return None
+    module = resolver.imported_module(" ".join(parts[1:4]))
+    if not module:
+        return None
+    return {"sink-function": parts[0], "reachable-library": module, "library-function": parts[4],
+            "path": parts[5], "line": parts[6]}
+
+def reachable_entries(findings, imports, import_form, packages, debug_path=None):
+    """Reachable vulnerable packages of the CodeQL findings: the first finding of each sink function whose library
+    name names an import of the project, mapped to the vulnerable package providing that import."""
+    groups = group_findings(findings)
+    resolver = ModuleResolver(imports, build_library_mapping(import_form), {package.lower() for package in packages})
+
+    candidates = []
+    for group in groups.values():
+        range_text = line_range(group.lines)
+        entry = next(filter(None, (candidate(finding, range_text, resolver) for finding in group.findings)), None)
+        if entry:
+            candidates.append(entry)
+
+    entries = []
+    for entry in candidates:
+        package = resolver.package_of(entry["reachable-library"].lower())
+        if package:
+            entries.append(dict(entry, **{"reachable-library": package}))
+
+    if debug_path:
+        write_debug_files(debug_path, groups, imports, import_form, candidates)
+    return entries
+
+def write_debug_files(debug_path, groups, imports, import_form, candidates):
+    os.makedirs(debug_path, exist_ok=True)
+    with open(os.path.join(debug_path, "findings.txt"), "w", encoding="utf-8") as f:
+        for group in groups.values():
+            range_text = line_range(group.lines)
+            for finding in group.findings:
+                f.write(f"{finding.text} {finding.path} {range_text}\n")
+    with open(os.path.join(debug_path, "import-parsing.txt"), "w", encoding="utf-8") as f:
+        for item in imports:
+            f.write(f"{item['module']} {item['alias']} {item['function']}\n")
+    with open(os.path.join(debug_path, "import-form.txt"), "w", encoding="utf-8") as f:
+        for package, top_level in import_form:
+            f.write(f"{package} {' '.join(top_level) or 'None'}\n")
+    with open(os.path.join(debug_path, "reachable-candidates.json"), "w", encoding="utf-8") as f:
+        json.dump(candidates, f, ensure_ascii=False, indent=4)
@@ -0,0 +1,175 @@
+from config import Config
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import time
+import uuid
+
+MANIFEST_FILE_PATTERNS = (
+    "requirements*.txt", "setup.py", "setup.cfg", "pyproject.toml", "Pipfile", "Pipfile.lock", "poetry.lock",
+    "package.json", "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml",
+    "pom.xml", "build.gradle", "build.gradle.kts", "settings.gradle", "gradle.lockfile",
+)
+IGNORED_DIRECTORIES = {".git", "node_modules", "__pycache__", ".venv", "venv", ".tox"}
+
+def hash_files(root, relative_paths):
+    digest = hashlib.sha256()
+    for relative_path in sorted(relative_paths):
+        digest.update(relative_path.encode("utf-8") + b"\0")
+        with open(os.path.join(root, relative_path), "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def walk_files(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in IGNORED_DIRECTORIES]
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            if os.path.isfile(file_path):
+                yield os.path.relpath(file_path, root)
+
+def manifest_fingerprint(source_root):
+    """Hash every dependency manifest and lockfile in the source tree."""
+    manifests = [path for path in walk_files(source_root)
+                 if any(fnmatch.fnmatch(os.path.basename(path), pattern) for pattern in MANIFEST_FILE_PATTERNS)]
+    return hash_files(source_root, manifests)
+
+def tree_fingerprint(root):
+    return hash_files(root, list(walk_files(root)))
+
+def git_output(command, cwd=None):
+    try:
+        result = subprocess.run(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def resolve_commit(source_path):
+    """Return the commit `source_path` points at without cloning it, or None when it is unknown or dirty."""
+    if "://" in source_path:
+        output = git_output(["git", "ls-remote", source_path, "HEAD"])
+        return output.split()[0] if output else None
+    return working_tree_commit(source_path)
+
+def working_tree_commit(path):
+    if not os.path.exists(os.path.join(path, ".git")):
+        return None
+    if git_output(["git", "status", "--porcelain"], cwd=path) != "":
+        return None
+    return git_output(["git", "rev-parse", "HEAD"], cwd=path)
+
+def source_fingerprint(source_root):
+    """Commit SHA of a clean checkout, or a content hash of the tree for dirty or non-git sources."""
+    return working_tree_commit(source_root) or f"tree-{tree_fingerprint(source_root)}"
+
+def query_fingerprint(query_path):
+    if not os.path.isdir(query_path):
+        return None
+    return tree_fingerprint(query_path)
+
+def advisory_snapshot_version():
+    """Version of the advisory data a scan sees: the NVD CSV and feed revisions plus the OSV refresh period."""
+    try:
+        stat = os.stat(Config.NVD_CVSS_CSV_PATH)
+        nvd_version = f"{int(stat.st_mtime)}-{stat.st_size}"
+    except OSError:
+        nvd_version = "missing"
+    feed_version = nvd_feed_version(Config.NVD_FEED_DIRECTORY)
+    if feed_version:
+        nvd_version = f"{nvd_version}+{feed_version}"
+    if Config.OSV_OFFLINE_DB_PATH:
+        return f"nvd-{nvd_version}/osv-offline-{offline_import_version(Config.OSV_OFFLINE_DB_PATH)}"
+    period = int(time.time() // (Config.ADVISORY_SNAPSHOT_HOURS * 3600))
+    return f"nvd-{nvd_version}/osv-{period}"
+
+def nvd_feed_version(feed_dir):
+    """Short hash of the names, sizes and mtimes of the NVD JSON feeds, or None when there are none."""
+    if not os.path.isdir(feed_dir):
+        return None
+    feeds = []
+    for name in sorted(os.listdir(feed_dir)):
+        if name.endswith((".json", ".json.gz")):
+            stat = os.stat(os.path.join(feed_dir, name))
+            feeds.append((name, stat.st_mtime_ns, stat.st_size))
+    return cache_key(feeds)[:12] if feeds else None
+
+def offline_import_version(db_path):
+    """Ecosystems and import times of an offline OSV store, which change with every import."""
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT ecosystem, imported_at FROM imports ORDER BY ecosystem").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return "missing"
+    return ",".join(f"{ecosystem}:{int(imported_at)}" for ecosystem, imported_at in rows) or "empty"
+
+def cache_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Content-addressed store of scan outputs, one directory of files per cache key."""
+    def __init__(self, root=None):
+        self.root = root or Config.RESULT_CACHE_HOME_PATH
+
+    def entry_path(self, key):
+        return os.path.join(self.root, "entries", key[:2], key)
+
+    def commit_path(self, commit):
+        return os.path.join(self.root, "commits", f"{commit}.json")
+
+    def has(self, key):
+        return os.path.isfile(os.path.join(self.entry_path(key), "meta.json"))
+
+    def restore(self, key, files):
+        """Copy cached files to their workspace paths given as {cached name: destination path}."""
+        entry_path = self.entry_path(key)
+        for name, destination in files.items():
+            cached_file = os.path.join(entry_path, name)
+            if os.path.exists(cached_file):
+                shutil.copy(cached_file, destination)
+
+    def store(self, key, files, meta=None):
+        """Store existing files given as {cached name: source path}; an existing entry is kept as is."""
+        entry_path = self.entry_path(key)
+        if self.has(key):
+            return
+        staging_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(staging_path)
+        try:
+            stored = []
+            for name, source in files.items():
+                if os.path.exists(source):
+                    shutil.copy(source, os.path.join(staging_path, name))
+                    stored.append(name)
+            with open(os.path.join(staging_path, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({**(meta or {}), "files": stored, "stored_at": int(time.time())}, f, indent=4)
+            os.rename(staging_path, entry_path)
+        except OSError:
+            if os.path.isdir(entry_path):
+                return
+            raise
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+    def get_commit(self, commit):
+        try:
+            with open(self.commit_path(commit), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put_commit(self, commit, data):
+        os.makedirs(os.path.dirname(self.commit_path(commit)), exist_ok=True)
+        staging_path = f"{self.commit_path(commit)}.{uuid.uuid4().hex}.tmp"
+        with open(staging_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(staging_path, self.commit_path(commit))
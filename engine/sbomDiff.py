@@ -0,0 +1,106 @@
+from config import Config
+from urllib.parse import unquote
+import json
+import os
+
+DIFF_FILE_NAME = "diff.json"
+
+def component_key(row):
+    """Version-independent identity of an sbom-detail row: its purl without version, qualifiers and subpath."""
+    purl = row.get("purl") or "N/A"
+    if purl == "N/A":
+        group = row.get("group") or ""
+        return f"{group}/{row.get('name', 'N/A')}" if group else row.get("name", "N/A")
+    purl = unquote(purl.split("#", 1)[0].split("?", 1)[0])
+    # The version follows the last '@' and has no '/', which keeps npm scopes ("@scope/name") in the key.
+    name, separator, version = purl.rpartition("@")
+    return name if separator and "/" not in version else purl
+
+def risk_level(row):
+    package_check = row.get("package_check") or [{}]
+    return package_check[0].get("Risk Level")
+
+class RunIndex:
+    """Components of one run keyed by component_key, with their versions, vulnerabilities and risk levels."""
+    def __init__(self, sbom_detail, reachable=None):
+        self.components = {}
+        for row in (sbom_detail or {}).get("components", []):
+            key = component_key(row)
+            entry = self.components.setdefault(key, {"versions": set(), "vulnerabilities": {}, "risk_levels": set()})
+            entry["versions"].add(row.get("version", "N/A"))
+            for vulnerability in row.get("vulnerabilities", []):
+                entry["vulnerabilities"][vulnerability.get("cve_id", "N/A")] = vulnerability.get("severity", "unknown")
+            level = risk_level(row)
+            if level:
+                entry["risk_levels"].add(level)
+        self.reachable_libraries = {item["reachable-library"] for item in reachable or [] if item.get("reachable-library")}
+
+def versions(entry):
+    return sorted(entry["versions"])
+
+def vulnerability_changes(key, entry, cve_ids):
+    return [{"component": key, "versions": versions(entry), "cve_id": cve_id, "severity": entry["vulnerabilities"][cve_id]}
+            for cve_id in sorted(cve_ids)]
+
+RISK_ORDER = ("Red", "Yellow", "Green", "N/A")
+
+def worst_risk_level(levels):
+    return min(levels, key=lambda level: RISK_ORDER.index(level) if level in RISK_ORDER else len(RISK_ORDER), default=None)
+
+def diff_runs(previous, current):
+    """Changes from the `previous` to the `current` RunIndex, computed in one pass over each."""
+    diff = {"added": [], "removed": [], "upgraded": [], "new_vulnerabilities": [], "fixed_vulnerabilities": [],
+            "risk_level_changes": []}
+
+    for key, entry in current.components.items():
+        before = previous.components.get(key)
+        if before is None:
+            diff["added"].append({"component": key, "versions": versions(entry)})
+            diff["new_vulnerabilities"] += vulnerability_changes(key, entry, entry["vulnerabilities"])
+            continue
+        if entry["versions"] != before["versions"]:
+            # Any version change, downgrades included; the versions are not ordered across ecosystems here.
+            diff["upgraded"].append({"component": key, "from": versions(before), "to": versions(entry)})
+        diff["new_vulnerabilities"] += vulnerability_changes(
+            key, entry, entry["vulnerabilities"].keys() - before["vulnerabilities"].keys())
+        diff["fixed_vulnerabilities"] += vulnerability_changes(
+            key, before, before["vulnerabilities"].keys() - entry["vulnerabilities"].keys())
+        level_before, level_after = worst_risk_level(before["risk_levels"]), worst_risk_level(entry["risk_levels"])
+        if level_before and level_after and level_before != level_after:
+            diff["risk_level_changes"].append({"component": key, "from": level_before, "to": level_after})
+
+    for key, entry in previous.components.items():
+        if key not in current.components:
+            diff["removed"].append({"component": key, "versions": versions(entry)})
+            diff["fixed_vulnerabilities"] += vulnerability_changes(key, entry, entry["vulnerabilities"])
+
+    diff["newly_reachable"] = sorted(current.reachable_libraries - previous.reachable_libraries)
+    diff["no_longer_reachable"] = sorted(previous.reachable_libraries - current.reachable_libraries)
+    for name in ("added", "removed", "upgraded", "risk_level_changes"):
+        diff[name].sort(key=lambda change: change["component"])
+    diff["summary"] = {name: len(changes) for name, changes in diff.items()}
+    return diff
+
+def run_result_path(run):
+    """Published result directory of a run row of the log table."""
+    return os.path.join(Config.RESULT_PUBLIC_HOME_PATH, f"{run['date']}_{run['start_time']}_{run['repo_name']}")
+
+def load_result(result_path, file_name):
+    file_path = os.path.join(result_path, file_name)
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_run_index(result_path):
+    """RunIndex of a published run directory, or None when it has no sbom-detail.json."""
+    sbom_detail = load_result(result_path, "sbom-detail.json")
+    if sbom_detail is None:
+        return None
+    return RunIndex(sbom_detail, load_result(result_path, "reachable.json"))
+
+def diff_result_paths(previous_path, current_path):
+    previous, current = load_run_index(previous_path), load_run_index(current_path)
+    if previous is None or current is None:
+        return None
+    return diff_runs(previous, current)
@@ -0,0 +1,59 @@
+from urllib.parse import unquote
+import re
+
+PURL_NAME_PATTERN = re.compile(r'^pkg:[^/]+/(?:(@[^/]+)\/)?([^@]+)@.+$')
+
+def purl_name(ref):
+    """Package name of a purl-style bom-ref, including the npm scope, or None when it is not a versioned purl."""
+    match = PURL_NAME_PATTERN.match(ref)
+    if not match:
+        return None
+    namespace, name = match.groups()
+    return f"{namespace}/{name}" if namespace else name
+
+class SbomIndex:
+    """Lookups over a CycloneDX SBOM built in one pass, shared by the stages that join components,
+    vulnerabilities and dependencies.
+
+    Build it from the final SBOM (after add-cve); it does not follow later changes to the document.
+    When `components` is given they are read from it instead of the document and not kept in
+    `components_by_ref`, so a streamed SBOM is indexed without holding its components.
+    """
+    def __init__(self, sbom, components=None):
+        self.sbom = sbom
+        self.components_by_ref = {}
+        self.vulnerabilities_by_ref = {}
+        self.dependencies_by_ref = {}
+        self.purl_names = {}
+
+        for component in sbom.get("components", []) if components is None else components:
+            if components is None:
+                self.components_by_ref.setdefault(component.get("bom-ref", "N/A"), component)
+            purl = component.get("purl")
+            if purl:
+                self.add_purl(unquote(purl))
+
+        for vulnerability in sbom.get("vulnerabilities", []):
+            for affected in vulnerability.get("affects", []):
+                self.vulnerabilities_by_ref.setdefault(affected.get("ref"), []).append(vulnerability)
+
+        self.clean_dependencies_by_ref = {}
+        for dependency in sbom.get("dependencies", []):
+            ref = dependency.get("ref")
+            depends_on = dependency.get("dependsOn", [])
+            self.dependencies_by_ref[ref] = depends_on
+            if ref:
+                self.clean_dependencies_by_ref[unquote(ref)] = [unquote(dep) for dep in depends_on]
+                for clean_ref in [unquote(ref), *self.clean_dependencies_by_ref[unquote(ref)]]:
+                    self.add_purl(clean_ref)
+
+    def add_purl(self, ref):
+        if ref not in self.purl_names:
+            self.purl_names[ref] = purl_name(ref)
+
+    def vulnerabilities(self, ref):
+        """Vulnerabilities affecting `ref` in document order, once per matching `affects` entry."""
+        return self.vulnerabilities_by_ref.get(ref, [])
+
+    def dependencies(self, ref):
+        return self.dependencies_by_ref.get(ref, [])
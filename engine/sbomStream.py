@@ -0,0 +1,186 @@
+import json
+import os
+
+VALUE_DELIMITERS = " \t\r\n,:]}"
+
+class JsonObjectReader:
+    """Incremental reader of a JSON document whose top level is an object.
+
+    Members are decoded one at a time and the array under `stream_key` item by item, so the memory
+    needed is bounded by the largest single item or other member instead of the whole document.
+    """
+    def __init__(self, file_path, stream_key, chunk_size=1024 * 1024):
+        self.file_path = file_path
+        self.stream_key = stream_key
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+
+    def open(self):
+        self.file = open(self.file_path, "r", encoding="utf-8")
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self, size):
+        if self.position > self.chunk_size:
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+        chunk = self.file.read(size)
+        if not chunk:
+            self.eof = True
+        self.buffer += chunk
+
+    def next_char(self):
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                raise ValueError(f"Unexpected end of JSON document: {self.file_path}")
+            self.fill(self.chunk_size)
+
+    def expect(self, char):
+        if self.next_char() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.position} of {self.file_path}")
+        self.position += 1
+
+    def decode_value(self):
+        # A value is complete only once a delimiter follows it, otherwise a number could still be cut off.
+        self.next_char()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                if (end < len(self.buffer) and self.buffer[end] in VALUE_DELIMITERS) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(size)
+            size *= 2
+
+    def members(self):
+        """Yield (key, value) for each top-level member; the streamed array is yielded as an item iterator."""
+        self.open()
+        try:
+            self.expect("{")
+            if self.next_char() == "}":
+                return
+            while True:
+                key = self.decode_value()
+                self.expect(":")
+                if key == self.stream_key and self.next_char() == "[":
+                    items = self.items()
+                    yield key, items
+                    for _ in items:
+                        pass
+                else:
+                    yield key, self.decode_value()
+                if self.next_char() == "}":
+                    return
+                self.expect(",")
+        finally:
+            self.file.close()
+
+    def items(self):
+        self.expect("[")
+        if self.next_char() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.next_char() == "]":
+                self.position += 1
+                return
+            self.expect(",")
+
+    def read_header(self):
+        """Return every member except the streamed array, which is kept as an empty list to preserve key order."""
+        header = {}
+        for key, value in self.members():
+            header[key] = [] if key == self.stream_key else value
+        return header
+
+    def iter_items(self):
+        for key, value in self.members():
+            if key == self.stream_key:
+                yield from value
+                return
+
+class JsonObjectWriter:
+    """Writes a top-level JSON object member by member, producing the same text as json.dump with `indent`."""
+    def __init__(self, file, indent=4, ensure_ascii=False):
+        self.file = file
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.member_count = 0
+        self.item_count = None
+        self.file.write("{")
+
+    def encode(self, value, level):
+        text = json.dumps(value, indent=self.indent, ensure_ascii=self.ensure_ascii)
+        return text.replace("\n", "\n" + " " * (self.indent * level))
+
+    def begin_member(self, key):
+        self.file.write("," if self.member_count else "")
+        self.file.write(f"\n{' ' * self.indent}{json.dumps(key, ensure_ascii=self.ensure_ascii)}: ")
+        self.member_count += 1
+
+    def write_member(self, key, value):
+        self.begin_member(key)
+        self.file.write(self.encode(value, 1))
+
+    def begin_array(self, key):
+        self.begin_member(key)
+        self.file.write("[")
+        self.item_count = 0
+
+    def write_item(self, value):
+        self.file.write("," if self.item_count else "")
+        self.file.write(f"\n{' ' * (self.indent * 2)}{self.encode(value, 2)}")
+        self.item_count += 1
+
+    def end_array(self):
+        self.file.write(f"\n{' ' * self.indent}]" if self.item_count else "]")
+        self.item_count = None
+
+    def close(self):
+        self.file.write("\n}" if self.member_count else "}")
+
+class JsonDocumentStream:
+    """Writes `document` to `file_path` with the array under `stream_key` filled in item by item.
+
+    Members before the array are written on open; the ones after it are read from `document` on finish,
+    so they may still change while the items are written.
+    """
+    def __init__(self, file_path, document, stream_key, indent=4):
+        self.file = open(file_path, "w", encoding="utf-8")
+        self.document = document
+        self.stream_key = stream_key
+        self.writer = JsonObjectWriter(self.file, indent=indent)
+        keys = list(document)
+        self.remaining_keys = keys[keys.index(stream_key) + 1:] if stream_key in keys else []
+        for key in keys[:len(keys) - len(self.remaining_keys)]:
+            if key == stream_key:
+                self.writer.begin_array(key)
+            else:
+                self.writer.write_member(key, document[key])
+
+    def write_item(self, value):
+        self.writer.write_item(value)
+
+    def finish(self):
+        try:
+            if self.stream_key in self.document:
+                self.writer.end_array()
+            for key in self.remaining_keys:
+                self.writer.write_member(key, self.document[key])
+            self.writer.close()
+        finally:
+            self.file.close()
+
+def is_large_document(file_path, threshold_mb):
+    return threshold_mb is not None and os.path.getsize(file_path) > threshold_mb * 1024 * 1024
@@ -0,0 +1,147 @@
+from config import Config
+from datetime import datetime
+import math
+import os
+import resource
+import threading
+import time
+
+_current_metrics = threading.local()
+
+def read_rss_kb():
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class RssSampler(threading.Thread):
+    """Polls the resident set size of the server process while a stage is running."""
+    def __init__(self, interval=0.5):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.peak_kb = read_rss_kb()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak_kb = max(self.peak_kb, read_rss_kb())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.peak_kb = max(self.peak_kb, read_rss_kb())
+        return self.peak_kb
+
+class StageCounters(dict):
+    """Counters of a stage, updated under one lock by the stage and by the worker threads it starts."""
+    def __init__(self, **counters):
+        super().__init__(**counters)
+        self.lock = threading.Lock()
+
+    def add(self, counter, amount=1):
+        with self.lock:
+            self[counter] = self.get(counter, 0) + amount
+
+class StageMetrics:
+    """Timing and resource usage of a single stage, filled in by the runner and the code the stage calls.
+
+    `cpu_seconds` covers the stage thread plus every child process started through `run_command`.
+    `peak_rss_kb` is the server process high-water mark while the stage ran, which stages running
+    concurrently share; `child_peak_rss_kb` is the largest child process the stage started.
+    """
+    def __init__(self, stage_name):
+        self.stage_name = stage_name
+        self.status = "running"
+        self.started_at = None
+        self.wall_seconds = None
+        self.thread_cpu_seconds = None
+        self.child_cpu_seconds = 0.0
+        self.peak_rss_kb = None
+        self.child_peak_rss_kb = 0
+        self.component_count = None
+        self.counters = StageCounters(network_requests=0, cache_hits=0, errors=0)
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.previous = getattr(_current_metrics, "metrics", None)
+        _current_metrics.metrics = self
+        self.started_at = datetime.now(Config.SEOUL_TIME_ZONE).isoformat(timespec="seconds")
+        self.sampler = RssSampler()
+        self.sampler.start()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_seconds = time.perf_counter() - self.wall_start
+        self.thread_cpu_seconds = time.thread_time() - self.cpu_start
+        self.peak_rss_kb = self.sampler.stop()
+        if exc_type:
+            self.status = "failed"
+        elif self.status == "running":
+            self.status = "completed"
+        _current_metrics.metrics = self.previous
+        return False
+
+    def record_child(self, rusage):
+        with self.lock:
+            self.child_cpu_seconds += rusage.ru_utime + rusage.ru_stime
+            self.child_peak_rss_kb = max(self.child_peak_rss_kb, rusage.ru_maxrss)
+
+    def count(self, counter, amount=1):
+        self.counters.add(counter, amount)
+
+    def as_record(self):
+        return {
+            "stage": self.stage_name,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_seconds": round(self.wall_seconds or 0.0, 3),
+            "cpu_seconds": round((self.thread_cpu_seconds or 0.0) + self.child_cpu_seconds, 3),
+            "child_cpu_seconds": round(self.child_cpu_seconds, 3),
+            "peak_rss_kb": self.peak_rss_kb,
+            "child_peak_rss_kb": self.child_peak_rss_kb,
+            "component_count": self.component_count,
+            "network_requests": self.counters.get("network_requests", 0),
+            "cache_hits": self.counters.get("cache_hits", 0),
+            "errors": self.counters.get("errors", 0),
+        }
+
+def current_metrics():
+    """Return the metrics of the stage running on this thread, or None outside of a stage."""
+    return getattr(_current_metrics, "metrics", None)
+
+def current_counters():
+    metrics = current_metrics()
+    return metrics.counters if metrics else None
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of `values`, or None when there are no samples."""
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return None
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[rank - 1]
+
+SUMMARY_FIELDS = ("wall_seconds", "cpu_seconds", "peak_rss_kb", "child_peak_rss_kb",
+                  "component_count", "network_requests", "cache_hits", "errors")
+
+def summarize_stage_metrics(rows):
+    """Group stage metric rows by stage name and compute p50/p95 of every recorded field.
+
+    Only stages that actually ran count; the ones reused from a checkpoint or skipped on a cache hit
+    take no time and would drag the percentiles down.
+    """
+    grouped = {}
+    for row in rows:
+        if row.get("status", "completed") == "completed":
+            grouped.setdefault(row["stage"], []).append(row)
+
+    summary = {}
+    for stage, stage_rows in grouped.items():
+        summary[stage] = {"samples": len(stage_rows)}
+        for field in SUMMARY_FIELDS:
+            values = [row[field] for row in stage_rows]
+            summary[stage][field] = {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+    return summary
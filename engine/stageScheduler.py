@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+class Stage:
+    """A pipeline step that can start once every artifact in `requires` has been provided.
+
+    Stages sharing a `cache_partition` are skipped together when that partition was restored from cache.
+    `checkpoint` names the in-memory artifacts the stage leaves behind, saved so a resumed run can skip it.
+    """
+    def __init__(self, name, run, requires=(), provides=(), group=None, cache_partition=None, checkpoint=()):
+        self.name = name
+        self.run = run
+        self.requires = tuple(requires)
+        self.provides = tuple(provides)
+        self.group = group
+        self.cache_partition = cache_partition
+        self.checkpoint = tuple(checkpoint)
+
+class StageScheduler:
+    def __init__(self, stages, max_workers):
+        self.stages = list(stages)
+        self.max_workers = max_workers
+        self.validate()
+
+    def validate(self):
+        names = set()
+        provided = set()
+        for stage in self.stages:
+            if stage.name in names:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            names.add(stage.name)
+            provided.update(stage.provides)
+
+        for stage in self.stages:
+            missing = set(stage.requires) - provided
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' requires artifacts no stage provides: {sorted(missing)}")
+
+    def run(self, execute):
+        """Run `execute(stage)` for every stage as soon as its inputs exist, yielding each finished stage."""
+        pending = list(self.stages)
+        available = set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                ready = [stage for stage in pending if set(stage.requires) <= available]
+                for stage in ready:
+                    pending.remove(stage)
+                    running[executor.submit(execute, stage)] = stage
+
+                if not running:
+                    raise RuntimeError(f"Stages can never become ready: {[stage.name for stage in pending]}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    future.result()
+                    available.update(stage.provides)
+                    yield stage
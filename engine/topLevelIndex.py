@@ -0,0 +1,206 @@
+from config import Config
+import concurrent.futures
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import requests
+import zipfile
+
+MODULE_SUFFIXES = (".py", ".so", ".pyd")
+thread_local = threading.local()
+
+def normalize_name(name):
+    """PEP 503 normalized distribution name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def get_session():
+    if not hasattr(thread_local, "session"):
+        thread_local.session = requests.Session()
+    return thread_local.session
+
+def count_stat(stats, key, amount=1):
+    if stats is not None:
+        stats.add(key, amount)
+
+class HttpRangeFile(io.RawIOBase):
+    """Seekable read-only view of a remote file that downloads only the byte ranges read from it.
+
+    zipfile reads the central directory at the end of a wheel and then the members it opens, so reading
+    top_level.txt costs a few small requests instead of downloading the whole wheel. Servers that ignore
+    Range get the whole file downloaded once.
+    """
+    def __init__(self, url, size, stats=None, block_size=64 * 1024):
+        self.url = url
+        self.size = size
+        self.stats = stats
+        self.block_size = block_size
+        self.position = 0
+        self.block_start = 0
+        self.block = b""
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def fetch(self, start, length):
+        end = min(self.size, start + max(length, self.block_size)) - 1
+        count_stat(self.stats, "network_requests")
+        response = get_session().get(self.url, headers={"Range": f"bytes={start}-{end}"}, timeout=60)
+        response.raise_for_status()
+        if response.status_code == 206:
+            self.block_start, self.block = start, response.content
+        else:
+            self.block_start, self.block = 0, response.content
+            self.size = len(self.block)
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+        offset = self.position - self.block_start
+        if offset < 0 or offset + length > len(self.block):
+            self.fetch(self.position, length)
+            offset = self.position - self.block_start
+        buffer[:length] = self.block[offset:offset + length]
+        self.position += length
+        return length
+
+def wheel_top_level(archive):
+    """Top-level import names of a wheel: its top_level.txt, or else the top-level entries of its file list (RECORD)."""
+    names = archive.namelist()
+    for name in names:
+        parts = name.split("/")
+        if len(parts) == 2 and parts[0].endswith(".dist-info") and parts[1] == "top_level.txt":
+            text = archive.read(name).decode("utf-8", errors="replace")
+            return [module.strip() for module in text.splitlines() if module.strip()]
+
+    modules = []
+    for name in names:
+        parts = name.split("/")
+        if parts[0].endswith((".dist-info", ".data")) or parts[0] in ("", "..", "__pycache__"):
+            continue
+        if len(parts) > 1:
+            module = parts[0]
+        elif parts[0].endswith(MODULE_SUFFIXES):
+            module = parts[0].split(".", 1)[0]
+        else:
+            continue
+        if module.isidentifier() and module not in modules:
+            modules.append(module)
+    return modules
+
+def select_wheel(files):
+    """The release file to read the metadata from: a pure-Python wheel when there is one, then any wheel."""
+    wheels = [file for file in files if file.get("packagetype") == "bdist_wheel" and file.get("url")]
+    wheels.sort(key=lambda file: not file["filename"].endswith("-none-any.whl"))
+    return wheels[0] if wheels else None
+
+def fetch_top_level(name, version, stats=None):
+    """Read the top-level import names of a PyPI release from its wheel without installing it.
+
+    Returns [] when the release has no wheel and None when PyPI could not be reached, which is not cached.
+    """
+    try:
+        count_stat(stats, "network_requests")
+        response = get_session().get(f"{Config.PYPI_REPO_URL}pypi/{name}/{version}/json", timeout=30)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        wheel = select_wheel(response.json().get("urls", []))
+        if wheel is None:
+            return []
+        with zipfile.ZipFile(HttpRangeFile(wheel["url"], wheel["size"], stats)) as archive:
+            return wheel_top_level(archive)
+    except (requests.exceptions.RequestException, zipfile.BadZipFile, ValueError, KeyError) as e:
+        count_stat(stats, "errors")
+        print(f"[ERROR] Failed to read the top-level modules of {name}=={version}: {e}")
+        return None
+
+class TopLevelIndex:
+    """Cross-scan SQLite index of (distribution, version) -> top-level import names, filled from wheel metadata.
+
+    Releases are immutable, so entries never expire; an empty entry (no wheel published) is retried after
+    `negative_ttl_hours` in case a wheel is uploaded later.
+    """
+    def __init__(self, path=None, negative_ttl_hours=None):
+        self.path = path or Config.TOP_LEVEL_INDEX_PATH
+        if negative_ttl_hours is None:
+            negative_ttl_hours = Config.TOP_LEVEL_INDEX_NEGATIVE_TTL_HOURS
+        self.negative_ttl = negative_ttl_hours * 3600
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS top_level (name TEXT, version TEXT, modules TEXT, fetched_at REAL, "
+                    "PRIMARY KEY (name, version))"
+                )
+        finally:
+            conn.close()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, releases):
+        now = time.time()
+        cached = {}
+        conn = self.connect()
+        try:
+            for name, version in releases:
+                row = conn.execute("SELECT modules, fetched_at FROM top_level WHERE name = ? AND version = ?",
+                                   (normalize_name(name), version)).fetchone()
+                if row is None:
+                    continue
+                modules = json.loads(row[0])
+                if modules or now - row[1] < self.negative_ttl:
+                    cached[(name, version)] = modules
+        finally:
+            conn.close()
+        return cached
+
+    def put(self, results):
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO top_level VALUES (?, ?, ?, ?)",
+                    [(normalize_name(name), version, json.dumps(modules), now) for (name, version), modules in results.items()]
+                )
+        finally:
+            conn.close()
+
+    def lookup(self, releases, stats=None, max_workers=8):
+        """Top-level modules of each (name, version), served from the index and fetched from PyPI on a miss."""
+        releases = list(dict.fromkeys(releases))
+        result = self.get(releases)
+        count_stat(stats, "cache_hits", len(result))
+        misses = [release for release in releases if release not in result]
+        fetched = {}
+        if misses:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for release, modules in zip(misses, executor.map(lambda release: fetch_top_level(*release, stats), misses)):
+                    if modules is not None:
+                        fetched[release] = modules
+            self.put(fetched)
+        result.update(fetched)
+        return result
@@ -6,9 +6,11 @@ from config import Config, teardown_session, start_npm_dev
 from controller.javaRepositoryController import javaController
 from controller.pythonRepositoryController import pythonController
 from controller.settingsController import settingsController
-from controller.SCAController import SCAController
+from controller.SCAController import SCAController, sbom_job_queue
 from controller.jenkinsController import jenkinsController
+from controller.metricsController import metricsController
 from controller.relayHandler import thread_local
+from engine.codeqlCache import start_query_precompilation
 
 app = Flask(__name__)
 
@@ -17,6 +19,7 @@ app.register_blueprint(pythonController)
 app.register_blueprint(settingsController)
 app.register_blueprint(SCAController)
 app.register_blueprint(jenkinsController)
+app.register_blueprint(metricsController)
 
 @app.route("/", methods=Config.ALLOW_METHODS)
 def apidocs():
@@ -35,6 +38,8 @@ def teardown(exception=None):
 
 if __name__ == "__main__":
     start_npm_dev()
+    start_query_precompilation()
+    sbom_job_queue.start()
     print(f"[DEBUG] Server Configure: Host={Config.SERVER_HOST}, Port={Config.SERVER_PORT}, Debug={Config.IS_DEBUG}")
     app.run(
         host=Config.SERVER_HOST,
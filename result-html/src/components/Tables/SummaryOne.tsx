@@ -63,6 +63,7 @@ const SummaryOne: React.FC = () => {
         };
     }, [projectName]);
 
+    // SPDX and SWID are rendered by the SCABLE server on first download.
     const downloadFiles = [
         { name: "sbom-cyclonedx.json", label: "CycloneDX" },
         { name: "sbom-spdx.json", label: "SPDX" },
@@ -81,7 +82,7 @@ const SummaryOne: React.FC = () => {
 
             await Promise.all(
                 downloadFiles.map(async (file) => {
-                    const response = await fetch(`/${projectName}/${file.name}`);
+                    const response = await fetch(`/sbom/results/${projectName}/${file.name}`);
                     if (!response.ok) {
                         throw new Error(`Failed to fetch ${file.name}: ${response.statusText}`);
                     }
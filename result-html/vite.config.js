@@ -4,4 +4,9 @@ import react from '@vitejs/plugin-react'
 // https://vitejs.dev/config/
 export default defineConfig({
   plugins: [react()],
+  server: {
+    proxy: {
+      '/sbom/results': `http://localhost:${process.env.SCABLE_SERVER_PORT || 8282}`,
+    },
+  },
 })
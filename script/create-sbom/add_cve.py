@@ -1,17 +1,200 @@
+import csv
 import json
 import requests
+from filelock import FileLock
 from packageurl import PackageURL
+from osv_offline import OfflineAdvisoryStore
 import concurrent.futures
 import threading
-import pandas as pd
+import sqlite3
 import os
 import glob
+import gzip
+import random
 import re
 import sys
+import time
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
-csv_file_path = "/home/scable/nvd_database/cve_cvss3_data.csv"
-cve_data = pd.read_csv(csv_file_path, encoding='ISO-8859-1', low_memory=False, dtype=str)
+thread_local = threading.local()
+
+OSV_API_BASE_URL = os.environ.get("OSV_API_BASE_URL", "https://api.osv.dev")
+OSV_BATCH_SIZE = 1000
+ADVISORY_CACHE_PATH = os.environ.get("OSV_CACHE_PATH", "/home/scable/osv-cache/advisories.sqlite")
+OSV_OFFLINE_DB_PATH = os.environ.get("OSV_OFFLINE_DB_PATH")
+ECOSYSTEM_MAPPING = {
+    "pypi": "PyPI",
+    "maven": "Maven",
+    "npm": "npm",
+}
+
+CVE_INDEX_COLUMNS = ("CVE_ID", "Base_Severity", "Base_Score", "CVSS_Version", "Vector_String")
+# Values pandas.read_csv treated as missing, kept so the ratings match the previous DataFrame lookup.
+MISSING_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+CREATE_CVSS_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS cvss (cve_id TEXT PRIMARY KEY, base_severity TEXT, base_score TEXT, "
+    "cvss_version TEXT, vector_string TEXT, last_modified TEXT) WITHOUT ROWID"
+)
+# Feed records replace older ones; CSV rows (last_modified NULL) never override a feed record.
+UPSERT_FEED_RECORD_SQL = (
+    "INSERT INTO cvss VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (cve_id) DO UPDATE SET "
+    "base_severity = excluded.base_severity, base_score = excluded.base_score, cvss_version = excluded.cvss_version, "
+    "vector_string = excluded.vector_string, last_modified = excluded.last_modified "
+    "WHERE cvss.last_modified IS NULL OR excluded.last_modified >= cvss.last_modified"
+)
+CVE_INDEX_SCHEMA_VERSION = 3
+CVE_INDEX_MMAP_BYTES = 256 * 1024 * 1024
+
+def create_cve_index(index_path):
+    """Create an empty index with the current schema, replacing an index written by an older version."""
+    staging_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    conn = sqlite3.connect(staging_path)
+    try:
+        conn.execute(CREATE_CVSS_TABLE_SQL)
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE feeds (file_name TEXT PRIMARY KEY, file_version TEXT)")
+        conn.execute(f"PRAGMA user_version = {CVE_INDEX_SCHEMA_VERSION}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.commit()
+    finally:
+        conn.close()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(index_path + suffix):
+            os.remove(index_path + suffix)
+    os.replace(staging_path, index_path)
+
+def import_cve_csv(conn, csv_path, source_version):
+    """Replace the rows that came from the CSV; rows updated from feeds are kept."""
+    conn.execute("DELETE FROM cvss WHERE last_modified IS NULL")
+    with open(csv_path, "r", newline="", encoding="ISO-8859-1") as f:
+        rows = (
+            tuple(None if row.get(column) in MISSING_VALUES else row.get(column) for column in CVE_INDEX_COLUMNS)
+            for row in csv.DictReader(f)
+        )
+        conn.executemany("INSERT OR IGNORE INTO cvss VALUES (?, ?, ?, ?, ?, NULL)", (row for row in rows if row[0]))
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('csv_version', ?)", (source_version,))
+    print(f"CVE index loaded from {csv_path}")
+
+def read_feed(feed_path):
+    opener = gzip.open if feed_path.endswith(".gz") else open
+    with opener(feed_path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+def feed_records(feed):
+    """Yield index rows with CVSS v3 metrics from NVD 1.1 feeds (`CVE_Items`) and API 2.0 responses (`vulnerabilities`)."""
+    for item in feed.get("CVE_Items", []):
+        cvss = item.get("impact", {}).get("baseMetricV3", {}).get("cvssV3")
+        if cvss:
+            yield (item["cve"]["CVE_data_meta"]["ID"], cvss.get("baseSeverity"), cvss.get("baseScore"),
+                   cvss.get("version"), cvss.get("vectorString"), item.get("lastModifiedDate", ""))
+    for item in feed.get("vulnerabilities", []):
+        cve = item.get("cve", {})
+        metrics = cve.get("metrics", {})
+        candidates = metrics.get("cvssMetricV31") or metrics.get("cvssMetricV30") or []
+        metric = next((m for m in candidates if m.get("type") == "Primary"), candidates[0] if candidates else None)
+        if metric:
+            cvss = metric.get("cvssData", {})
+            yield (cve["id"], cvss.get("baseSeverity"), cvss.get("baseScore"),
+                   cvss.get("version"), cvss.get("vectorString"), cve.get("lastModified", ""))
+
+def list_feed_files(feed_dir):
+    """Return {file name: version} of the NVD JSON feeds in `feed_dir`, where the version changes with the file."""
+    feeds = {}
+    for feed_path in glob.glob(os.path.join(feed_dir, "*.json")) + glob.glob(os.path.join(feed_dir, "*.json.gz")):
+        stat = os.stat(feed_path)
+        feeds[os.path.basename(feed_path)] = f"{stat.st_mtime_ns}-{stat.st_size}"
+    return feeds
+
+def update_cve_index(csv_path, index_path, feed_dir):
+    """Bring the index up to date with the CSV and apply only the feed files that are new or changed since the last update."""
+    if cve_index_schema_version(index_path) != CVE_INDEX_SCHEMA_VERSION:
+        create_cve_index(index_path)
+
+    csv_version = str(os.stat(csv_path).st_mtime_ns) if os.path.exists(csv_path) else None
+    feeds = list_feed_files(feed_dir)
+    conn = sqlite3.connect(index_path)
+    try:
+        applied = dict(conn.execute("SELECT file_name, file_version FROM feeds"))
+        row = conn.execute("SELECT value FROM meta WHERE key = 'csv_version'").fetchone()
+        pending = sorted(name for name, version in feeds.items() if applied.get(name) != version)
+        if csv_version == (row[0] if row else None) and not pending:
+            return
+        with conn:
+            if csv_version and csv_version != (row[0] if row else None):
+                import_cve_csv(conn, csv_path, csv_version)
+            for name in pending:
+                records = list(feed_records(read_feed(os.path.join(feed_dir, name))))
+                conn.executemany(UPSERT_FEED_RECORD_SQL, records)
+                conn.execute("INSERT OR REPLACE INTO feeds VALUES (?, ?)", (name, feeds[name]))
+                print(f"CVE index updated from {name}: {len(records)} CVEs with CVSS v3 metrics")
+    finally:
+        conn.close()
+
+def cve_index_schema_version(index_path):
+    if not os.path.exists(index_path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+class CveIndex:
+    """Read-only view of the CVE index with one memory-mapped SQLite connection per thread."""
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size = {CVE_INDEX_MMAP_BYTES}")
+            self.local.conn = conn
+        return conn
+
+    def lookup(self, cve_id):
+        row = self.connection().execute(
+            "SELECT base_severity, base_score, cvss_version, vector_string FROM cvss WHERE cve_id = ?", (cve_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(CVE_INDEX_COLUMNS[1:], row))
+
+def get_cve_index(csv_path, feed_dir, index_path=None):
+    """Return the CVE index after applying CSV and feed changes; the cost depends on the changes, not the NVD history.
+
+    The index is kept next to the CSV unless `index_path` is given. The update holds a file lock next to the
+    index, so the server and the command line tool do not rebuild it at the same time.
+    """
+    index_path = index_path or os.path.splitext(csv_path)[0] + ".sqlite"
+    with FileLock(f"{index_path}.lock"):
+        update_cve_index(csv_path, index_path, feed_dir)
+    return CveIndex(index_path)
+
+def get_cvss_ratings(cve_info):
+    if cve_info is None or any(value is None for value in cve_info.values()):
+        return []
+    cvss_version = str(cve_info["CVSS_Version"]).replace('.', '')
+    if cvss_version == "30":
+        cvss_version = "3"
+    return [{
+        "severity": cve_info["Base_Severity"].lower(),
+        "score": cve_info["Base_Score"],
+        "method": f"CVSSv{cvss_version}",
+        "vector": cve_info["Vector_String"]
+    }]
+
+def count_stat(stats, key, amount=1):
+    if stats is not None:
+        stats.add(key, amount)
 
 def clean_text(input_text):
     cleaned_text = re.sub(r'[^\x00-\x7F]+', ' ', input_text)
@@ -20,127 +203,300 @@ def clean_text(input_text):
     cleaned_text = cleaned_text.strip()
     return cleaned_text
 
-def query_osv(ecosystem, name, version, retries=3):
-    if not ecosystem or not name:
-        print(f"Invalid request: ecosystem={ecosystem}, name={name}")
-        return []
-
-    url = "https://api.osv.dev/v1/query"
-    payload = {
-        "package": {
-            "name": name,
-            "ecosystem": ecosystem
-        }
-    }
-
-    if version:
-        payload["version"] = version
+def get_session():
+    if not hasattr(thread_local, "session"):
+        thread_local.session = requests.Session()
+    return thread_local.session
 
+def request_osv(method, url, stats=None, retries=5, base_delay=0.5, max_delay=30, **kwargs):
+    """Send an OSV API request, retrying rate limits, server errors and network failures with jittered backoff."""
     for attempt in range(retries):
         try:
-            response = requests.post(url, json=payload, timeout=30)
+            count_stat(stats, "network_requests")
+            response = get_session().request(method, url, timeout=30, **kwargs)
             response.raise_for_status()
-            data = response.json()
-            return data.get("vulns", [])
+            return response.json()
         except requests.exceptions.RequestException as e:
+            status_code = getattr(e.response, "status_code", None)
+            if status_code is not None and status_code < 500 and status_code != 429:
+                raise
             print(f"OSV API request failed - Attempt {attempt + 1}/{retries}: {e}")
             if attempt == retries - 1:
-                return []
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+def get_component_query(component):
+    purl = component.get("purl")
+    if not purl:
+        print(f"No purl found in component: {component.get('name')}")
+        return None
+
+    try:
+        purl_obj = PackageURL.from_string(purl)
+    except Exception as e:
+        print(f"Invalid purl '{purl}': {e}")
+        return None
+
+    name = f"{purl_obj.namespace}/{purl_obj.name}" if purl_obj.namespace else purl_obj.name
+    ecosystem = ECOSYSTEM_MAPPING.get(purl_obj.type, purl_obj.type.capitalize())
+    if not ecosystem or not name:
+        print(f"Invalid request: ecosystem={ecosystem}, name={name}")
+        return None
+    return ecosystem, name, purl_obj.version
+
+def query_osv_batch(queries, base_url, stats=None):
+    """Return the ids of the vulnerabilities affecting each (ecosystem, name, version) query, in order.
+
+    Queries whose batch failed get None instead of a list so that callers can tell them from "no vulns".
+    """
+    results = [[] for _ in queries]
+    pending = [(index, None) for index in range(len(queries))]
+    while pending:
+        next_pending = []
+        for start in range(0, len(pending), OSV_BATCH_SIZE):
+            batch = pending[start:start + OSV_BATCH_SIZE]
+            batch_queries = []
+            for index, page_token in batch:
+                ecosystem, name, version = queries[index]
+                query = {"package": {"name": name, "ecosystem": ecosystem}}
+                if version:
+                    query["version"] = version
+                if page_token:
+                    query["page_token"] = page_token
+                batch_queries.append(query)
+
+            try:
+                data = request_osv("POST", f"{base_url}/v1/querybatch", stats, json={"queries": batch_queries})
+            except requests.exceptions.RequestException as e:
+                print(f"OSV batch query failed for {len(batch)} components: {e}")
+                for index, _ in batch:
+                    results[index] = None
+                continue
 
-def add_vulnerabilities_to_sbom(sbom_file):
+            for (index, _), result in zip(batch, data.get("results", [])):
+                if results[index] is None:
+                    continue
+                results[index].extend(vuln["id"] for vuln in result.get("vulns", []))
+                if result.get("next_page_token"):
+                    next_pending.append((index, result["next_page_token"]))
+        pending = next_pending
+    return results
+
+def fetch_vulnerabilities(vuln_ids, base_url, stats=None):
+    """Fetch the full OSV records of `vuln_ids`, returning {id: record} for the ones that could be fetched."""
+    def fetch(vuln_id):
+        try:
+            return vuln_id, request_osv("GET", f"{base_url}/v1/vulns/{vuln_id}", stats)
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to fetch OSV record {vuln_id}: {e}")
+            return vuln_id, None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
+        return {vuln_id: record for vuln_id, record in executor.map(fetch, vuln_ids) if record is not None}
+
+class AdvisoryCache:
+    """Cross-scan SQLite cache of OSV answers keyed by (ecosystem, name, version), safe for concurrent scans.
+
+    Package entries hold the ids of the vulnerabilities affecting the package; an empty list is a negative
+    entry and expires after `negative_ttl_hours` instead of `ttl_hours`. Full records are cached by id.
+    """
+    def __init__(self, path=ADVISORY_CACHE_PATH, ttl_hours=24, negative_ttl_hours=6):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.negative_ttl = negative_ttl_hours * 3600
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.execute(
+            "CREATE TABLE IF NOT EXISTS package_vulns (ecosystem TEXT, name TEXT, version TEXT, vuln_ids TEXT, "
+            "fetched_at REAL, PRIMARY KEY (ecosystem, name, version))"
+        )
+        self.execute("CREATE TABLE IF NOT EXISTS vuln_records (vuln_id TEXT PRIMARY KEY, record TEXT, fetched_at REAL)")
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def execute(self, sql, params=()):
+        conn = self.connect()
+        try:
+            with conn:
+                return conn.execute(sql, params).rowcount
+        finally:
+            conn.close()
+
+    def get_packages(self, queries):
+        now = time.time()
+        cached = {}
+        conn = self.connect()
+        try:
+            for ecosystem, name, version in queries:
+                row = conn.execute(
+                    "SELECT vuln_ids, fetched_at FROM package_vulns WHERE ecosystem = ? AND name = ? AND version = ?",
+                    (ecosystem, name, version or "")
+                ).fetchone()
+                if row is None:
+                    continue
+                vuln_ids = json.loads(row[0])
+                if now - row[1] < (self.ttl if vuln_ids else self.negative_ttl):
+                    cached[(ecosystem, name, version)] = vuln_ids
+        finally:
+            conn.close()
+        return cached
+
+    def put_packages(self, results):
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO package_vulns VALUES (?, ?, ?, ?, ?)",
+                    [(ecosystem, name, version or "", json.dumps(vuln_ids), now)
+                     for (ecosystem, name, version), vuln_ids in results.items()]
+                )
+        finally:
+            conn.close()
+
+    def get_records(self, vuln_ids):
+        now = time.time()
+        cached = {}
+        conn = self.connect()
+        try:
+            for vuln_id in vuln_ids:
+                row = conn.execute("SELECT record, fetched_at FROM vuln_records WHERE vuln_id = ?", (vuln_id,)).fetchone()
+                if row is not None and now - row[1] < self.ttl:
+                    cached[vuln_id] = json.loads(row[0])
+        finally:
+            conn.close()
+        return cached
+
+    def put_records(self, records):
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO vuln_records VALUES (?, ?, ?)",
+                    [(vuln_id, json.dumps(record), now) for vuln_id, record in records.items()]
+                )
+        finally:
+            conn.close()
+
+    def invalidate(self, ecosystem=None, name=None, version=None):
+        """Drop matching package entries and the records they reference; no filter clears the whole cache."""
+        filters = [(column, value) for column, value in (("ecosystem", ecosystem), ("name", name), ("version", version))
+                   if value is not None]
+        conn = self.connect()
+        try:
+            with conn:
+                if not filters:
+                    conn.execute("DELETE FROM vuln_records")
+                    return conn.execute("DELETE FROM package_vulns").rowcount
+                where = " AND ".join(f"{column} = ?" for column, _ in filters)
+                params = [value for _, value in filters]
+                for (vuln_ids,) in conn.execute(f"SELECT vuln_ids FROM package_vulns WHERE {where}", params).fetchall():
+                    conn.executemany("DELETE FROM vuln_records WHERE vuln_id = ?", [(vuln_id,) for vuln_id in json.loads(vuln_ids)])
+                return conn.execute(f"DELETE FROM package_vulns WHERE {where}", params).rowcount
+        finally:
+            conn.close()
+
+def add_vulnerabilities_to_sbom(sbom_file, nvd_csv_path, nvd_feed_dir, offline_db_path=OSV_OFFLINE_DB_PATH):
     with open(sbom_file, 'r', encoding='utf-8') as file:
         sbom = json.load(file)
 
-    components = sbom.get("components", [])
-    vulnerabilities_dict = {}
-    lock = threading.Lock()
+    offline_store = OfflineAdvisoryStore(offline_db_path) if offline_db_path else None
+    return add_vulnerabilities(sbom, nvd_csv_path, nvd_feed_dir, offline_store=offline_store)
 
-    def process_component(component):
-        purl = component.get("purl")
-        if not purl:
-            print(f"No purl found in component: {component.get('name')}")
-            return
+def lookup_offline(unique_queries, offline_store):
+    print(f"Matching {len(unique_queries)} components against the offline OSV store {offline_store.path}...")
+    package_vulns = offline_store.match(unique_queries)
+    unique_vuln_ids = sorted({vuln_id for vuln_ids in package_vulns.values() for vuln_id in vuln_ids})
+    return package_vulns, offline_store.get_records(unique_vuln_ids)
 
-        try:
-            purl_obj = PackageURL.from_string(purl)
-        except Exception as e:
-            print(f"Invalid purl '{purl}': {e}")
-            return
+def lookup_online(unique_queries, base_url, stats, advisory_cache):
+    package_vulns = advisory_cache.get_packages(unique_queries) if advisory_cache else {}
+    missing_queries = [query for query in unique_queries if query not in package_vulns]
+    print(f"Querying vulnerabilities for {len(missing_queries)} components in batches of {OSV_BATCH_SIZE}...")
+    fetched_vulns = dict(zip(missing_queries, query_osv_batch(missing_queries, base_url, stats)))
+    if advisory_cache:
+        advisory_cache.put_packages({query: vuln_ids for query, vuln_ids in fetched_vulns.items() if vuln_ids is not None})
+    package_vulns.update(fetched_vulns)
 
-        ecosystem = purl_obj.type
-        name = f"{purl_obj.namespace}/{purl_obj.name}" if purl_obj.namespace else purl_obj.name
-        version = purl_obj.version
+    unique_vuln_ids = sorted({vuln_id for vuln_ids in package_vulns.values() for vuln_id in vuln_ids or []})
+    records = advisory_cache.get_records(unique_vuln_ids) if advisory_cache else {}
+    missing_vuln_ids = [vuln_id for vuln_id in unique_vuln_ids if vuln_id not in records]
+    print(f"Fetching {len(missing_vuln_ids)} OSV vulnerability records...")
+    fetched_records = fetch_vulnerabilities(missing_vuln_ids, base_url, stats)
+    if advisory_cache:
+        advisory_cache.put_records(fetched_records)
+    records.update(fetched_records)
 
-        ecosystem_mapping = {
-            "pypi": "PyPI",
-            "maven": "Maven",
-            "npm": "npm",
-        }
-        ecosystem = ecosystem_mapping.get(ecosystem, ecosystem.capitalize())
+    if advisory_cache:
+        package_hits = len(unique_queries) - len(missing_queries)
+        record_hits = len(unique_vuln_ids) - len(missing_vuln_ids)
+        count_stat(stats, "cache_hits", package_hits + record_hits)
+        lookups = len(unique_queries) + len(unique_vuln_ids)
+        hit_ratio = (package_hits + record_hits) / lookups if lookups else 0.0
+        print(f"OSV advisory cache: {package_hits}/{len(unique_queries)} packages and "
+              f"{record_hits}/{len(unique_vuln_ids)} records served from cache (hit ratio {hit_ratio:.1%})")
+    return package_vulns, records
 
-        if not ecosystem:
-            print(f"Invalid ecosystem: {ecosystem}")
-            return
+def add_vulnerabilities(sbom, nvd_csv_path, nvd_feed_dir, stats=None, osv_base_url=None, advisory_cache=None,
+                        offline_store=None, components=None):
+    """Attach OSV vulnerabilities to the SBOM components, matched locally when `offline_store` is given.
+
+    CVSS ratings come from the NVD CSV at `nvd_csv_path` and the JSON feeds in `nvd_feed_dir`.
+    `components` replaces sbom["components"] for streamed SBOMs; only their bom-refs and queries are kept.
+    """
+    base_url = (osv_base_url or OSV_API_BASE_URL).rstrip("/")
+    cve_index = get_cve_index(nvd_csv_path, nvd_feed_dir)
+    targets = []
+    for component in sbom.get("components", []) if components is None else components:
+        query = get_component_query(component)
+        if query:
+            targets.append((component.get("bom-ref"), query))
+
+    unique_queries = list(dict.fromkeys(query for _, query in targets))
+    if offline_store:
+        package_vulns, records = lookup_offline(unique_queries, offline_store)
+    else:
+        package_vulns, records = lookup_online(unique_queries, base_url, stats, advisory_cache)
 
-        print(f"Querying vulnerabilities for {ecosystem} {name} {version}...")
-        vulns = query_osv(ecosystem, name, version)
-
-        if vulns:
-            for vuln in vulns:
-                cve_id = next((alias for alias in vuln.get("aliases", []) if alias.startswith("CVE")), None)
-                if cve_id:
-                    with lock:
-                        if cve_id not in vulnerabilities_dict:
-                            cve_info = cve_data[cve_data["CVE_ID"] == cve_id]
-                            if not cve_info.empty:
-                                cve_info = cve_info.iloc[0]
-                                if (cve_info["Base_Severity"] == "N/A" or pd.isna(cve_info["Base_Severity"]) or
-                                    cve_info["Base_Score"] == "N/A" or pd.isna(cve_info["Base_Score"]) or
-                                    cve_info["CVSS_Version"] == "N/A" or pd.isna(cve_info["CVSS_Version"]) or
-                                    cve_info["Vector_String"] == "N/A" or pd.isna(cve_info["Vector_String"])):
-
-                                    ratings = []
-                                else:
-                                    cvss_version = str(cve_info["CVSS_Version"]).replace('.', '')
-                                    if cvss_version == "30":
-                                        cvss_version = "3"
-                                    ratings = [{
-                                        "severity": cve_info["Base_Severity"].lower(),
-                                        "score": cve_info["Base_Score"],
-                                        "method": f"CVSSv{cvss_version}",
-                                        "vector": cve_info["Vector_String"]
-                                    }]
-                            else:
-                                ratings = []
-
-                            published = vuln.get("published")
-                            modified = vuln.get("modified")
-
-                            cleaned_text = clean_text(vuln.get("details", ""))
-
-                            vulnerabilities_dict[cve_id] = {
-                                "id": cve_id,
-                                "source": {
-                                    "name": "OSV-DEV",
-                                    "url": f"https://osv.dev/vulnerability/{vuln.get('id')}"
-                                },
-                                "description": str(cleaned_text),
-                                "ratings": ratings,
-                                "published": published,
-                                "updated": modified,
-                                "affects": []
-                            }
-
-                        affect_ref = component.get("bom-ref")
-                        if affect_ref not in [affect["ref"] for affect in vulnerabilities_dict[cve_id]["affects"]]:
-                            vulnerabilities_dict[cve_id]["affects"].append({
-                                "ref": affect_ref
-                            })
-        else:
+    vulnerabilities_dict = {}
+    affected_refs = {}
+    for affect_ref, query in targets:
+        _, name, version = query
+        vuln_ids = package_vulns.get(query)
+        if not vuln_ids:
             print(f"No vulnerabilities found: {name} {version}")
+            continue
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        executor.map(process_component, components)
+        for vuln_id in vuln_ids:
+            vuln = records.get(vuln_id)
+            if vuln is None:
+                continue
+            cve_id = next((alias for alias in vuln.get("aliases", []) if alias.startswith("CVE")), None)
+            if not cve_id:
+                continue
+
+            if cve_id not in vulnerabilities_dict:
+                vulnerabilities_dict[cve_id] = {
+                    "id": cve_id,
+                    "source": {
+                        "name": "OSV-DEV",
+                        "url": f"https://osv.dev/vulnerability/{vuln.get('id')}"
+                    },
+                    "description": str(clean_text(vuln.get("details", ""))),
+                    "ratings": get_cvss_ratings(cve_index.lookup(cve_id)),
+                    "published": vuln.get("published"),
+                    "updated": vuln.get("modified"),
+                    "affects": []
+                }
+
+            if affect_ref not in affected_refs.setdefault(cve_id, set()):
+                affected_refs[cve_id].add(affect_ref)
+                vulnerabilities_dict[cve_id]["affects"].append({
+                    "ref": affect_ref
+                })
 
     sbom["vulnerabilities"] = list(vulnerabilities_dict.values())
     return sbom
@@ -148,6 +504,8 @@ def add_vulnerabilities_to_sbom(sbom_file):
 if __name__ == "__main__":
     target_repo_path = sys.argv[1]
     repo_name = sys.argv[2]
+    nvd_csv_path = sys.argv[3]
+    nvd_feed_dir = sys.argv[4] if len(sys.argv) > 4 else os.path.join(os.path.dirname(nvd_csv_path), "feeds")
     current_dir = target_repo_path
 
     json_files = glob.glob(os.path.join(current_dir, f"{repo_name}-CycloneDX.json"))
@@ -157,7 +515,7 @@ if __name__ == "__main__":
         sbom_file = json_files[0]
         print(f"Selected SBOM file: {sbom_file}")
 
-        sbom = add_vulnerabilities_to_sbom(sbom_file)
+        sbom = add_vulnerabilities_to_sbom(sbom_file, nvd_csv_path, nvd_feed_dir)
 
         updated_output_file = os.path.join(current_dir, f"{repo_name}-scable.json")
         with open(updated_output_file, 'w', encoding='utf-8') as outfile:
@@ -1,9 +1,14 @@
+import errno
+import fcntl
+import fnmatch
 import os
 import subprocess
 import shutil
 import sys
 import urllib.parse
 
+FICLONE = 0x40049409
+
 def is_url(path):
     try:
         result = urllib.parse.urlparse(path)
@@ -11,51 +16,181 @@ def is_url(path):
     except ValueError:
         return False
 
-def generate_sbom(source_path, repo_name, target_repo_path):
-    try:
-        if not os.path.exists(target_repo_path):
-            os.makedirs(target_repo_path)
+def run_command(command, cwd=None):
+    subprocess.run(command, cwd=cwd, check=True, stdout=sys.stdout, stderr=sys.stderr)
+
+def reflink_file(source, destination):
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, destination)
+
+def split_ignore_patterns(ignore_patterns):
+    root_patterns = [pattern[1:] for pattern in ignore_patterns if pattern.startswith("/")]
+    patterns = [pattern for pattern in ignore_patterns if not pattern.startswith("/")]
+    return root_patterns, patterns
+
+def matches(name, patterns):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+def snapshot_ignore(source_path, ignore_patterns):
+    """copytree ignore function: patterns match names at any depth, patterns starting with '/' only at the root."""
+    root_patterns, patterns = split_ignore_patterns(ignore_patterns)
 
-        repo_clone_path = os.path.join(target_repo_path, f"{repo_name}-repo")
+    def ignore(directory, names):
+        active = patterns + root_patterns if directory == source_path else patterns
+        return {name for name in names if matches(name, active)}
+    return ignore
 
-        if is_url(source_path):
-            if os.path.exists(repo_clone_path):
-                print(f"Directory {repo_clone_path} already exists. Deleting and recloning.")
-                shutil.rmtree(repo_clone_path)
+def path_ignored(relative_path, ignore_patterns):
+    """The snapshot_ignore rules for a path relative to the root of the snapshot."""
+    root_patterns, patterns = split_ignore_patterns(ignore_patterns)
+    names = relative_path.split("/")
+    return matches(names[0], patterns + root_patterns) or any(matches(name, patterns) for name in names[1:])
 
-            subprocess.run(["git", "clone", source_path, repo_clone_path], check=True)
-            analysis_path = repo_clone_path
+def git_output(command):
+    return subprocess.run(command, check=True, capture_output=True, text=True).stdout.strip()
+
+def clean_git_commit(source_path):
+    """HEAD of `source_path` if it is the top of a git work tree without local changes or submodules, else None."""
+    if not os.path.exists(os.path.join(source_path, ".git")) or os.path.exists(os.path.join(source_path, ".gitmodules")):
+        return None
+    try:
+        if git_output(["git", "-C", source_path, "status", "--porcelain"]) != "":
+            return None
+        return git_output(["git", "-C", source_path, "rev-parse", "HEAD"])
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def git_snapshot(source_path, destination_path, commit, ignore_patterns):
+    """Check the files of `commit` out into `destination_path`, leaving out the ignored paths.
+
+    The clone borrows the objects of the source repository, so only the checked-out files are written.
+    """
+    run_command(["git", "clone", "--quiet", "--shared", "--no-checkout", source_path, destination_path])
+    git = ["git", "-C", destination_path]
+    run_command(git + ["read-tree", commit])
+    tracked = subprocess.run(git + ["ls-files", "-z"], check=True, capture_output=True).stdout
+    paths = [path for path in tracked.split(b"\0")
+             if path and not path_ignored(os.fsdecode(path), ignore_patterns)]
+    subprocess.run(git + ["checkout-index", "-z", "--stdin"], input=b"".join(path + b"\0" for path in paths),
+                   check=True)
+    shutil.rmtree(os.path.join(destination_path, ".git"))
+
+def first_file(source_path, ignore_patterns):
+    ignore = snapshot_ignore(source_path, ignore_patterns)
+    for directory, dirnames, filenames in os.walk(source_path):
+        ignored = ignore(directory, dirnames + filenames)
+        dirnames[:] = [name for name in dirnames if name not in ignored]
+        for name in filenames:
+            path = os.path.join(directory, name)
+            if name not in ignored and os.path.isfile(path) and not os.path.islink(path):
+                return path
+    return None
+
+def reflink_available(source_path, destination_path, ignore_patterns):
+    """Try to reflink one file of the source next to the destination."""
+    source = first_file(source_path, ignore_patterns)
+    if source is None:
+        return False
+    probe = f"{destination_path}.reflink-probe"
+    try:
+        reflink_file(source, probe)
+        return True
+    except OSError:
+        return False
+    finally:
+        if os.path.exists(probe):
+            os.remove(probe)
+
+def snapshot_tree(source_path, destination_path, mode="auto", ignore_patterns=()):
+    """Build the workspace from `source_path` without copying file contents where the filesystem allows it.
+
+    `auto` uses reflinks (copy-on-write clones) where the filesystem supports them. Otherwise a git repository
+    without local changes is checked out from its own objects, which writes only the committed files: untracked
+    and git-ignored files (dependency directories, data, local build outputs) are never read. Anything else is
+    copied. `hardlink` has to be asked for: hardlinked files are shared with the source tree, so anything
+    writing into the workspace changes them. Returns the method used.
+    """
+    if mode in ("auto", "git"):
+        if mode == "auto" and reflink_available(source_path, destination_path, ignore_patterns):
+            mode = "reflink"
+        elif (commit := clean_git_commit(source_path)) is not None:
+            git_snapshot(source_path, destination_path, commit, ignore_patterns)
+            print(f"Workspace snapshot of {source_path} checked out from git at {destination_path}")
+            return "git"
         else:
-            source_path = os.path.abspath(source_path)
-            if not os.path.exists(source_path):
-                print(f"[ERROR] The local directory {source_path} does not exist.")
-                sys.exit(1)
+            mode = "copy"
+
+    methods = {"reflink": ["reflink", "copy"], "hardlink": ["hardlink", "copy"], "copy": ["copy"]}[mode]
+    link_functions = {"reflink": reflink_file, "hardlink": os.link, "copy": shutil.copy2}
 
-            if os.path.exists(repo_clone_path):
-                print(f"Directory {repo_clone_path} already exists. Deleting and recopying.")
-                shutil.rmtree(repo_clone_path)
+    def link_or_copy(source, destination):
+        while True:
+            try:
+                return link_functions[methods[0]](source, destination)
+            except OSError as e:
+                if methods[0] == "copy" or e.errno not in (errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY,
+                                                           errno.EINVAL, errno.EPERM, errno.EMLINK):
+                    raise
+                if os.path.exists(destination):
+                    os.remove(destination)
+                print(f"[*] {methods[0]} is not available for {destination_path}, falling back to {methods[1]}.")
+                methods.pop(0)
 
-            shutil.copytree(source_path, repo_clone_path)
-            analysis_path = repo_clone_path
+    shutil.copytree(source_path, destination_path, copy_function=link_or_copy,
+                    ignore=snapshot_ignore(source_path, ignore_patterns))
+    print(f"Workspace snapshot of {source_path} created with {methods[0]} at {destination_path}")
+    return methods[0]
 
-        sbom_file = f"{repo_name}-CycloneDX.json"
-        sbom_output_path = os.path.join(target_repo_path, sbom_file)
+def prepare_source(source_path, repo_name, target_repo_path, run=run_command, snapshot_mode="auto",
+                   ignore_patterns=()):
+    if not os.path.exists(target_repo_path):
+        os.makedirs(target_repo_path)
 
-        cdxgen_command = f"cd '{analysis_path}' && cdxgen -r . -o '{sbom_output_path}'"
-        print(f"Running command: {cdxgen_command}")
+    repo_clone_path = os.path.join(target_repo_path, f"{repo_name}-repo")
 
-        env = os.environ.copy()
+    if is_url(source_path):
+        if os.path.exists(repo_clone_path):
+            print(f"Directory {repo_clone_path} already exists. Deleting and recloning.")
+            shutil.rmtree(repo_clone_path)
 
-        subprocess.run(cdxgen_command, shell=True, check=True, env=env)
+        run(["git", "clone", source_path, repo_clone_path])
+    else:
+        source_path = os.path.abspath(source_path)
+        if not os.path.exists(source_path):
+            raise FileNotFoundError(f"The local directory {source_path} does not exist.")
 
-        print(f"SBOM generated and saved to: {sbom_output_path}")
+        if os.path.exists(repo_clone_path):
+            print(f"Directory {repo_clone_path} already exists. Deleting and recopying.")
+            shutil.rmtree(repo_clone_path)
+
+        snapshot_tree(source_path, repo_clone_path, snapshot_mode, ignore_patterns)
+
+    return repo_clone_path
+
+def run_cdxgen(analysis_path, repo_name, target_repo_path, run=run_command):
+    sbom_file = f"{repo_name}-CycloneDX.json"
+    sbom_output_path = os.path.abspath(os.path.join(target_repo_path, sbom_file))
+
+    cdxgen_command = ["cdxgen", "-r", ".", "-o", sbom_output_path]
+    print(f"Running command: {' '.join(cdxgen_command)} (in {analysis_path})")
+
+    run(cdxgen_command, cwd=analysis_path)
+
+    print(f"SBOM generated and saved to: {sbom_output_path}")
+    return sbom_output_path
+
+def generate_sbom(source_path, repo_name, target_repo_path):
+    try:
+        analysis_path = prepare_source(source_path, repo_name, target_repo_path)
+        return run_cdxgen(analysis_path, repo_name, target_repo_path)
 
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] Command '{e.cmd}' returned non-zero exit status {e.returncode}.")
-        sys.exit(1)
+        raise
     except Exception as e:
         print(f"[ERROR] An unexpected error occurred: {e}")
-        sys.exit(1)
+        raise
 
 if __name__ == "__main__":
     if len(sys.argv) != 4:
@@ -66,4 +201,7 @@ if __name__ == "__main__":
     repo_name = sys.argv[2]
     target_repo_path = sys.argv[3]
 
-    generate_sbom(source_path, repo_name, target_repo_path)
+    try:
+        generate_sbom(source_path, repo_name, target_repo_path)
+    except Exception:
+        sys.exit(1)
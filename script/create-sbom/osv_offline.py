@@ -0,0 +1,265 @@
+import functools
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import zipfile
+from packaging.version import Version, InvalidVersion
+
+OSV_OFFLINE_DB_PATH = os.environ.get("OSV_OFFLINE_DB_PATH", "/home/scable/osv-offline/advisories.sqlite")
+SUPPORTED_ECOSYSTEMS = {"pypi": "PyPI", "npm": "npm", "maven": "Maven"}
+RECORD_FIELDS = ("id", "aliases", "details", "published", "modified")
+
+def normalize_name(ecosystem, name):
+    if ecosystem == "PyPI":
+        return re.sub(r"[-_.]+", "-", name).lower()
+    if ecosystem == "Maven":
+        return name.replace("/", ":")
+    return name
+
+def pep440_key(version):
+    return Version(version)
+
+SEMVER_PATTERN = re.compile(r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$")
+
+def semver_key(version):
+    match = SEMVER_PATTERN.match(version.strip())
+    if not match:
+        raise ValueError(f"Invalid semver: {version}")
+    major, minor, patch, prerelease = match.groups()
+    if prerelease is None:
+        prerelease_key = (1,)
+    else:
+        prerelease_key = (0, tuple((0, int(part), "") if part.isdigit() else (1, 0, part)
+                                   for part in prerelease.split(".")))
+    return (int(major), int(minor or 0), int(patch or 0), prerelease_key)
+
+MAVEN_QUALIFIERS = {"alpha": 0, "a": 0, "beta": 1, "b": 1, "milestone": 2, "m": 2, "rc": 3, "cr": 3,
+                    "snapshot": 4, "": 5, "ga": 5, "final": 5, "release": 5, "sp": 6}
+
+def maven_items(version):
+    items = []
+    for token in re.findall(r"\d+|[a-z]+", version.lower()):
+        items.append(int(token) if token.isdigit() else token)
+    return items
+
+def compare_maven_item(left, right):
+    # Missing items compare as 0 against numbers and as a release against qualifiers, so "1" == "1.0" == "1-final".
+    if left is None:
+        left = 0 if isinstance(right, int) else ""
+    if right is None:
+        right = 0 if isinstance(left, int) else ""
+    if isinstance(left, int) and isinstance(right, int):
+        return (left > right) - (left < right)
+    if isinstance(left, int):
+        return 1
+    if isinstance(right, int):
+        return -1
+    left_key = (MAVEN_QUALIFIERS.get(left, 7), "" if left in MAVEN_QUALIFIERS else left)
+    right_key = (MAVEN_QUALIFIERS.get(right, 7), "" if right in MAVEN_QUALIFIERS else right)
+    return (left_key > right_key) - (left_key < right_key)
+
+@functools.total_ordering
+class MavenVersion:
+    """Maven ComparableVersion ordering: numeric parts numerically, qualifiers alpha < beta < rc < snapshot < release < sp."""
+    def __init__(self, version):
+        self.items = maven_items(version)
+        if not self.items:
+            raise ValueError(f"Invalid Maven version: {version}")
+
+    def compare(self, other):
+        for index in range(max(len(self.items), len(other.items))):
+            left = self.items[index] if index < len(self.items) else None
+            right = other.items[index] if index < len(other.items) else None
+            result = compare_maven_item(left, right)
+            if result:
+                return result
+        return 0
+
+    def __eq__(self, other):
+        return self.compare(other) == 0
+
+    def __lt__(self, other):
+        return self.compare(other) < 0
+
+VERSION_KEYS = {"PyPI": pep440_key, "npm": semver_key, "Maven": MavenVersion}
+
+@functools.lru_cache(maxsize=65536)
+def parse_version(ecosystem, version):
+    try:
+        return VERSION_KEYS[ecosystem](version)
+    except (InvalidVersion, ValueError, KeyError):
+        return None
+
+def encode_ranges(ranges):
+    # Ranges and versions are stored as plain text ("kind=value" events, one range or version per line)
+    # because decoding JSON for every candidate advisory dominated matching time.
+    return "\n".join(" ".join(f"{kind}={value}" for event in events for kind, value in event.items()) for events in ranges)
+
+def decode_ranges(text):
+    return [[tuple(event.split("=", 1)) for event in line.split(" ")] for line in text.split("\n") if line]
+
+unparseable_event_versions = set()
+
+def report_unparseable(ecosystem, value, vuln_id):
+    if (ecosystem, value, vuln_id) not in unparseable_event_versions:
+        unparseable_event_versions.add((ecosystem, value, vuln_id))
+        print(f"[WARNING] Skipping a range of {vuln_id or 'an advisory'}: "
+              f"cannot parse the {ecosystem} event version {value!r}")
+
+def is_affected(ecosystem, version, events, vuln_id=None):
+    """Evaluate OSV range events given as (kind, value) pairs against `version` as the OSV schema describes.
+
+    A range with an event version that cannot be parsed does not match; it is reported once per advisory.
+    """
+    parsed = parse_version(ecosystem, version)
+    if parsed is None:
+        return False
+    ordered, limits = [], []
+    for kind, value in events:
+        if kind not in ("introduced", "fixed", "last_affected", "limit"):
+            continue
+        if value == "0" and kind == "introduced":
+            ordered.append((kind, None))
+            continue
+        event_version = parse_version(ecosystem, value)
+        if event_version is None:
+            report_unparseable(ecosystem, value, vuln_id)
+            return False
+        if kind == "limit":
+            limits.append(event_version)
+        else:
+            ordered.append((kind, event_version))
+
+    if limits and all(parsed >= limit for limit in limits):
+        return False
+    affected = False
+    for kind, event_version in sorted(ordered, key=lambda event: (event[1] is not None, event[1])):
+        if kind == "introduced" and (event_version is None or parsed >= event_version):
+            affected = True
+        elif kind == "fixed" and parsed >= event_version:
+            affected = False
+        elif kind == "last_affected" and parsed > event_version:
+            affected = False
+    return affected
+
+class OfflineAdvisoryStore:
+    """Local index of OSV ecosystem exports (`all.zip`) that matches components without network access."""
+    def __init__(self, path=OSV_OFFLINE_DB_PATH):
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def create_tables(self, conn):
+        conn.execute("CREATE TABLE IF NOT EXISTS advisories (id TEXT, ecosystem TEXT, entry_crc INTEGER, record TEXT, "
+                     "PRIMARY KEY (id, ecosystem))")
+        conn.execute("CREATE TABLE IF NOT EXISTS affected (vuln_id TEXT, ecosystem TEXT, name TEXT, ranges TEXT, versions TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS affected_package ON affected (ecosystem, name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS affected_vuln ON affected (vuln_id, ecosystem)")
+        conn.execute("CREATE TABLE IF NOT EXISTS imports (ecosystem TEXT PRIMARY KEY, archive TEXT, imported_at REAL, advisories INTEGER)")
+
+    def import_archive(self, archive_path, ecosystem):
+        """Import an OSV `all.zip` export, re-parsing only the advisories whose archive entry changed."""
+        ecosystem = SUPPORTED_ECOSYSTEMS.get(ecosystem.lower())
+        if ecosystem is None:
+            raise ValueError(f"Unsupported ecosystem, expected one of: {', '.join(SUPPORTED_ECOSYSTEMS.values())}")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self.connect()
+        try:
+            with conn:
+                self.create_tables(conn)
+                known = dict(conn.execute("SELECT id, entry_crc FROM advisories WHERE ecosystem = ?", (ecosystem,)))
+                seen = set()
+                changed = 0
+                with zipfile.ZipFile(archive_path) as archive:
+                    for entry in archive.infolist():
+                        if not entry.filename.endswith(".json"):
+                            continue
+                        vuln_id = os.path.splitext(os.path.basename(entry.filename))[0]
+                        seen.add(vuln_id)
+                        if known.get(vuln_id) == entry.CRC:
+                            continue
+                        advisory = json.loads(archive.read(entry))
+                        self.replace_advisory(conn, ecosystem, vuln_id, entry.CRC, advisory)
+                        changed += 1
+
+                removed = [vuln_id for vuln_id in known if vuln_id not in seen]
+                for vuln_id in removed:
+                    conn.execute("DELETE FROM affected WHERE vuln_id = ? AND ecosystem = ?", (vuln_id, ecosystem))
+                    conn.execute("DELETE FROM advisories WHERE id = ? AND ecosystem = ?", (vuln_id, ecosystem))
+                conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?)",
+                             (ecosystem, os.path.abspath(archive_path), time.time(), len(seen)))
+        finally:
+            conn.close()
+        print(f"Imported {ecosystem} advisories from {archive_path}: {len(seen)} total, "
+              f"{changed} new or changed, {len(removed)} removed")
+        return {"ecosystem": ecosystem, "advisories": len(seen), "changed": changed, "removed": len(removed)}
+
+    def replace_advisory(self, conn, ecosystem, vuln_id, entry_crc, advisory):
+        # An advisory (e.g. a GHSA) can be part of several ecosystem exports, so rows are scoped by ecosystem.
+        conn.execute("DELETE FROM affected WHERE vuln_id = ? AND ecosystem = ?", (vuln_id, ecosystem))
+        record = {field: advisory[field] for field in RECORD_FIELDS if field in advisory}
+        conn.execute("INSERT OR REPLACE INTO advisories VALUES (?, ?, ?, ?)",
+                     (vuln_id, ecosystem, entry_crc, json.dumps(record)))
+        if advisory.get("withdrawn"):
+            return
+        rows = []
+        for affected in advisory.get("affected", []):
+            package = affected.get("package", {})
+            if package.get("ecosystem") != ecosystem or not package.get("name"):
+                continue
+            ranges = [r.get("events", []) for r in affected.get("ranges", []) if r.get("type") in ("ECOSYSTEM", "SEMVER")]
+            rows.append((vuln_id, ecosystem, normalize_name(ecosystem, package["name"]),
+                         encode_ranges(ranges), "\n".join(affected.get("versions", []))))
+        conn.executemany("INSERT INTO affected VALUES (?, ?, ?, ?, ?)", rows)
+
+    def match(self, queries):
+        """Return {(ecosystem, name, version): [vuln ids]} for every query, all evaluated locally."""
+        results = {}
+        packages = {}
+        conn = self.connect()
+        try:
+            for query in queries:
+                ecosystem, name, version = query
+                results[query] = []
+                if ecosystem not in VERSION_KEYS or not version:
+                    continue
+                package_key = (ecosystem, normalize_name(ecosystem, name))
+                if package_key not in packages:
+                    packages[package_key] = [
+                        (vuln_id, decode_ranges(ranges), set(versions.split("\n")))
+                        for vuln_id, ranges, versions in conn.execute(
+                            "SELECT vuln_id, ranges, versions FROM affected WHERE ecosystem = ? AND name = ?", package_key
+                        )
+                    ]
+                for vuln_id, ranges, versions in packages[package_key]:
+                    if vuln_id in results[query]:
+                        continue
+                    if version in versions or any(is_affected(ecosystem, version, events, vuln_id) for events in ranges):
+                        results[query].append(vuln_id)
+        finally:
+            conn.close()
+        return results
+
+    def get_records(self, vuln_ids):
+        records = {}
+        conn = self.connect()
+        try:
+            for vuln_id in vuln_ids:
+                row = conn.execute("SELECT record FROM advisories WHERE id = ? LIMIT 1", (vuln_id,)).fetchone()
+                if row is not None:
+                    records[vuln_id] = json.loads(row[0])
+        finally:
+            conn.close()
+        return records
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: {sys.argv[0]} <PyPI|npm|Maven> <all.zip>")
+        sys.exit(1)
+    OfflineAdvisoryStore().import_archive(sys.argv[2], sys.argv[1])
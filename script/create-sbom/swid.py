@@ -3,19 +3,21 @@ import uuid
 import os
 import hashlib
 import json
+import shutil
 import sys
+import tempfile
 
 class CycloneDXToSWIDConverter:
-    def __init__(self, cyclonedx_file_path):
+    def __init__(self, cyclonedx_file_path=None, sbom_data=None):
         self.cyclonedx_file_path = cyclonedx_file_path
-        self.sbom_data = self.parse_cyclonedx()
+        self.sbom_data = sbom_data if sbom_data is not None else self.parse_cyclonedx()
 
     def parse_cyclonedx(self):
         with open(self.cyclonedx_file_path, 'r') as file:
             return json.load(file)
 
-    def generate_swid(self):
-        root = ET.Element('SoftwareIdentity', {
+    def root_attributes(self):
+        return {
             'xmlns': 'http://standards.iso.org/iso/19770/-2/2015/schema.xsd',
             'xmlns:ds': 'http://www.w3.org/2000/09/xmldsig#',
             'name': self.sbom_data.get('metadata', {}).get('component', {}).get('name', 'Unknown Software') or 'Unknown Software',
@@ -24,77 +26,99 @@ class CycloneDXToSWIDConverter:
             'version': self.sbom_data.get('metadata', {}).get('component', {}).get('version', '0.0.0') or '0.0.0',
             'versionScheme': 'semver',
             '{http://www.w3.org/XML/1998/namespace}lang': 'en'
-        })
-
-        ET.SubElement(root, 'Entity', {
-            'name': 'SCABLE',
-            'role': 'tagCreator',
-            'regid': 'http://scable.com'
-        })
+        }
 
+    def entities(self):
         component_data = self.sbom_data.get('metadata', {}).get('component', {})
-        entity_name = component_data.get('name') or 'Unknown'
-        entity_regid = component_data.get('bom-ref') or 'Unknown'
-
-        ET.SubElement(root, 'Entity', {
-            'name': entity_name,
-            'role': 'softwareCreator',
-            'regid': entity_regid
-        })
-
-        payload = ET.SubElement(root, 'Payload')
-        components = self.sbom_data.get('components', [])
-        for component in components:
-            file_name = component.get('name') or 'Unknown File'
-            file_version = component.get('version', '1.0.0') or '1.0.0'
-            hashes = component.get('hashes', [])
-            file_hash = None
-            for hash_info in hashes:
-                if hash_info.get('alg') == 'SHA-512':
-                    file_hash = hash_info.get('content')
-                    break
-
-            file_elem_attribs = {
-                'name': file_name,
-                'version': file_version
+        return [
+            {
+                'name': 'SCABLE',
+                'role': 'tagCreator',
+                'regid': 'http://scable.com'
+            },
+            {
+                'name': component_data.get('name') or 'Unknown',
+                'role': 'softwareCreator',
+                'regid': component_data.get('bom-ref') or 'Unknown'
             }
-            if file_hash:
-                file_elem_attribs['hash'] = file_hash
-
-            ET.SubElement(payload, 'File', file_elem_attribs)
-
-        for component in components:
-            licenses = component.get('licenses', [])
-            for license_info in licenses:
-                license_url = license_info.get('license', {}).get('url')
-                if license_url:
-                    ET.SubElement(root, 'Link', {
-                        'rel': 'license',
-                        'href': license_url
-                    })
-
-        return root
+        ]
+
+    def open_writer(self, output_path):
+        return SwidWriter(output_path, self.root_attributes(), self.entities())
+
+    def add_component(self, writer, component):
+        """Write the File entry of a component and queue its license Links."""
+        file_name = component.get('name') or 'Unknown File'
+        file_version = component.get('version', '1.0.0') or '1.0.0'
+        hashes = component.get('hashes', [])
+        file_hash = None
+        for hash_info in hashes:
+            if hash_info.get('alg') == 'SHA-512':
+                file_hash = hash_info.get('content')
+                break
+
+        file_elem_attribs = {
+            'name': file_name,
+            'version': file_version
+        }
+        if file_hash:
+            file_elem_attribs['hash'] = file_hash
+
+        writer.add_file(file_elem_attribs)
+
+        licenses = component.get('licenses', [])
+        for license_info in licenses:
+            license_url = license_info.get('license', {}).get('url')
+            if license_url:
+                writer.add_link({
+                    'rel': 'license',
+                    'href': license_url
+                })
 
     def save_swid(self, output_path):
-        root = self.generate_swid()
-        tree = ET.ElementTree(root)
-        self.indent(root)
-        tree.write(output_path, encoding='UTF-8', xml_declaration=True)
-
-    def indent(self, elem, level=0):
-        i = "\n" + level * "  "
-        if len(elem):
-            if not elem.text or not elem.text.strip():
-                elem.text = i + "  "
-            if not elem.tail or not elem.tail.strip():
-                elem.tail = i
-            for subelem in elem:
-                self.indent(subelem, level + 1)
-            if not subelem.tail or not subelem.tail.strip():
-                subelem.tail = i
-        else:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = i
+        writer = self.open_writer(output_path)
+        try:
+            for component in self.sbom_data.get('components', []):
+                self.add_component(writer, component)
+        finally:
+            writer.close()
+
+def element_xml(tag, attributes):
+    return ET.tostring(ET.Element(tag, attributes), encoding='unicode')
+
+class SwidWriter:
+    """Writes a SWID tag element by element in the layout ElementTree produces for the indented tree:
+    the Entities, a Payload with every File, then every license Link.
+
+    Files are written as they are added. Links are spooled to a temporary file until the Payload is closed.
+    """
+    def __init__(self, output_path, root_attributes, entities):
+        self.file = open(output_path, 'w', encoding='UTF-8', errors='xmlcharrefreplace')
+        self.links = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+', encoding='UTF-8')
+        self.file_count = 0
+        self.file.write("<?xml version='1.0' encoding='UTF-8'?>\n")
+        # The root is serialized empty ("<SoftwareIdentity ... />") and turned into its start tag.
+        self.file.write(element_xml('SoftwareIdentity', root_attributes)[:-len(' />')] + '>')
+        for entity in entities:
+            self.file.write('\n  ' + element_xml('Entity', entity))
+        self.file.write('\n  <Payload')
+
+    def add_file(self, attributes):
+        self.file.write(('\n    ' if self.file_count else '>\n    ') + element_xml('File', attributes))
+        self.file_count += 1
+
+    def add_link(self, attributes):
+        self.links.write('\n  ' + element_xml('Link', attributes))
+
+    def close(self):
+        try:
+            self.file.write('\n  </Payload>' if self.file_count else ' />')
+            self.links.seek(0)
+            shutil.copyfileobj(self.links, self.file)
+            self.file.write('\n</SoftwareIdentity>\n')
+        finally:
+            self.links.close()
+            self.file.close()
 
 if __name__ == "__main__":
     target_repo_path = sys.argv[1]
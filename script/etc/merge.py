@@ -43,10 +43,19 @@ def extract_name_from_ref(ref):
             print(f"Error: Failed to extract name from ref - {ref}\n{e}")
             return ref
 
-def determine_color(ref, package_map, reachable_libraries):
+def name_lookup(index=None):
+    """Return a ref -> package name function that parses each ref at most once, seeded from the SbomIndex if given."""
+    names = {ref: name for ref, name in index.purl_names.items() if name is not None} if index is not None else {}
+    def lookup(ref):
+        if ref not in names:
+            names[ref] = extract_name_from_ref(ref)
+        return names[ref]
+    return lookup
+
+def determine_color(ref, package_map, reachable_libraries, name_of=extract_name_from_ref):
     package = package_map.get(ref, {})
     vulnerabilities = package.get("vulnerabilities", [])
-    name = extract_name_from_ref(ref)
+    name = name_of(ref)
     if reachable_libraries and name in reachable_libraries:
         return "Red"
     elif vulnerabilities:
@@ -84,10 +93,10 @@ def get_reachable_libraries(reachable_data):
         return set()
     return {item.get("reachable-library") for item in reachable_data if item.get("reachable-library")}
 
-def filter_dependencies(package_map, dependency_map, reachable_libraries):
+def filter_dependencies(package_map, dependency_map, reachable_libraries, name_of=extract_name_from_ref):
     cve_packages = {ref for ref, data in package_map.items() if data["vulnerabilities"]}
     if reachable_libraries:
-        reachable_refs = {ref for ref in package_map if extract_name_from_ref(ref) in reachable_libraries}
+        reachable_refs = {ref for ref in package_map if name_of(ref) in reachable_libraries}
         initial_refs = cve_packages.union(reachable_refs)
     else:
         initial_refs = cve_packages
@@ -106,7 +115,8 @@ def filter_dependencies(package_map, dependency_map, reachable_libraries):
                 queue.append(dep_ref)
     return included_refs
 
-def create_filtered_dependencies(package_map, dependency_map, reachable_libraries, included_refs):
+def create_filtered_dependencies(package_map, dependency_map, reachable_libraries, included_refs,
+                                 name_of=extract_name_from_ref):
     filtered_dependencies = []
     for ref in included_refs:
         package = package_map.get(ref, {})
@@ -114,7 +124,7 @@ def create_filtered_dependencies(package_map, dependency_map, reachable_librarie
         if unique_id is None:
             unique_id = "Null"
         vulnerabilities = package.get("vulnerabilities", [])
-        color = determine_color(ref, package_map, reachable_libraries)
+        color = determine_color(ref, package_map, reachable_libraries, name_of)
         depends_on = [dep for dep in dependency_map.get(ref, []) if dep in included_refs]
         filtered_dependencies.append({
             "ref": ref,
@@ -146,10 +156,15 @@ def main():
     if not reachable_data:
         print(f"Failed to load {reachable_path}.")
         reachable_data = []
+    save_json(build_dependency_graph(sbom_detail, sbom_cyclonedx, reachable_data), output_path)
+    print("[+] merge ok")
+
+def build_dependency_graph(sbom_detail, sbom_cyclonedx, reachable_data, index=None):
     package_map = build_package_map(sbom_detail)
-    dependency_map = build_dependency_map(sbom_cyclonedx)
+    dependency_map = index.clean_dependencies_by_ref if index is not None else build_dependency_map(sbom_cyclonedx)
     reachable_libraries = get_reachable_libraries(reachable_data)
-    included_refs = filter_dependencies(package_map, dependency_map, reachable_libraries)
+    name_of = name_lookup(index)
+    included_refs = filter_dependencies(package_map, dependency_map, reachable_libraries, name_of)
     if not included_refs:
         print("No dependencies with CVEs found. The dependency.json file will contain an empty array.")
         filtered_dependencies = []
@@ -158,10 +173,10 @@ def main():
             package_map,
             dependency_map,
             reachable_libraries,
-            included_refs
+            included_refs,
+            name_of
         )
-    save_json({"dependencies": filtered_dependencies}, output_path)
-    print("[+] merge ok")
+    return {"dependencies": filtered_dependencies}
 
 if __name__ == "__main__":
     main()
@@ -17,19 +17,19 @@ def load_settings(file_path="/home/scable/settings.json"):
     except json.JSONDecodeError:
         raise EnvironmentError(f"Failed to decode JSON from '{file_path}'.")
 
-settings = load_settings()
-
-slack_webhook_url = settings.get("SLACK_WEBHOOK_URL")
-slack_token = settings.get("SLACK_TOKEN")
-user_tag = settings.get("USER_TAG")
-channel_id = settings.get("SLACK_CHANNEL_ID")
-
-if not slack_webhook_url or not slack_token or not user_tag or not channel_id:
-    raise EnvironmentError("Missing required Slack settings: SLACK_WEBHOOK_URL, SLACK_TOKEN, USER_TAG, SLACK_CHANNEL_ID.")
-
-client = WebClient(token=slack_token)
+def load_slack_settings(file_path="/home/scable/settings.json"):
+    settings = load_settings(file_path)
+    slack_settings = {
+        "webhook_url": settings.get("SLACK_WEBHOOK_URL"),
+        "token": settings.get("SLACK_TOKEN"),
+        "user_tag": settings.get("USER_TAG"),
+        "channel_id": settings.get("SLACK_CHANNEL_ID")
+    }
+    if not all(slack_settings.values()):
+        raise EnvironmentError("Missing required Slack settings: SLACK_WEBHOOK_URL, SLACK_TOKEN, USER_TAG, SLACK_CHANNEL_ID.")
+    return slack_settings
 
-def send_slack_alert(first_observed_at, end_time, repository_name, channel, date, user_tag=user_tag, color='#87CEEB'):
+def send_slack_alert(client, first_observed_at, end_time, repository_name, channel, date, user_tag, color='#87CEEB'):
     sbom_url = f"http://localhost:5173/{date}_{first_observed_at}_{repository_name}"
 
     slack_message = {
@@ -93,7 +93,7 @@ def send_slack_alert(first_observed_at, end_time, repository_name, channel, date
             'body': f"Error sending message to Slack: {e.response['error']}"
         }
 
-def upload_file_to_slack(file_path, channel, thread_ts):
+def upload_file_to_slack(client, file_path, channel, thread_ts):
     if not os.path.exists(file_path):
         return {
             'statusCode': 404,
@@ -117,6 +117,21 @@ def upload_file_to_slack(file_path, channel, thread_ts):
             'body': f"Error uploading file to Slack: {e.response['error']}"
         }
 
+def notify_scan_result(repo_name, target_repo_path, start_time, end_time, date):
+    slack_settings = load_slack_settings()
+    client = WebClient(token=slack_settings["token"])
+    channel_id = slack_settings["channel_id"]
+
+    response = send_slack_alert(client, start_time, end_time, repo_name, channel_id, date, slack_settings["user_tag"])
+    print(response)
+
+    ts = response['ts'] if response['statusCode'] is True else None
+
+    if ts:
+        zip_file_path = f"{target_repo_path}/{repo_name}-scable.zip".strip()
+        file_upload_response = upload_file_to_slack(client, zip_file_path, channel_id, ts)
+        print(file_upload_response)
+
 if __name__ == "__main__":
     try:
         repo_name = sys.argv[1].strip()
@@ -125,15 +140,7 @@ if __name__ == "__main__":
         end_time = sys.argv[4].strip()
         date = sys.argv[5].strip()
 
-        response = send_slack_alert(start_time, end_time, repo_name, channel_id, date)
-        print(response)
-
-        ts = response['ts'] if response['statusCode'] is True else None
-
-        if ts:
-            zip_file_path = f"{target_repo_path}/{repo_name}-scable.zip".strip()
-            file_upload_response = upload_file_to_slack(zip_file_path, channel_id, ts)
-            print(file_upload_response)
+        notify_scan_result(repo_name, target_repo_path, start_time, end_time, date)
     except IndexError:
         print("Error: Missing required command-line arguments: repo_name, target_repo_path, start_time, end_time, date.")
         sys.exit(1)
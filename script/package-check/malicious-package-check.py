@@ -5,7 +5,7 @@ import json
 from urllib.parse import unquote
 import pandas as pd
 from typo import TypoSquattingChecker
-from functools import lru_cache
+from functools import lru_cache, wraps
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 import time
@@ -13,11 +13,55 @@ import collections
 
 thread_local = threading.local()
 
+FAMOUS_PACKAGE_EXCEL_PATHS = (
+    '/home/scable/script/package-check/top_10000_npm_packages.xlsx',
+    '/home/scable/script/package-check/top_8000_pypi_packages.xlsx',
+    '/home/scable/script/package-check/top_200_maven_packages.xlsx',
+    '/home/scable/script/package-check/top_400_github_projects.xlsx'
+)
+
+def count_stat(key, amount=1):
+    stats = getattr(thread_local, "stats", None)
+    if stats is not None:
+        stats.add(key, amount)
+
+def count_request(response, *args, **kwargs):
+    count_stat("network_requests")
+
 def get_session():
     if not hasattr(thread_local, "session"):
         thread_local.session = requests.Session()
+        thread_local.session.hooks["response"].append(count_request)
     return thread_local.session
 
+class MetadataCache(dict):
+    """Metadata lookups of one package check run, shared by its worker threads."""
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+def metadata_cache(function):
+    """Memoize a metadata lookup in the MetadataCache bound to the calling thread, counting hits in its stats.
+
+    Each run has its own cache, so concurrent runs neither share nor clear each other's entries.
+    """
+    @wraps(function)
+    def wrapper(*args):
+        cache = getattr(thread_local, "metadata_cache", None)
+        if cache is None:
+            return function(*args)
+        key = (function.__name__,) + args
+        with cache.lock:
+            if key in cache:
+                count_stat("cache_hits")
+                return cache[key]
+        result = function(*args)
+        with cache.lock:
+            cache[key] = result
+        return result
+
+    return wrapper
+
 def load_settings():
     with open("settings.json", "r") as f:
         return json.load(f)
@@ -29,9 +73,17 @@ def load_famous_libraries_from_excel(file_paths):
         famous_libraries.update(df.iloc[:, 0].dropna().str.lower().tolist())
     return list(famous_libraries)
 
+@lru_cache(maxsize=None)
+def get_typo_resources():
+    famous_libraries = load_famous_libraries_from_excel(FAMOUS_PACKAGE_EXCEL_PATHS)
+    return famous_libraries, TypoSquattingChecker(famous_libraries)
+
 def load_components_from_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as file:
         data = json.load(file)
+    return prepare_components(data)
+
+def prepare_components(data):
     components = data.get("components", [])
     for component in components:
         platform = component.get("ecosystem", "").lower()
@@ -48,7 +100,7 @@ def load_components_from_json(file_path):
     print(f"Total components loaded: {len(components)}")
     return data
 
-@lru_cache(maxsize=None)
+@metadata_cache
 def get_npm_metadata(package_name):
     session = get_session()
     print(f"Fetching npm metadata for package: {package_name}")
@@ -86,7 +138,7 @@ def get_npm_metadata(package_name):
     print(f"Failed to fetch npm metadata for package: {package_name}")
     return None, None, None, None
 
-@lru_cache(maxsize=None)
+@metadata_cache
 def get_pypi_metadata(package_name):
     session = get_session()
     print(f"Fetching PyPI metadata for package: {package_name}")
@@ -116,7 +168,7 @@ def get_pypi_metadata(package_name):
     print(f"Failed to fetch PyPI metadata for package: {package_name}")
     return None, None, None, None
 
-@lru_cache(maxsize=None)
+@metadata_cache
 def get_pypi_downloads(package_name):
     session = get_session()
     url = f"https://pypistats.org/api/packages/{package_name}/recent?period=week"
@@ -136,7 +188,7 @@ def get_pypi_downloads(package_name):
         print(f"Failed to fetch download data for package: {package_name}")
     return None
 
-@lru_cache(maxsize=None)
+@metadata_cache
 def get_npm_downloads(package_name):
     session = get_session()
     url = f"https://api.npmjs.org/downloads/point/last-week/{package_name}"
@@ -155,7 +207,7 @@ def get_npm_downloads(package_name):
         pass
     return None
 
-@lru_cache(maxsize=None)
+@metadata_cache
 def get_github_stars(github_url, api_token):
     session = get_session()
     time.sleep(1)
@@ -201,7 +253,7 @@ def get_github_stars(github_url, api_token):
         return 0
 
 
-@lru_cache(maxsize=None)
+@metadata_cache
 def get_github_metadata(repo_name, api_token):
     session = get_session()
     time.sleep(1)
@@ -465,6 +517,17 @@ def process_component(component, api_token, typo_checker, famous_libraries, none
 def analyze_json_file(file_path, summary_output_file, famous_libraries, typo_checker, api_token):
     print(f"Starting analysis for JSON file: {file_path}")
     data = load_components_from_json(file_path)
+    summary = analyze_components(data, famous_libraries, typo_checker, api_token)
+
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=4)
+    print(f"Analysis results saved back to JSON file: {file_path}")
+
+    with open(summary_output_file, 'w', encoding='utf-8') as summary_file:
+        json.dump(summary, summary_file, indent=4)
+    print(f"Summary results saved to JSON file: {summary_output_file}")
+
+def analyze_components(data, famous_libraries, typo_checker, api_token, stats=None):
     components = data.get("components", [])
 
     updated_components = []
@@ -474,9 +537,20 @@ def analyze_json_file(file_path, summary_output_file, famous_libraries, typo_che
     none_counts = collections.defaultdict(int)
     none_counts_lock = threading.Lock()
 
+    metadata = MetadataCache()
+
+    def process_with_stats(*args):
+        thread_local.stats = stats
+        thread_local.metadata_cache = metadata
+        try:
+            return process_component(*args)
+        finally:
+            thread_local.stats = None
+            thread_local.metadata_cache = None
+
     with ThreadPoolExecutor(max_workers=20) as executor:
         future_to_component = {
-            executor.submit(process_component, component, api_token, typo_checker, famous_libraries, none_counts, none_counts_lock): component
+            executor.submit(process_with_stats, component, api_token, typo_checker, famous_libraries, none_counts, none_counts_lock): component
             for component in components
         }
 
@@ -497,16 +571,16 @@ def analyze_json_file(file_path, summary_output_file, famous_libraries, typo_che
         -x["package_check"][0].get('Score', 0) if isinstance(x["package_check"][0].get('Score', None), int) else float('-inf')
     ))
 
-    with open(file_path, 'w', encoding='utf-8') as file:
-        json.dump(data, file, indent=4)
-    print(f"Analysis results saved back to JSON file: {file_path}")
-
+    result_rows = []
     for component in updated_components:
         pkg_check = component.get("package_check", [{}])[0]
-        component["Risk Level"] = pkg_check.get("Risk Level", "N/A")
-        component["Score"] = pkg_check.get("Score", 0)
+        result_rows.append({
+            **component,
+            "Risk Level": pkg_check.get("Risk Level", "N/A"),
+            "Score": pkg_check.get("Score", 0)
+        })
 
-    results_df = pd.DataFrame(updated_components)
+    results_df = pd.DataFrame(result_rows)
     
     if 'Risk Level' not in results_df.columns:
         print("[ERROR] 'Risk Level' column is missing in the DataFrame. Adding 'Risk Level' with default 'N/A'.")
@@ -573,9 +647,7 @@ def analyze_json_file(file_path, summary_output_file, famous_libraries, typo_che
 
     summary['None_Count'] = dict(none_counts)
 
-    with open(summary_output_file, 'w', encoding='utf-8') as summary_file:
-        json.dump(summary, summary_file, indent=4)
-    print(f"Summary results saved to JSON file: {summary_output_file}")
+    return summary
 
 def main():
     if len(sys.argv) != 5:
@@ -596,15 +668,8 @@ def main():
         print("[ERROR] GitHub API Token is missing in settings.json.")
         sys.exit(1)
 
-    famous_libraries = load_famous_libraries_from_excel([
-        '/home/scable/script/package-check/top_10000_npm_packages.xlsx',
-        '/home/scable/script/package-check/top_8000_pypi_packages.xlsx',
-        '/home/scable/script/package-check/top_200_maven_packages.xlsx',
-        '/home/scable/script/package-check/top_400_github_projects.xlsx'
-    ])
-    
-    typo_checker = TypoSquattingChecker(famous_libraries)
-    
+    famous_libraries, typo_checker = get_typo_resources()
+
     analyze_json_file(
         file_path=json_file_path,
         summary_output_file=summary_json_path,
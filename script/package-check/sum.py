@@ -1,51 +1,51 @@
 import json
 import sys
 
-repo_name = sys.argv[1]
-target_repo_path = sys.argv[2]
-start_time = sys.argv[3]
-date = sys.argv[4]
-
-input_file_path = f"{target_repo_path}/{date}-{start_time}-{repo_name}-scable-CycloneDX.json"
-output_file_path = f"{target_repo_path}/sbom-summary.json"
-
-with open(input_file_path, "r", encoding="utf-8") as file:
-    sbom_data = json.load(file)
-
-summary = {
-    "project": sbom_data.get("metadata", {}).get("component", {}).get("name", "알 수 없음"),
-    "version": sbom_data.get("metadata", {}).get("component", {}).get("version", "알 수 없음"),
-    "purl": sbom_data.get("metadata", {}).get("component", {}).get("purl", "알 수 없음"),
-    "format": sbom_data.get("bomFormat", "알 수 없음"),
-    "sbomversion": sbom_data.get("specVersion", "알 수 없음"),
-    "id": sbom_data.get("serialNumber", "알 수 없음"),
-    "last_update": sbom_data.get("metadata", {}).get("timestamp", "알 수 없음"),
-    "tool": [tool.get("name", "알 수 없음") for tool in sbom_data.get("metadata", {}).get("tools", {}).get("components", [])],
-    "author": [author.get("name", "알 수 없음") for author in sbom_data.get("metadata", {}).get("authors", [])],
-    "license_sum": {
-        "usedlicense": 0
-    },
-    "package_sum": {
-        "total": 0,
-        "npm": 0,
-        "GitHub": 0,
-        "Maven": 0,
-        "PyPI": 0,
-        "기타": 0
-    },
-    "vuln_sum": {
-        "total": 0,
-        "critical": 0,
-        "high": 0,
-        "medium": 0,
-        "low": 0,
-        "unknown": 0
+def create_summary(sbom_data):
+    return {
+        "project": sbom_data.get("metadata", {}).get("component", {}).get("name", "알 수 없음"),
+        "version": sbom_data.get("metadata", {}).get("component", {}).get("version", "알 수 없음"),
+        "purl": sbom_data.get("metadata", {}).get("component", {}).get("purl", "알 수 없음"),
+        "format": sbom_data.get("bomFormat", "알 수 없음"),
+        "sbomversion": sbom_data.get("specVersion", "알 수 없음"),
+        "id": sbom_data.get("serialNumber", "알 수 없음"),
+        "last_update": sbom_data.get("metadata", {}).get("timestamp", "알 수 없음"),
+        "tool": [tool.get("name", "알 수 없음") for tool in sbom_data.get("metadata", {}).get("tools", {}).get("components", [])],
+        "author": [author.get("name", "알 수 없음") for author in sbom_data.get("metadata", {}).get("authors", [])],
+        "license_sum": {
+            "usedlicense": 0
+        },
+        "package_sum": {
+            "total": 0,
+            "npm": 0,
+            "GitHub": 0,
+            "Maven": 0,
+            "PyPI": 0,
+            "기타": 0
+        },
+        "vuln_sum": {
+            "total": 0,
+            "critical": 0,
+            "high": 0,
+            "medium": 0,
+            "low": 0,
+            "unknown": 0
+        }
     }
-}
 
-components = sbom_data.get("components", []) or sbom_data.get("metadata", {}).get("component", {}).get("components", [])
+def summary_components(sbom_data):
+    return sbom_data.get("components", []) or sbom_data.get("metadata", {}).get("component", {}).get("components", [])
 
-for component in components:
+def add_vulnerability_summary(summary, vulnerability):
+    summary["vuln_sum"]["total"] += 1
+    ratings = vulnerability.get("ratings", [])
+    severity = ratings[0].get("severity", "unknown").lower() if ratings else "unknown"
+    if severity in summary["vuln_sum"]:
+        summary["vuln_sum"][severity] += 1
+    else:
+        summary["vuln_sum"]["unknown"] += 1
+
+def add_component_summary(summary, component):
     summary["package_sum"]["total"] += 1
 
     licenses = component.get("licenses", [])
@@ -70,24 +70,37 @@ for component in components:
 
     vulnerabilities = component.get("vulnerabilities", [])
     for vulnerability in vulnerabilities:
-        summary["vuln_sum"]["total"] += 1
-        ratings = vulnerability.get("ratings", [])
-        severity = ratings[0].get("severity", "unknown").lower() if ratings else "unknown"
-        if severity in summary["vuln_sum"]:
-            summary["vuln_sum"][severity] += 1
-        else:
-            summary["vuln_sum"]["unknown"] += 1
+        add_vulnerability_summary(summary, vulnerability)
 
-for vulnerability in sbom_data.get("vulnerabilities", []):
-    summary["vuln_sum"]["total"] += 1
-    ratings = vulnerability.get("ratings", [])
-    severity = ratings[0].get("severity", "unknown").lower() if ratings else "unknown"
-    if severity in summary["vuln_sum"]:
-        summary["vuln_sum"][severity] += 1
-    else:
-        summary["vuln_sum"]["unknown"] += 1
+def finish_summary(summary, sbom_data):
+    """Count the document-level vulnerabilities and the distinct licenses once every component was added."""
+    for vulnerability in sbom_data.get("vulnerabilities", []):
+        add_vulnerability_summary(summary, vulnerability)
+
+    summary["license_sum"]["usedlicense"] = len(summary["license_sum"]) - 1
+
+    return summary
+
+def summarize_sbom(sbom_data):
+    summary = create_summary(sbom_data)
+    for component in summary_components(sbom_data):
+        add_component_summary(summary, component)
+    return finish_summary(summary, sbom_data)
+
+def save_summary(summary, output_file_path):
+    with open(output_file_path, "w", encoding="utf-8") as file:
+        json.dump(summary, file, ensure_ascii=False, indent=4)
+
+if __name__ == "__main__":
+    repo_name = sys.argv[1]
+    target_repo_path = sys.argv[2]
+    start_time = sys.argv[3]
+    date = sys.argv[4]
+
+    input_file_path = f"{target_repo_path}/{date}-{start_time}-{repo_name}-scable-CycloneDX.json"
+    output_file_path = f"{target_repo_path}/sbom-summary.json"
 
-summary["license_sum"]["usedlicense"] = len(summary["license_sum"]) - 1
+    with open(input_file_path, "r", encoding="utf-8") as file:
+        sbom_data = json.load(file)
 
-with open(output_file_path, "w", encoding="utf-8") as file:
-    json.dump(summary, file, ensure_ascii=False, indent=4)
+    save_summary(summarize_sbom(sbom_data), output_file_path)
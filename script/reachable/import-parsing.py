@@ -29,22 +29,27 @@ def find_imports_in_file(file_path):
                         })
         return imports
 
-def find_imports_in_project(root_dir):
-    imports = []
+def walk_files(root_dir):
     for dirpath, _, filenames in os.walk(root_dir):
         for filename in filenames:
-            if filename.endswith(".py"):
-                file_path = os.path.join(dirpath, filename)
-                imports_in_file = find_imports_in_file(file_path)
-                imports.extend(imports_in_file)
+            yield os.path.join(dirpath, filename)
+
+def find_imports_in_project(root_dir, scope=None):
+    """Imports of every .py file under root_dir, or only of the files an ExtractionScope keeps."""
+    imports = []
+    for file_path in (scope.walk(root_dir) if scope is not None else walk_files(root_dir)):
+        if file_path.endswith(".py"):
+            imports_in_file = find_imports_in_file(file_path)
+            imports.extend(imports_in_file)
     return imports
 
-target_repo_path = sys.argv[1]
-repo_name = sys.argv[2]
-project_path = os.path.join(target_repo_path, f"{repo_name}-repo")
-imported_modules = find_imports_in_project(project_path)
+if __name__ == "__main__":
+    target_repo_path = sys.argv[1]
+    repo_name = sys.argv[2]
+    project_path = os.path.join(target_repo_path, f"{repo_name}-repo")
+    imported_modules = find_imports_in_project(project_path)
 
-output_path = os.path.join(target_repo_path, "import-parsing.txt")
-with open(output_path, "w", encoding="utf-8") as f:
-    for item in imported_modules:
-        f.write(f"{item['module']} {item['alias']} {item['function']}\n")
\ No newline at end of file
+    output_path = os.path.join(target_repo_path, "import-parsing.txt")
+    with open(output_path, "w", encoding="utf-8") as f:
+        for item in imported_modules:
+            f.write(f"{item['module']} {item['alias']} {item['function']}\n")
@@ -6,6 +6,13 @@ def extract_cve_libraries(json_path, target_repo_path):
     with open(json_path, "r") as file:
         data = json.load(file)
 
+    vulnerable_packages = find_vulnerable_packages(data)
+
+    with open(f"{target_repo_path}/requirements.txt", "w") as output_file:
+        for package in vulnerable_packages:
+            output_file.write(f"{package}\n")
+
+def find_vulnerable_packages(data):
     vulnerable_packages = set()
     vulnerabilities = data.get("vulnerabilities", [])
 
@@ -23,9 +30,17 @@ def extract_cve_libraries(json_path, target_repo_path):
             else:
                 continue
 
-    with open(f"{target_repo_path}/requirements.txt", "w") as output_file:
-        for package in vulnerable_packages:
-            output_file.write(f"{package}\n")
+    return vulnerable_packages
+
+def find_vulnerable_package_versions(data):
+    """(name, version) of every vulnerable PyPI package, as given by the purls the vulnerabilities affect."""
+    package_versions = set()
+    for vulnerability in data.get("vulnerabilities", []):
+        for affect in vulnerability.get("affects", []):
+            match = re.match(r"^pkg:pypi/([^@]+)@([^?#]+)", affect.get("ref", ""))
+            if match:
+                package_versions.add((match.group(1), match.group(2)))
+    return package_versions
 
 if __name__ == "__main__":
     sbom_path = sys.argv[1]
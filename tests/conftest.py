@@ -0,0 +1,14 @@
+import os
+import sys
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+@pytest.fixture
+def load_script(monkeypatch):
+    """engine.pipelineRunner.load_script reading the scripts of this checkout instead of Config.SCRIPT_HOME_PATH."""
+    from config import Config
+    from engine import pipelineRunner
+    monkeypatch.setattr(Config, "SCRIPT_HOME_PATH", os.path.join(REPO_ROOT, "script"))
+    return pipelineRunner.load_script
@@ -0,0 +1,66 @@
+import pytest
+
+DJANGO = ("PyPI", "django", "3.2.0")
+REQUESTS = ("PyPI", "requests", "2.31.0")
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def add_cve(load_script):
+    return load_script("create-sbom/add_cve.py")
+
+@pytest.fixture
+def clock(add_cve, monkeypatch):
+    clock = Clock(1_700_000_000)
+    monkeypatch.setattr(add_cve, "time", clock)
+    return clock
+
+def make_cache(add_cve, tmp_path):
+    return add_cve.AdvisoryCache(path=str(tmp_path / "advisories.sqlite"), ttl_hours=24, negative_ttl_hours=6)
+
+def test_entries_expire_after_their_ttl(add_cve, clock, tmp_path):
+    cache = make_cache(add_cve, tmp_path)
+    cache.put_packages({DJANGO: ["GHSA-1"], REQUESTS: []})
+    cache.put_records({"GHSA-1": {"id": "GHSA-1"}})
+    assert cache.get_packages([DJANGO, REQUESTS]) == {DJANGO: ["GHSA-1"], REQUESTS: []}
+
+    clock.now += 6 * 3600
+    assert cache.get_packages([DJANGO, REQUESTS]) == {DJANGO: ["GHSA-1"]}
+    assert cache.get_records(["GHSA-1"]) == {"GHSA-1": {"id": "GHSA-1"}}
+
+    clock.now += 18 * 3600
+    assert cache.get_packages([DJANGO, REQUESTS]) == {}
+    assert cache.get_records(["GHSA-1"]) == {}
+
+def test_invalidation_drops_the_package_and_its_records(add_cve, clock, tmp_path):
+    cache = make_cache(add_cve, tmp_path)
+    cache.put_packages({DJANGO: ["GHSA-1"], REQUESTS: ["GHSA-2"]})
+    cache.put_records({"GHSA-1": {"id": "GHSA-1"}, "GHSA-2": {"id": "GHSA-2"}})
+
+    assert cache.invalidate(name="django") == 1
+    assert cache.get_packages([DJANGO, REQUESTS]) == {REQUESTS: ["GHSA-2"]}
+    assert cache.get_records(["GHSA-1", "GHSA-2"]) == {"GHSA-2": {"id": "GHSA-2"}}
+
+    assert cache.invalidate() == 1
+    assert cache.get_packages([REQUESTS]) == {} and cache.get_records(["GHSA-2"]) == {}
+
+def test_cached_packages_are_not_queried_again(add_cve, clock, tmp_path, monkeypatch):
+    queried = []
+
+    def query_osv_batch(queries, base_url, stats=None):
+        queried.extend(queries)
+        return [["GHSA-1"] if query == DJANGO else None for query in queries]
+
+    monkeypatch.setattr(add_cve, "query_osv_batch", query_osv_batch)
+    monkeypatch.setattr(add_cve, "fetch_vulnerabilities",
+                        lambda vuln_ids, base_url, stats=None: {vuln_id: {"id": vuln_id} for vuln_id in vuln_ids})
+    cache = make_cache(add_cve, tmp_path)
+
+    add_cve.lookup_online([DJANGO, REQUESTS], "https://osv.test", None, cache)
+    add_cve.lookup_online([DJANGO, REQUESTS], "https://osv.test", None, cache)
+    assert queried == [DJANGO, REQUESTS, REQUESTS]
@@ -0,0 +1,28 @@
+from engine.pipelineRunner import PipelineContext, get_cache_keys
+from engine.resultCache import manifest_fingerprint
+
+def make_context(repo_url, repo_name):
+    context = PipelineContext(repo_url, repo_name, "python", "/tmp/scable-test", "000000", "20240101")
+    context.artifacts.update({"query_fingerprint": "queries", "advisory_snapshot": "snapshot", "package_check_enabled": True})
+    return context
+
+def write_manifest(path):
+    path.mkdir()
+    (path / "requirements.txt").write_text("requests==2.31.0\nflask==3.0.0\n")
+    return manifest_fingerprint(str(path))
+
+def test_repositories_with_identical_manifests_do_not_share_results(tmp_path):
+    manifests_a = write_manifest(tmp_path / "service-a")
+    manifests_b = write_manifest(tmp_path / "service-b")
+    assert manifests_a == manifests_b
+
+    keys_a = get_cache_keys(make_context("https://github.com/org/service-a", "service-a"), "commit-a", manifests_a)
+    keys_b = get_cache_keys(make_context("https://github.com/org/service-b", "service-b"), "commit-b", manifests_b)
+
+    assert keys_a["sbom"] != keys_b["sbom"]
+    assert keys_a["reachable"] != keys_b["reachable"]
+
+def test_credentials_do_not_change_the_keys():
+    keys = get_cache_keys(make_context("https://github.com/org/service-a", "service-a"), "commit", "manifests")
+    keys_with_token = get_cache_keys(make_context("https://token@github.com/org/service-a", "service-a"), "commit", "manifests")
+    assert keys == keys_with_token
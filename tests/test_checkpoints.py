@@ -0,0 +1,36 @@
+from engine.checkpoint import CheckpointStore
+from engine.pipelineRunner import PipelineContext, PipelineRunner
+import json
+
+COMPONENTS = [{"bom-ref": "pkg:pypi/requests@2.31.0", "name": "requests", "version": "2.31.0"}]
+VULNERABILITIES = [{"id": "CVE-2024-35195", "affects": [{"ref": "pkg:pypi/requests@2.31.0"}]}]
+
+def make_context(tmp_path):
+    return PipelineContext("https://github.com/org/service", "service", "python", str(tmp_path), "000000", "20240101")
+
+def checkpointed_artifacts(context, stage_name):
+    stage = next(stage for stage in PipelineRunner.STAGES if stage.name == stage_name)
+    return {name: context.artifacts[name] for name in stage.checkpoint if name in context.artifacts}
+
+def test_checkpoints_reference_the_cyclonedx_file(tmp_path):
+    raw_path = tmp_path / ".cyclonedx-raw.json"
+    raw_path.write_text(json.dumps({"bomFormat": "CycloneDX", "components": COMPONENTS}))
+    context = make_context(tmp_path)
+    context.load_cyclonedx(str(raw_path))
+    store = CheckpointStore(str(tmp_path))
+    store.save("cdxgen", "inputs", checkpointed_artifacts(context, "cdxgen"))
+    context.artifacts["cyclonedx"]["vulnerabilities"] = VULNERABILITIES
+    context.artifacts["vulnerabilities"] = VULNERABILITIES
+    store.save("add-cve", "inputs", checkpointed_artifacts(context, "add-cve"))
+
+    for stage_name in ("cdxgen", "add-cve"):
+        assert "components" not in json.dumps(store.load(stage_name, "inputs")["artifacts"])
+
+    resumed = make_context(tmp_path)
+    for stage_name in ("cdxgen", "add-cve"):
+        resumed.restore_artifacts(store.load(stage_name, "inputs")["artifacts"])
+    assert resumed.artifacts["cyclonedx"]["components"] == COMPONENTS
+    assert resumed.artifacts["cyclonedx"]["vulnerabilities"] == VULNERABILITIES
+
+def test_no_stage_checkpoints_the_cyclonedx_document():
+    assert all("cyclonedx" not in stage.checkpoint for stage in PipelineRunner.STAGES)
@@ -0,0 +1,52 @@
+from engine.cloneCache import MirrorCache, credential_options
+from engine.pipelineRunner import run_command
+import os
+import pytest
+import subprocess
+
+REPO_URL = "https://ghp_secret@github.com/org/service.git"
+
+def test_credentials_are_passed_per_command(tmp_path):
+    commands = []
+    cache = MirrorCache(root=str(tmp_path), filter_spec="", depth=0, size_budget_mb=1024)
+    mirror_path = cache.mirror_path(REPO_URL)
+
+    def run(command, cwd=None):
+        commands.append(command)
+        if "clone" in command:
+            os.makedirs(command[-1])
+
+    cache.update_mirror(REPO_URL, mirror_path, run)
+    cache.update_mirror(REPO_URL, mirror_path, run)
+
+    clone, set_url, fetch = commands[0], commands[1], commands[2]
+    assert clone[-2] == "https://github.com/org/service.git"
+    assert set_url[-1] == "https://github.com/org/service.git"
+    for command in (clone, fetch):
+        assert command[1:3] == ["-c", "http.https://github.com/.extraHeader=Authorization: Basic Z2hwX3NlY3JldDo="]
+    assert not any("ghp_secret" in argument for command in commands for argument in command)
+
+def test_updating_a_mirror_removes_stored_credentials(tmp_path):
+    cache = MirrorCache(root=str(tmp_path), filter_spec="", depth=0, size_budget_mb=1024)
+    mirror_path = cache.mirror_path(REPO_URL)
+    subprocess.run(["git", "init", "--quiet", "--bare", mirror_path], check=True)
+    subprocess.run(["git", "-C", mirror_path, "remote", "add", "origin", REPO_URL], check=True)
+
+    def run(command, cwd=None):
+        if "fetch" not in command:
+            subprocess.run(command, cwd=cwd, check=True)
+
+    cache.update_mirror(REPO_URL, mirror_path, run)
+    with open(f"{mirror_path}/config", "r", encoding="utf-8") as f:
+        config = f.read()
+    assert "ghp_secret" not in config
+    assert "url = https://github.com/org/service.git" in config
+
+def test_logged_commands_do_not_show_credentials(capfd):
+    command = ["git", *credential_options(REPO_URL), "clone", REPO_URL, "/nonexistent/.git/mirror"]
+    with pytest.raises(subprocess.CalledProcessError) as failure:
+        run_command(["false", *command[1:]], check=True)
+    output = capfd.readouterr().out
+    assert "Authorization: ***" in output
+    assert "ghp_secret" not in output and "Z2hwX3NlY3JldDo=" not in output
+    assert "Z2hwX3NlY3JldDo=" not in str(failure.value) and "ghp_secret" not in str(failure.value)
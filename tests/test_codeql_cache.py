@@ -0,0 +1,84 @@
+from engine import pipelineRunner
+from engine.codeqlCache import CodeqlDatabaseCache
+from engine.pipelineRunner import PipelineContext
+import json
+import os
+import threading
+
+def create_database(path):
+    os.makedirs(path)
+    with open(os.path.join(path, "codeql-database.yml"), "w", encoding="utf-8") as f:
+        f.write("primaryLanguage: python\n")
+    return True
+
+def make_database(cache, key):
+    database_path = cache.checkout(key, create_database)
+    assert database_path == cache.database_path(key)
+    return database_path
+
+def test_scans_of_one_commit_analyze_the_database_together(tmp_path):
+    cache = CodeqlDatabaseCache(root=str(tmp_path), size_budget_mb=1024)
+    database_path = make_database(cache, "commit")
+    both_inside = threading.Barrier(2, timeout=5)
+
+    def analyze():
+        with cache.in_use(database_path):
+            both_inside.wait()
+
+    threads = [threading.Thread(target=analyze) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not both_inside.broken
+
+def test_databases_being_analyzed_are_not_evicted(tmp_path):
+    cache = CodeqlDatabaseCache(root=str(tmp_path), size_budget_mb=1024)
+    database_path = make_database(cache, "commit")
+    cache.size_budget = 0
+    with cache.in_use(database_path):
+        assert cache.collect_garbage() == []
+    assert cache.collect_garbage() == [database_path]
+
+def test_analysis_is_skipped_without_vulnerable_packages(tmp_path, monkeypatch, load_script):
+    def fail(*args, **kwargs):
+        raise AssertionError("CodeQL should not run")
+
+    monkeypatch.setattr(pipelineRunner, "run_command", fail)
+    context = PipelineContext("https://github.com/org/service", "service", "python", str(tmp_path), "000000", "20240101")
+    context.artifacts["cyclonedx"] = {"components": [], "vulnerabilities": []}
+    pipelineRunner.analyze_codeql_database(context)
+    assert pipelineRunner.collect_reachable(context) == []
+
+def test_java_scans_build_no_database(tmp_path, monkeypatch, load_script):
+    def fail(*args, **kwargs):
+        raise AssertionError("CodeQL should not run")
+
+    monkeypatch.setattr(pipelineRunner, "run_command", fail)
+    monkeypatch.setattr(pipelineRunner, "codeql_version", fail)
+    context = PipelineContext("https://github.com/org/service", "service", "java", str(tmp_path), "000000", "20240101")
+    context.artifacts["cyclonedx"] = {"vulnerabilities": [{"id": "CVE-2024-35195",
+                                                           "affects": [{"ref": "pkg:pypi/requests@2.31.0"}]}]}
+    pipelineRunner.create_codeql_database(context)
+    pipelineRunner.analyze_codeql_database(context)
+    pipelineRunner.analyze_reachable(context)
+    assert "codeql_database" not in context.artifacts
+    assert context.artifacts["reachable"] == []
+
+def test_analysis_sinks_are_the_vulnerable_modules(tmp_path, monkeypatch, load_script):
+    commands = []
+    monkeypatch.setattr(pipelineRunner, "run_command", lambda command, **kwargs: commands.append(command))
+    monkeypatch.setattr(pipelineRunner.QueryCompilationCache, "ensure_compiled", lambda self, *args: False)
+    monkeypatch.setattr(pipelineRunner, "resolve_top_level_modules",
+                        lambda context, packages: [("pyyaml", ["yaml", "_yaml"]), ("python-dateutil", [])])
+    context = PipelineContext("https://github.com/org/service", "service", "python", str(tmp_path), "000000", "20240101")
+    context.artifacts["cyclonedx"] = {"vulnerabilities": [{"id": "CVE-2020-14343", "affects": [
+        {"ref": "pkg:pypi/pyyaml@5.3.1"}, {"ref": "pkg:pypi/python-dateutil@2.8.0"}]}]}
+    pipelineRunner.analyze_codeql_database(context)
+
+    pack_path = tmp_path / pipelineRunner.VULNERABLE_MODULES_PACK_DIRECTORY
+    assert commands[0][-2:] == [f"--additional-packs={pack_path}", "--model-packs=scable/vulnerable-modules"]
+    qlpack = json.loads((pack_path / "qlpack.yml").read_text())
+    model = json.loads((pack_path / qlpack["dataExtensions"][0]).read_text())["extensions"][0]
+    assert model["addsTo"] == {"pack": "codeql/python-queries", "extensible": "scableVulnerableModule"}
+    assert model["data"] == [["_yaml"], ["python_dateutil"], ["yaml"]]
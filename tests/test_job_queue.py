@@ -0,0 +1,73 @@
+from engine.jobQueue import JobQueue
+import threading
+import time
+
+def make_queue(tmp_path, handler=None, worker_count=2):
+    return JobQueue("sbom", handler or (lambda job_id, payload: None), worker_count=worker_count,
+                    database_path=str(tmp_path / "jobs.db"))
+
+def test_jobs_are_claimed_in_submission_order(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.submit({"repo": "a"})
+    second = queue.submit({"repo": "b"})
+    assert queue.get(second)["queue_position"] == 2
+
+    assert queue.claim() == (first, {"repo": "a"})
+    assert queue.claim() == (second, {"repo": "b"})
+    assert queue.claim() is None
+    assert queue.get(first)["status"] == "running"
+
+def test_each_job_is_claimed_once_by_concurrent_workers(tmp_path):
+    queue = make_queue(tmp_path)
+    submitted = {queue.submit({"index": index}) for index in range(40)}
+    claimed, claimed_lock = [], threading.Lock()
+
+    def claim_all():
+        while (job := queue.claim()) is not None:
+            with claimed_lock:
+                claimed.append(job[0])
+
+    threads = [threading.Thread(target=claim_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(submitted)
+
+def test_other_kinds_are_not_claimed(tmp_path):
+    queue = make_queue(tmp_path)
+    other = JobQueue("report", lambda job_id, payload: None, worker_count=1, database_path=str(tmp_path / "jobs.db"))
+    other.submit({"repo": "a"})
+    assert queue.claim() is None
+
+def wait_for(queue, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def test_jobs_left_running_by_a_previous_server_are_run_again(tmp_path):
+    interrupted = make_queue(tmp_path)
+    job_id = interrupted.submit({"repo": "a"})
+    interrupted.claim()
+
+    queue = make_queue(tmp_path, lambda job_id, payload: payload)
+    queue.start()
+    assert wait_for(queue, job_id)["result"] == {"repo": "a"}
+
+def test_workers_record_results_and_failures(tmp_path):
+    def handler(job_id, payload):
+        if payload["fail"]:
+            raise RuntimeError("cdxgen failed")
+        return {"result_url": "/result"}
+
+    queue = make_queue(tmp_path, handler)
+    queue.start()
+    completed = wait_for(queue, queue.submit({"fail": False}))
+    failed = wait_for(queue, queue.submit({"fail": True}))
+
+    assert completed["status"] == "completed" and completed["result"] == {"result_url": "/result"}
+    assert failed["status"] == "failed" and failed["error"] == "cdxgen failed"
@@ -0,0 +1,64 @@
+from engine.stageMetrics import StageCounters
+import json
+import pytest
+import requests
+
+BASE_URL = "https://osv.test"
+
+def make_response(status_code, body=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body or {}).encode()
+    return response
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, method, url, timeout=None, json=None):
+        self.requests.append((method, url, json))
+        return self.responses.pop(0)
+
+@pytest.fixture
+def add_cve(load_script, monkeypatch):
+    module = load_script("create-sbom/add_cve.py")
+    monkeypatch.setattr(module.time, "sleep", lambda seconds: None)
+    return module
+
+def use_session(add_cve, monkeypatch, responses):
+    session = FakeSession(responses)
+    monkeypatch.setattr(add_cve, "get_session", lambda: session)
+    return session
+
+def test_paged_batch_results_are_followed(add_cve, monkeypatch):
+    session = use_session(add_cve, monkeypatch, [
+        make_response(200, {"results": [{"vulns": [{"id": "GHSA-1"}], "next_page_token": "page-2"},
+                                        {"vulns": [{"id": "PYSEC-1"}]}]}),
+        make_response(200, {"results": [{"vulns": [{"id": "GHSA-2"}]}]}),
+    ])
+    queries = [("PyPI", "django", "3.2.0"), ("PyPI", "requests", "2.31.0")]
+
+    assert add_cve.query_osv_batch(queries, BASE_URL) == [["GHSA-1", "GHSA-2"], ["PYSEC-1"]]
+    second_batch = session.requests[1][2]["queries"]
+    assert second_batch == [{"package": {"name": "django", "ecosystem": "PyPI"}, "version": "3.2.0",
+                             "page_token": "page-2"}]
+
+@pytest.mark.parametrize("status_code", [429, 503])
+def test_rate_limits_and_server_errors_are_retried(add_cve, monkeypatch, status_code):
+    session = use_session(add_cve, monkeypatch, [make_response(status_code), make_response(status_code),
+                                                 make_response(200, {"id": "GHSA-1"})])
+    stats = StageCounters(network_requests=0)
+
+    assert add_cve.request_osv("GET", f"{BASE_URL}/v1/vulns/GHSA-1", stats) == {"id": "GHSA-1"}
+    assert len(session.requests) == 3 and stats["network_requests"] == 3
+
+def test_client_errors_are_not_retried(add_cve, monkeypatch):
+    session = use_session(add_cve, monkeypatch, [make_response(400), make_response(200)])
+    with pytest.raises(requests.exceptions.HTTPError):
+        add_cve.request_osv("GET", f"{BASE_URL}/v1/vulns/GHSA-1")
+    assert len(session.requests) == 1
+
+def test_failed_batches_are_reported_as_unknown(add_cve, monkeypatch):
+    use_session(add_cve, monkeypatch, [make_response(503)] * 5)
+    assert add_cve.query_osv_batch([("PyPI", "django", "3.2.0")], BASE_URL) == [None]
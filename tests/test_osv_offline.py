@@ -0,0 +1,56 @@
+import pytest
+
+@pytest.fixture
+def osv_offline(load_script):
+    return load_script("create-sbom/osv_offline.py")
+
+@pytest.mark.parametrize("ecosystem, ordered", [
+    ("PyPI", ["1.0.dev1", "1.0a1", "1.0b2", "1.0rc1", "1.0", "1.0.post1", "1.0.1"]),
+    ("npm", ["1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-alpha.beta", "1.0.0-beta", "1.0.0-beta.2", "1.0.0-beta.11",
+             "1.0.0-rc.1", "1.0.0", "1.0.1", "1.10.0"]),
+    ("Maven", ["1.0-alpha1", "1.0-beta", "1.0-m1", "1.0-rc1", "1.0-SNAPSHOT", "1.0", "1.0-sp1", "1.0.1", "1.1"]),
+])
+def test_versions_are_ordered_by_ecosystem(osv_offline, ecosystem, ordered):
+    keys = [osv_offline.parse_version(ecosystem, version) for version in ordered]
+    assert all(earlier < later for earlier, later in zip(keys, keys[1:]))
+
+@pytest.mark.parametrize("ecosystem, left, right", [
+    ("npm", "1.2.3+build.5", "1.2.3"),
+    ("npm", "v1.2", "1.2.0"),
+    ("Maven", "1.0.Final", "1.0"),
+    ("Maven", "1", "1.0.0"),
+    ("Maven", "2.0-GA", "2.0-release"),
+])
+def test_equivalent_versions(osv_offline, ecosystem, left, right):
+    assert osv_offline.parse_version(ecosystem, left) == osv_offline.parse_version(ecosystem, right)
+
+@pytest.mark.parametrize("ecosystem, events, version, affected", [
+    ("PyPI", [("introduced", "0"), ("fixed", "2.0")], "1.9", True),
+    ("PyPI", [("introduced", "0"), ("fixed", "2.0")], "2.0", False),
+    ("PyPI", [("introduced", "0"), ("fixed", "2.0")], "2.0rc1", True),
+    ("PyPI", [("introduced", "1.0"), ("fixed", "1.0.post1")], "1.0", True),
+    ("PyPI", [("introduced", "1.0"), ("fixed", "2.0")], "0.9", False),
+    ("PyPI", [("introduced", "1.0"), ("last_affected", "1.5")], "1.5", True),
+    ("PyPI", [("introduced", "1.0"), ("last_affected", "1.5")], "1.5.1", False),
+    ("PyPI", [("introduced", "1.0"), ("fixed", "1.2"), ("introduced", "2.0"), ("fixed", "2.1")], "1.5", False),
+    ("PyPI", [("introduced", "1.0"), ("fixed", "1.2"), ("introduced", "2.0"), ("fixed", "2.1")], "2.0.5", True),
+    ("PyPI", [("introduced", "0"), ("limit", "3.0")], "2.9", True),
+    ("PyPI", [("introduced", "0"), ("limit", "3.0")], "3.0", False),
+    ("PyPI", [("introduced", "0"), ("limit", "2.0"), ("limit", "3.0")], "2.5", True),
+    ("npm", [("introduced", "1.0.0-beta.1"), ("fixed", "1.0.0")], "1.0.0-rc.1", True),
+    ("npm", [("introduced", "1.0.0-beta.1"), ("fixed", "1.0.0")], "1.0.0-alpha", False),
+    ("Maven", [("introduced", "0"), ("fixed", "5.3.0.Final")], "5.3.0-SNAPSHOT", True),
+    ("Maven", [("introduced", "0"), ("fixed", "5.3.0.Final")], "5.3.0", False),
+    ("Maven", [("introduced", "2.0-rc1"), ("fixed", "2.0.1")], "2.0", True),
+    ("Maven", [("introduced", "2.0-rc1"), ("fixed", "2.0.1")], "2.0-beta", False),
+    ("PyPI", [("introduced", "0"), ("fixed", "2.0")], "not a version", False),
+])
+def test_range_events(osv_offline, ecosystem, events, version, affected):
+    assert osv_offline.is_affected(ecosystem, version, events) is affected
+
+def test_unparseable_event_versions_are_reported_once(osv_offline, capsys):
+    events = [("introduced", "0"), ("fixed", "2.0-garbled!")]
+    for _ in range(2):
+        assert osv_offline.is_affected("npm", "1.0.0", events, "GHSA-xxxx") is False
+    output = capsys.readouterr().out
+    assert output.count("GHSA-xxxx") == 1 and "'2.0-garbled!'" in output
@@ -0,0 +1,29 @@
+import threading
+
+def test_metadata_cache_is_scoped_to_a_run(load_script):
+    checker = load_script("package-check/malicious-package-check.py")
+    calls = []
+
+    @checker.metadata_cache
+    def lookup(name):
+        calls.append(name)
+        return name.upper()
+
+    def run(cache, names):
+        checker.thread_local.metadata_cache = cache
+        try:
+            return [lookup(name) for name in names]
+        finally:
+            checker.thread_local.metadata_cache = None
+
+    first_run, second_run = checker.MetadataCache(), checker.MetadataCache()
+    assert run(first_run, ["flask", "flask"]) == ["FLASK", "FLASK"]
+    assert calls == ["flask"]
+
+    # A run on another thread neither sees nor clears the entries of the first one.
+    thread = threading.Thread(target=run, args=(second_run, ["flask"]))
+    thread.start()
+    thread.join()
+    assert calls == ["flask", "flask"]
+    assert run(first_run, ["flask"]) == ["FLASK"]
+    assert calls == ["flask", "flask"]
@@ -0,0 +1,30 @@
+from config import Database
+import sqlite3
+
+def insert_run(repo_url, status="completed"):
+    return Database.insert_sbom_result("2024-01-01", "00-00-00", None, "service", "python", "/results", None,
+                                       status, repo_url=repo_url)
+
+def test_previous_runs_are_matched_on_the_repository_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(Database, "DATABASE_PATH", str(tmp_path / "scable-log.db"))
+    first = insert_run("https://github.com/org-a/service")
+    other = insert_run("https://github.com/org-b/service")
+    insert_run("https://github.com/org-a/service", status="failed")
+    current = insert_run("https://github.com/org-a/service", status="in_progress")
+
+    assert Database.get_previous_sbom_run(current)["run_id"] == first
+    assert Database.get_previous_sbom_run(insert_run("https://github.com/org-b/service"))["run_id"] == other
+    assert Database.get_previous_sbom_run(first) is None
+
+def test_logs_without_repository_urls_are_migrated(tmp_path, monkeypatch):
+    database_path = tmp_path / "scable-log.db"
+    monkeypatch.setattr(Database, "DATABASE_PATH", str(database_path))
+    conn = sqlite3.connect(database_path)
+    conn.execute("CREATE TABLE log (date TEXT, start_time TEXT, end_time TEXT, repo_name TEXT, language TEXT, "
+                 "result_path TEXT, result_url TEXT, status TEXT)")
+    conn.execute("INSERT INTO log VALUES ('2023-12-31', '00-00-00', NULL, 'service', 'python', '/old', NULL, 'completed')")
+    conn.commit()
+    conn.close()
+
+    current = insert_run("/home/user/service", status="in_progress")
+    assert Database.get_previous_sbom_run(current) is None
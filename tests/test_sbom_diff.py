@@ -0,0 +1,58 @@
+from engine.sbomDiff import component_key, diff_result_paths
+import json
+import pytest
+
+PREVIOUS = {
+    "sbom-detail.json": {"components": [
+        {"name": "requests", "version": "2.25.0", "purl": "pkg:pypi/requests@2.25.0",
+         "vulnerabilities": [{"cve_id": "CVE-2023-32681", "severity": "medium"}],
+         "package_check": [{"Risk Level": "Green"}]},
+        {"name": "left-pad", "version": "1.3.0", "purl": "pkg:npm/left-pad@1.3.0",
+         "vulnerabilities": [{"cve_id": "CVE-2020-0001", "severity": "low"}]},
+        {"name": "flask", "version": "2.0.0", "purl": "pkg:pypi/flask@2.0.0", "package_check": [{"Risk Level": "Green"}]},
+    ]},
+    "reachable.json": [{"reachable-library": "requests"}, {"reachable-library": "left-pad"}],
+}
+
+CURRENT = {
+    "sbom-detail.json": {"components": [
+        {"name": "requests", "version": "2.31.0", "purl": "pkg:pypi/requests@2.31.0",
+         "vulnerabilities": [{"cve_id": "CVE-2024-35195", "severity": "medium"}],
+         "package_check": [{"Risk Level": "Green"}]},
+        {"name": "flask", "version": "2.0.0", "purl": "pkg:pypi/flask@2.0.0", "package_check": [{"Risk Level": "Red"}]},
+        {"name": "jinja2", "version": "3.1.2", "purl": "pkg:pypi/jinja2@3.1.2",
+         "vulnerabilities": [{"cve_id": "CVE-2024-22195", "severity": "medium"}]},
+    ]},
+    "reachable.json": [{"reachable-library": "requests"}, {"reachable-library": "jinja2"}],
+}
+
+def write_run(path, files):
+    path.mkdir()
+    for file_name, content in files.items():
+        (path / file_name).write_text(json.dumps(content))
+    return str(path)
+
+def test_changes_between_two_runs(tmp_path):
+    diff = diff_result_paths(write_run(tmp_path / "previous", PREVIOUS), write_run(tmp_path / "current", CURRENT))
+
+    assert diff["added"] == [{"component": "pkg:pypi/jinja2", "versions": ["3.1.2"]}]
+    assert diff["removed"] == [{"component": "pkg:npm/left-pad", "versions": ["1.3.0"]}]
+    assert diff["upgraded"] == [{"component": "pkg:pypi/requests", "from": ["2.25.0"], "to": ["2.31.0"]}]
+    assert sorted((change["component"], change["cve_id"]) for change in diff["new_vulnerabilities"]) == [
+        ("pkg:pypi/jinja2", "CVE-2024-22195"), ("pkg:pypi/requests", "CVE-2024-35195")]
+    assert sorted((change["component"], change["cve_id"]) for change in diff["fixed_vulnerabilities"]) == [
+        ("pkg:npm/left-pad", "CVE-2020-0001"), ("pkg:pypi/requests", "CVE-2023-32681")]
+    assert diff["risk_level_changes"] == [{"component": "pkg:pypi/flask", "from": "Green", "to": "Red"}]
+    assert diff["newly_reachable"] == ["jinja2"] and diff["no_longer_reachable"] == ["left-pad"]
+    assert diff["summary"]["added"] == 1 and diff["summary"]["fixed_vulnerabilities"] == 2
+
+def test_runs_without_sbom_detail_are_not_diffed(tmp_path):
+    assert diff_result_paths(write_run(tmp_path / "previous", {}), write_run(tmp_path / "current", CURRENT)) is None
+
+@pytest.mark.parametrize("row, key", [
+    ({"purl": "pkg:npm/%40scope/left-pad@1.3.0?arch=x64"}, "pkg:npm/@scope/left-pad"),
+    ({"purl": "pkg:maven/org.example/lib@1.0#sub"}, "pkg:maven/org.example/lib"),
+    ({"purl": "N/A", "group": "org.example", "name": "lib"}, "org.example/lib"),
+])
+def test_components_are_keyed_without_their_version(row, key):
+    assert component_key(row) == key
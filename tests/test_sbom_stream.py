@@ -0,0 +1,47 @@
+from engine.sbomStream import JsonDocumentStream, JsonObjectReader
+import json
+import pytest
+
+DOCUMENT = {
+    "bomFormat": "CycloneDX",
+    "metadata": {"component": {"name": "sérvice", "version": "1.0"}, "tools": []},
+    "components": [
+        {"bom-ref": "pkg:pypi/requests@2.31.0", "name": "requests", "licenses": [{"license": {"id": "Apache-2.0"}}]},
+        {"bom-ref": "pkg:npm/%40scope/left-pad@1.3.0", "name": "@scope/left-pad", "description": "“quoted” \\ \n",
+         "hashes": [], "properties": {}},
+        {"bom-ref": "pkg:maven/org.example/lib@1.0", "name": "lib", "version": 1e-07, "scope": None},
+    ],
+    "dependencies": [{"ref": "pkg:pypi/requests@2.31.0", "dependsOn": []}],
+    "vulnerabilities": [],
+}
+
+def write_streamed(path, document, stream_key, indent):
+    header = {key: ([] if key == stream_key else value) for key, value in document.items()}
+    stream = JsonDocumentStream(str(path), header, stream_key, indent=indent)
+    for item in document.get(stream_key, []):
+        stream.write_item(item)
+    stream.finish()
+    return path.read_text(encoding="utf-8")
+
+@pytest.mark.parametrize("document", [
+    DOCUMENT,
+    {**DOCUMENT, "components": []},
+    {key: value for key, value in DOCUMENT.items() if key != "components"},
+    {"components": DOCUMENT["components"]},
+    {},
+])
+@pytest.mark.parametrize("indent", [2, 4])
+def test_streamed_documents_match_json_dump(tmp_path, document, indent):
+    expected = json.dumps(document, indent=indent, ensure_ascii=False)
+    assert write_streamed(tmp_path / "bom.json", document, "components", indent) == expected
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024 * 1024])
+def test_reader_returns_the_header_and_items(tmp_path, chunk_size):
+    path = tmp_path / "bom.json"
+    path.write_text(json.dumps(DOCUMENT, indent=2, ensure_ascii=False), encoding="utf-8")
+    reader = JsonObjectReader(str(path), "components", chunk_size=chunk_size)
+
+    header = reader.read_header()
+    assert list(header) == list(DOCUMENT)
+    assert header == {**DOCUMENT, "components": []}
+    assert list(reader.iter_items()) == DOCUMENT["components"]
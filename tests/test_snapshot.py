@@ -0,0 +1,49 @@
+from config import Config
+import os
+import pytest
+import subprocess
+
+TRACKED = ["app.py", "pkg/build/module.py", "build/out.txt", "node_modules/left-pad/index.js",
+           "pkg/__pycache__/module.pyc", "pkg/.venv/pyvenv.cfg"]
+IGNORED = {"build/out.txt", "node_modules/left-pad/index.js", "pkg/__pycache__/module.pyc", "pkg/.venv/pyvenv.cfg"}
+
+@pytest.fixture
+def cdxgen(load_script):
+    return load_script("create-sbom/cdxgen.py")
+
+@pytest.fixture
+def project(tmp_path):
+    project_path = tmp_path / "project"
+    for path in TRACKED:
+        (project_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (project_path / path).write_text(path)
+    git = ["git", "-C", str(project_path)]
+    subprocess.run(git + ["init", "--quiet"], check=True)
+    subprocess.run(git + ["add", "--force", "."], check=True)
+    subprocess.run(git + ["-c", "user.name=scable", "-c", "user.email=scable@localhost",
+                          "commit", "--quiet", "-m", "init"], check=True)
+    return project_path
+
+def workspace_files(path):
+    return {os.path.relpath(os.path.join(directory, name), path).replace(os.sep, "/")
+            for directory, _, filenames in os.walk(path) for name in filenames}
+
+@pytest.mark.parametrize("mode", ["copy", "git"])
+def test_ignored_directories_never_enter_the_workspace(cdxgen, project, tmp_path, mode):
+    destination = tmp_path / "workspace"
+    method = cdxgen.snapshot_tree(str(project), str(destination), mode, Config.LOCAL_SNAPSHOT_IGNORE_PATTERNS)
+    assert method == mode
+    assert workspace_files(destination) == set(TRACKED) - IGNORED
+
+def test_repositories_with_local_changes_are_copied(cdxgen, project, tmp_path):
+    (project / "app.py").write_text("changed")
+    destination = tmp_path / "workspace"
+    assert cdxgen.snapshot_tree(str(project), str(destination), "git") == "copy"
+    assert (destination / "app.py").read_text() == "changed"
+
+def test_auto_checks_out_clean_repositories_without_reflinks(cdxgen, project, tmp_path, monkeypatch):
+    monkeypatch.setattr(cdxgen, "reflink_available", lambda *args: False)
+    destination = tmp_path / "workspace"
+    assert cdxgen.snapshot_tree(str(project), str(destination), "auto", Config.LOCAL_SNAPSHOT_IGNORE_PATTERNS) == "git"
+    assert not (destination / ".git").exists()
+    assert (project / ".git").is_dir()
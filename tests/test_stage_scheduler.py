@@ -0,0 +1,62 @@
+from engine.stageScheduler import Stage, StageScheduler
+import pytest
+import threading
+
+def noop(context):
+    pass
+
+def test_stages_run_after_the_stages_they_depend_on():
+    stages = [
+        Stage("emit", noop, requires=["cyclonedx"], provides=["sbom"]),
+        Stage("cdxgen", noop, provides=["cyclonedx-raw"]),
+        Stage("add-cve", noop, requires=["cyclonedx-raw"], provides=["cyclonedx"]),
+        Stage("publish", noop, requires=["sbom", "cyclonedx-raw"]),
+    ]
+    finished = [stage.name for stage in StageScheduler(stages, 4).run(lambda stage: None)]
+    assert finished == ["cdxgen", "add-cve", "emit", "publish"]
+
+def test_independent_stages_run_concurrently():
+    both_running = threading.Barrier(2, timeout=5)
+    stages = [
+        Stage("cdxgen", noop, provides=["sbom"]),
+        Stage("codeql-database", noop, provides=["codeql"]),
+        Stage("reachable", noop, requires=["sbom", "codeql"]),
+    ]
+
+    def execute(stage):
+        if stage.name != "reachable":
+            both_running.wait()
+
+    finished = [stage.name for stage in StageScheduler(stages, 2).run(execute)]
+    assert finished[-1] == "reachable"
+    assert not both_running.broken
+
+def test_a_failed_stage_stops_the_stages_that_depend_on_it():
+    started = []
+    stages = [
+        Stage("cdxgen", noop, provides=["sbom"]),
+        Stage("add-cve", noop, requires=["sbom"], provides=["cyclonedx"]),
+        Stage("emit", noop, requires=["cyclonedx"]),
+    ]
+
+    def execute(stage):
+        started.append(stage.name)
+        if stage.name == "add-cve":
+            raise RuntimeError("OSV unreachable")
+
+    with pytest.raises(RuntimeError, match="OSV unreachable"):
+        list(StageScheduler(stages, 2).run(execute))
+    assert started == ["cdxgen", "add-cve"]
+
+@pytest.mark.parametrize("stages, message", [
+    ([Stage("a", noop), Stage("a", noop)], "Duplicate stage name"),
+    ([Stage("a", noop, requires=["missing"])], "no stage provides"),
+])
+def test_invalid_graphs_are_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        StageScheduler(stages, 1)
+
+def test_cycles_are_reported():
+    stages = [Stage("a", noop, requires=["b"], provides=["a"]), Stage("b", noop, requires=["a"], provides=["b"])]
+    with pytest.raises(RuntimeError, match="can never become ready"):
+        list(StageScheduler(stages, 1).run(lambda stage: None))
@@ -0,0 +1,68 @@
+import pytest
+import uuid
+import xml.etree.ElementTree as ET
+
+SBOM = {
+    "metadata": {"component": {"name": "service & <tools>", "version": "1.0", "bom-ref": "pkg:pypi/service@1.0"}},
+    "components": [
+        {"name": "requests", "version": "2.31.0", "hashes": [{"alg": "SHA-256", "content": "abc"}],
+         "licenses": [{"license": {"url": "https://www.apache.org/licenses/LICENSE-2.0?a=1&b=2"}}]},
+        {"name": "naïve \"quoted\" pkg", "version": None, "licenses": [{"license": {"id": "MIT"}}]},
+        {"name": "lib", "version": "1.0", "licenses": [{"license": {"url": "https://opensource.org/licenses/MIT"}},
+                                                        {"license": {"url": "https://example.com/☃"}}]},
+    ],
+}
+
+class RecordingWriter:
+    def __init__(self):
+        self.files, self.links = [], []
+
+    def add_file(self, attributes):
+        self.files.append(attributes)
+
+    def add_link(self, attributes):
+        self.links.append(attributes)
+
+def indent(elem, level=0):
+    i = "\n" + level * "  "
+    if len(elem):
+        if not elem.text or not elem.text.strip():
+            elem.text = i + "  "
+        if not elem.tail or not elem.tail.strip():
+            elem.tail = i
+        for subelem in elem:
+            indent(subelem, level + 1)
+        if not subelem.tail or not subelem.tail.strip():
+            subelem.tail = i
+    else:
+        if level and (not elem.tail or not elem.tail.strip()):
+            elem.tail = i
+
+def element_tree_swid(converter, output_path):
+    """The SWID tag as written before SwidWriter: an indented ElementTree."""
+    recorded = RecordingWriter()
+    for component in converter.sbom_data.get("components", []):
+        converter.add_component(recorded, component)
+    root = ET.Element("SoftwareIdentity", converter.root_attributes())
+    for entity in converter.entities():
+        ET.SubElement(root, "Entity", entity)
+    payload = ET.SubElement(root, "Payload")
+    for attributes in recorded.files:
+        ET.SubElement(payload, "File", attributes)
+    for attributes in recorded.links:
+        ET.SubElement(root, "Link", attributes)
+    indent(root)
+    ET.ElementTree(root).write(output_path, encoding="UTF-8", xml_declaration=True)
+
+@pytest.fixture
+def swid(load_script, monkeypatch):
+    module = load_script("create-sbom/swid.py")
+    monkeypatch.setattr(module.uuid, "uuid4", lambda: uuid.UUID(int=0))
+    return module
+
+@pytest.mark.parametrize("sbom", [SBOM, {**SBOM, "components": []}, {"components": SBOM["components"][1:2]}, {}])
+def test_streamed_swid_matches_the_element_tree_output(swid, tmp_path, sbom):
+    converter = swid.CycloneDXToSWIDConverter(sbom_data=sbom)
+    converter.save_swid(str(tmp_path / "streamed.xml"))
+    element_tree_swid(converter, str(tmp_path / "expected.xml"))
+    assert (tmp_path / "streamed.xml").read_bytes() == (tmp_path / "expected.xml").read_bytes()
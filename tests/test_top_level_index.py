@@ -0,0 +1,19 @@
+from engine import topLevelIndex
+from engine.stageMetrics import StageCounters
+from engine.topLevelIndex import TopLevelIndex, fetch_top_level
+import requests
+
+def test_zero_negative_ttl_retries_releases_without_wheel(tmp_path):
+    index = TopLevelIndex(path=str(tmp_path / "top-level.sqlite"), negative_ttl_hours=0)
+    index.put({("example", "1.0"): [], ("other", "2.0"): ["other"]})
+    assert index.get([("example", "1.0"), ("other", "2.0")]) == {("other", "2.0"): ["other"]}
+
+def test_failed_fetch_counts_an_error(monkeypatch):
+    class FailingSession:
+        def get(self, url, timeout=None):
+            raise requests.exceptions.ConnectionError("unreachable")
+
+    monkeypatch.setattr(topLevelIndex, "get_session", lambda: FailingSession())
+    stats = StageCounters(network_requests=0, cache_hits=0, errors=0)
+    assert fetch_top_level("example", "1.0", stats) is None
+    assert stats["errors"] == 1